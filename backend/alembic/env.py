@@ -1,22 +1,19 @@
 from logging.config import fileConfig
-import os
-from dotenv import load_dotenv
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
 
-# Load .env
-load_dotenv()
+from app.core.config import get_settings
 
 # Alembic Config
 config = context.config
 
-# Override DB URL with .env value
+# Override DB URL with the DATABASE_URL setting (environment or backend/.env)
 config.set_main_option(
     "sqlalchemy.url",
-    os.getenv("DATABASE_URL")
+    get_settings().require("database_url")
 )
 
 # Logging
@@ -32,6 +29,13 @@ import app.models.mnemonic_cache
 import app.models.user_word_history
 import app.models.crossword
 import app.models.crossword_attempts
+import app.models.pre_generation_progress
+import app.models.pre_generation_job
+import app.models.daily_word_set
+import app.models.crossword_leaderboard
+import app.models.crossword_bank
+import app.models.generation_claim
+import app.models.image_blob
 
 target_metadata = Base.metadata
 
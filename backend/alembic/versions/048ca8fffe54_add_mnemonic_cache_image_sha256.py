@@ -0,0 +1,30 @@
+"""Add mnemonic_cache.image_sha256 for blob-stored images
+
+Revision ID: 048ca8fffe54
+Revises: 3670a29c6612
+Create Date: 2026-10-17 10:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '048ca8fffe54'
+down_revision: Union[str, Sequence[str], None] = '3670a29c6612'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing image_base64 values are moved to the blob store lazily on read,
+    # or in bulk with: python -m app.scripts.migrate_images_to_blob_store
+    op.add_column('mnemonic_cache', sa.Column('image_sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('mnemonic_cache', 'image_sha256')
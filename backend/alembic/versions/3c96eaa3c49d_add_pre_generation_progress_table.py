@@ -0,0 +1,44 @@
+"""Add pre_generation_progress table
+
+Revision ID: 3c96eaa3c49d
+Revises: 048ca8fffe54
+Create Date: 2026-10-17 11:02:17.904211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c96eaa3c49d'
+down_revision: Union[str, Sequence[str], None] = '048ca8fffe54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('pre_generation_progress',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('run_date', sa.Date(), nullable=False),
+    sa.Column('language', sa.String(length=2), nullable=False),
+    sa.Column('level', sa.String(), nullable=False),
+    sa.Column('word_id', sa.Integer(), nullable=False),
+    sa.Column('text_done', sa.Boolean(), nullable=False),
+    sa.Column('image_done', sa.Boolean(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['word_id'], ['vocabulary.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('run_date', 'language', 'level', 'word_id', name='uq_pre_generation_progress')
+    )
+    op.create_index(op.f('ix_pre_generation_progress_id'), 'pre_generation_progress', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_pre_generation_progress_id'), table_name='pre_generation_progress')
+    op.drop_table('pre_generation_progress')
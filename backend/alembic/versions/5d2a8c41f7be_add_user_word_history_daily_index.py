@@ -0,0 +1,42 @@
+"""Add unique (user_id, served_date, word_id) index to user_word_history
+
+Revision ID: 5d2a8c41f7be
+Revises: b7e1d5a0c93f
+Create Date: 2026-10-17 13:48:09.271550
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a8c41f7be'
+down_revision: Union[str, Sequence[str], None] = 'b7e1d5a0c93f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Concurrent /words/daily requests could insert the same word twice;
+    # keep the first row of each duplicate group before adding the constraint
+    op.execute("""
+        DELETE FROM user_word_history h
+        USING user_word_history d
+        WHERE h.user_id = d.user_id
+          AND h.served_date = d.served_date
+          AND h.word_id = d.word_id
+          AND h.id > d.id
+    """)
+    # (user_id, served_date) leads, so this also serves the daily lookup
+    op.create_unique_constraint(
+        'uq_user_word_history_user_date_word',
+        'user_word_history',
+        ['user_id', 'served_date', 'word_id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_user_word_history_user_date_word', 'user_word_history', type_='unique')
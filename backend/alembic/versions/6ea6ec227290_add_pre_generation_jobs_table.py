@@ -0,0 +1,48 @@
+"""Add pre_generation_jobs table
+
+Revision ID: 6ea6ec227290
+Revises: 3c96eaa3c49d
+Create Date: 2026-10-17 12:20:53.117342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6ea6ec227290'
+down_revision: Union[str, Sequence[str], None] = '3c96eaa3c49d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('pre_generation_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('run_date', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('total_items', sa.Integer(), nullable=False),
+    sa.Column('done_items', sa.Integer(), nullable=False),
+    sa.Column('error_items', sa.Integer(), nullable=False),
+    sa.Column('progress', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('stats', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pre_generation_jobs_id'), 'pre_generation_jobs', ['id'], unique=False)
+    op.create_index('uq_pre_generation_jobs_active_date', 'pre_generation_jobs', ['run_date'], unique=True, postgresql_where=sa.text("status IN ('pending', 'running')"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_pre_generation_jobs_active_date', table_name='pre_generation_jobs', postgresql_where=sa.text("status IN ('pending', 'running')"))
+    op.drop_index(op.f('ix_pre_generation_jobs_id'), table_name='pre_generation_jobs')
+    op.drop_table('pre_generation_jobs')
@@ -0,0 +1,37 @@
+"""Add level/language to crosswords for shared daily puzzles
+
+Revision ID: 9a4f3e2b61c8
+Revises: 5d2a8c41f7be
+Create Date: 2026-10-17 14:31:47.902266
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f3e2b61c8'
+down_revision: Union[str, Sequence[str], None] = '5d2a8c41f7be'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('crosswords', sa.Column('level', sa.String(), nullable=True))
+    op.add_column('crosswords', sa.Column('language', sa.String(length=2), nullable=True))
+    op.alter_column('crosswords', 'user_id', existing_type=sa.Integer(), nullable=True)
+    op.create_unique_constraint('uq_crosswords_daily', 'crosswords', ['puzzle_date', 'level', 'language'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_crosswords_daily', 'crosswords', type_='unique')
+    # Shared daily puzzles have no owner
+    op.execute("DELETE FROM crossword_attempts WHERE crossword_id IN (SELECT id FROM crosswords WHERE user_id IS NULL)")
+    op.execute("DELETE FROM crosswords WHERE user_id IS NULL")
+    op.alter_column('crosswords', 'user_id', existing_type=sa.Integer(), nullable=False)
+    op.drop_column('crosswords', 'language')
+    op.drop_column('crosswords', 'level')
@@ -0,0 +1,35 @@
+"""Add daily_word_sets table
+
+Revision ID: b7e1d5a0c93f
+Revises: 6ea6ec227290
+Create Date: 2026-10-17 13:05:22.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e1d5a0c93f'
+down_revision: Union[str, Sequence[str], None] = '6ea6ec227290'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_word_sets',
+    sa.Column('set_date', sa.Date(), nullable=False),
+    sa.Column('level', sa.String(), nullable=False),
+    sa.Column('word_ids', postgresql.ARRAY(sa.Integer()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('set_date', 'level')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_word_sets')
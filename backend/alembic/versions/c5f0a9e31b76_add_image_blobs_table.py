@@ -0,0 +1,35 @@
+"""Add image_blobs table for database-backed image storage
+
+Revision ID: c5f0a9e31b76
+Revises: a83e5c17d2f4
+Create Date: 2026-10-18 11:02:47.318504
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f0a9e31b76'
+down_revision: Union[str, Sequence[str], None] = 'a83e5c17d2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Images written to a local blob directory can be copied in with:
+    # python -m app.scripts.migrate_images_to_blob_store --from-dir <dir>
+    op.create_table('image_blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('image_blobs')
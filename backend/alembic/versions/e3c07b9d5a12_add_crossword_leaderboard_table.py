@@ -0,0 +1,42 @@
+"""Add crossword_leaderboard summary table
+
+Revision ID: e3c07b9d5a12
+Revises: 9a4f3e2b61c8
+Create Date: 2026-10-17 15:02:16.448091
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3c07b9d5a12'
+down_revision: Union[str, Sequence[str], None] = '9a4f3e2b61c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('crossword_leaderboard',
+    sa.Column('crossword_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('miss_cells', sa.Integer(), nullable=False),
+    sa.Column('best_time_seconds', sa.Integer(), nullable=False),
+    sa.Column('correct_cells', sa.Integer(), nullable=False),
+    sa.Column('total_cells', sa.Integer(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['crossword_id'], ['crosswords.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('crossword_id', 'user_id')
+    )
+    op.create_index('ix_crossword_leaderboard_rank', 'crossword_leaderboard', ['crossword_id', 'miss_cells', 'best_time_seconds'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_crossword_leaderboard_rank', table_name='crossword_leaderboard')
+    op.drop_table('crossword_leaderboard')
@@ -0,0 +1,46 @@
+"""Add crossword_bank table
+
+Revision ID: f41b6c2d8e07
+Revises: e3c07b9d5a12
+Create Date: 2026-10-17 16:21:47.305518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f41b6c2d8e07'
+down_revision: Union[str, Sequence[str], None] = 'e3c07b9d5a12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('crossword_bank',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('word_set_hash', sa.String(length=64), nullable=False),
+    sa.Column('words', postgresql.ARRAY(sa.String()), nullable=False),
+    sa.Column('level', sa.String(), nullable=True),
+    sa.Column('language', sa.String(length=2), nullable=True),
+    sa.Column('grid', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('clues', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('intersections', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('word_set_hash')
+    )
+    op.create_index(op.f('ix_crossword_bank_id'), 'crossword_bank', ['id'], unique=False)
+    op.create_index('ix_crossword_bank_level_language', 'crossword_bank', ['level', 'language'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_crossword_bank_level_language', table_name='crossword_bank')
+    op.drop_index(op.f('ix_crossword_bank_id'), table_name='crossword_bank')
+    op.drop_table('crossword_bank')
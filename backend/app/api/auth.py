@@ -1,24 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends
-from google.oauth2 import id_token
-from google.auth.transport import requests
-from google.auth.exceptions import GoogleAuthError
+import logging
 from sqlalchemy.orm import Session
 from typing import Dict, Any
 from app.core.db import get_db
 from app.models.user import User
 from app.core.security import create_access_token
+from app.core.user_context import UserSnapshot, current_user
 from app.schemas.auth import GoogleVerifyRequest, AuthResponse, UserResponse
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from app.services.google_verifier import GoogleCertsUnavailable, GoogleTokenError, get_google_verifier
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
-if GOOGLE_CLIENT_ID is None:
-    raise RuntimeError("GOOGLE_CLIENT_ID environment variable is not set")
-
 
 @router.post("/google/verify", response_model=AuthResponse)
 def google_verify(
@@ -36,18 +28,20 @@ def google_verify(
         AuthResponse with JWT token and user data
     
     Raises:
-        HTTPException: If token is missing or invalid
+        HTTPException: If token is missing or invalid, or Google's signing keys cannot be fetched
     """
     if not payload.id_token:
         raise HTTPException(status_code=400, detail="Missing id_token")
 
     try:
-        info = id_token.verify_oauth2_token(
-            payload.id_token, requests.Request(), GOOGLE_CLIENT_ID
-        )
-    except (ValueError, GoogleAuthError) as e:
+        info = get_google_verifier().verify(payload.id_token)
+    except GoogleTokenError:
         raise HTTPException(status_code=401, detail="Invalid Google token")
+    except GoogleCertsUnavailable as e:
+        logging.warning(f"Google signing keys unavailable: {str(e)}")
+        raise HTTPException(status_code=503, detail="Google sign-in is temporarily unavailable")
     except Exception as e:
+        logging.warning(f"Google token verification failed unexpectedly: {str(e)}")
         raise HTTPException(status_code=401, detail="Token verification failed")
 
     google_id = info.get("sub")
@@ -86,3 +80,16 @@ def google_verify(
             created_at=user.created_at.isoformat() if user.created_at else None
         )
     )
+
+
+@router.get("/me", response_model=UserResponse)
+def me(user: UserSnapshot = Depends(current_user)) -> UserResponse:
+    """
+    Return the signed-in user.
+
+    Served from the user snapshot cache, so repeat calls do not query the database.
+
+    Raises:
+        HTTPException: 401 if not signed in
+    """
+    return UserResponse(**user.to_response())
@@ -1,61 +1,128 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from app.core.db import get_db
-from app.models.vocabulary import Vocabulary
-from app.services.crossword_service import generate_crossword
+from app.core.responses import json_response
+from app.core.security import optional_access_token, require_access_token
+from app.models.crossword_attempts import CrosswordAttempt
+from app.models.user import User
+from app.services.crossword_bank import draw_layout, find_layout
+from app.services.crossword_format import puzzle_payload
+from app.services.crossword_service import generate_crossword, max_grid_size
+from app.services.crossword_check import (
+    AnswerFormatError,
+    check_answers,
+    get_solution,
+    normalize_answers,
+    record_attempt,
+)
+from app.services.daily_crossword import get_daily_crossword
+from app.services.leaderboard import (
+    AttemptAlreadyCompletedError,
+    allow_ranked_check,
+    complete_attempt,
+    get_leaderboard,
+    has_open_attempt,
+    has_ranked_result,
+    start_attempt,
+)
+from app.services.pre_generation import LANGUAGES, LEVELS
 from app.schemas.crossword import (
     CrosswordTodayRequest, 
     CrosswordTodayResponse, 
-    CrosswordClue,
+    CrosswordCompactResponse,
     CrosswordSubmitRequest,
-    CrosswordSubmitResponse
+    CrosswordSubmitResponse,
+    CrosswordCheckRequest,
+    CrosswordCheckResponse,
+    CrosswordAttemptStartResponse,
+    CrosswordAttemptCompleteResponse,
+    LeaderboardResponse
 )
-from sqlalchemy import func
 
 router = APIRouter(prefix="/crossword", tags=["Crossword"])
 
 
-def get_random_words(db: Session, limit: int = 10) -> List[Vocabulary]:
+# The daily puzzle changes at midnight; clients revalidate cheaply via ETag
+DAILY_CROSSWORD_CACHE_CONTROL = "public, max-age=300"
+
+
+# Stored daily puzzles are compact (no answers, checked by id); puzzles that
+# are not stored can only be checked client-side, so they are always full
+PuzzleResponse = Union[CrosswordTodayResponse, CrosswordCompactResponse]
+
+
+def _puzzle_response(body: Dict[str, Any]) -> Response:
+    """Send an already-built puzzle body (skipping response model validation)."""
+    return json_response(body)
+
+
+def _daily_crossword_response(
+    request: Request,
+    db: Session,
+    level: str,
+    language: str
+) -> Response:
     """
-    Get random words from database (database-agnostic approach).
-    
-    Args:
-        db: Database session
-        limit: Number of words to return
-    
-    Returns:
-        List of random Vocabulary objects
+    Serve the shared daily crossword body, or 304 if the client's ETag matches.
+
+    The daily puzzle is ranked, so it is always sent in the compact format,
+    without answers; answers are checked with /crossword/{crossword_id}/check
+    or by completing an attempt.
     """
-    try:
-        return (
-            db.query(Vocabulary)
-            .order_by(func.random())
-            .limit(limit)
-            .all()
-        )
-    except Exception:
-        # Fallback: get all and shuffle in Python (not ideal for large datasets)
-        import random
-        all_words = db.query(Vocabulary).all()
-        return random.sample(all_words, min(limit, len(all_words)))
+    if level not in LEVELS:
+        raise HTTPException(status_code=400, detail=f"Unknown level '{level}'")
+    if language not in LANGUAGES:
+        raise HTTPException(status_code=400, detail=f"Unknown language '{language}'")
+
+    puzzle = get_daily_crossword(db, level, language)
+    if puzzle is None:
+        raise HTTPException(status_code=404, detail="No words found in database")
+
+    body, etag = puzzle.encoded()
+    headers = {"ETag": etag, "Cache-Control": DAILY_CROSSWORD_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in if_none_match or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
-@router.post("/today", response_model=CrosswordTodayResponse)
+@router.get("/daily", response_model=CrosswordCompactResponse)
+def crossword_daily(
+    request: Request,
+    level: str = "a1",
+    language: str = "es",
+    db: Session = Depends(get_db)
+):
+    """
+    Get the shared crossword of the day for a level and language.
+    Everyone at the same level and language gets the same stored puzzle,
+    in the compact format (no answers, since it has a leaderboard).
+    Supports If-None-Match with the returned ETag.
+    """
+    return _daily_crossword_response(request, db, level, language)
+
+
+@router.post("/today", response_model=PuzzleResponse)
 def crossword_today(
     payload: CrosswordTodayRequest,
+    request: Request,
     db: Session = Depends(get_db)
-) -> CrosswordTodayResponse:
+):
     """
     Generate a crossword puzzle with words from vocabulary.
-    If words are provided, use those. Otherwise, get random words.
+    If words are provided, use those; the puzzle is not stored, so it is sent
+    in the full format, answers included. Otherwise, serve the shared daily
+    puzzle for the requested level and language (see GET /crossword/daily),
+    which is always in the compact format.
     
     Args:
-        payload: Request containing optional words list or limit
+        payload: Request containing optional words list, or level/language
+        request: Incoming request (for If-None-Match)
         db: Database session
     
     Returns:
-        CrosswordTodayResponse with grid and clues
+        CrosswordTodayResponse (or CrosswordCompactResponse) with grid and clues
     
     Raises:
         HTTPException: If no words are found in database
@@ -77,27 +144,22 @@ def crossword_today(
                 "clue": clue
             })
     else:
-        # Get random words
-        limit = payload.limit or 10
-        words = get_random_words(db, limit=limit)
-        
-        if not words:
-            raise HTTPException(status_code=404, detail="No words found in database")
-        
-        formatted = [
-            {
-                "word": w.word.upper(),
-                "clue": w.definition
-            }
-            for w in words
-        ]
+        return _daily_crossword_response(
+            request, db, payload.level or "a1", payload.language or "es"
+        )
 
     if not formatted:
         raise HTTPException(status_code=404, detail="No words found in database")
 
-    # Filter out words that are too long for the grid (10x10)
-    MAX_WORD_LENGTH = 10
-    filtered_formatted = [w for w in formatted if len(w["word"]) <= MAX_WORD_LENGTH]
+    if payload.size is not None and payload.size > max_grid_size():
+        raise HTTPException(
+            status_code=400,
+            detail=f"Grid size must be at most {max_grid_size()}"
+        )
+
+    # Filter out words that are too long for the grid
+    max_word_length = payload.size or max_grid_size()
+    filtered_formatted = [w for w in formatted if len(w["word"]) <= max_word_length]
     
     if not filtered_formatted:
         raise HTTPException(
@@ -105,55 +167,257 @@ def crossword_today(
             detail="No words suitable for crossword (all words are too long)"
         )
 
-    result = generate_crossword(filtered_formatted)
+    too_long = [w["word"] for w in formatted if len(w["word"]) > max_word_length]
+    answers = [w["word"] for w in filtered_formatted]
 
-    grid = result["grid"]
-    placements = result["placements"]
+    # Same words as a banked layout (that fits the requested size): serve it
+    # instead of searching live
+    layout = find_layout(db, answers)
+    if layout is not None and payload.size is not None and max(layout.height, layout.width) > payload.size:
+        layout = None
+    if layout is not None:
+        clue_texts = {w["word"]: w["clue"] for w in filtered_formatted}
+        return _puzzle_response(puzzle_payload(layout.with_clues(clue_texts), unplaced=too_long))
 
-    # Create a map of placed words for matching
-    placed_words_map = {p["word"]: p for p in placements}
-    
-    # Build clues only for words that were successfully placed
-    # Track which cells have numbers assigned (for shared starting cells)
-    cell_numbers: Dict[tuple, int] = {}  # (row, col) -> number
-    clues: List[CrosswordClue] = []
-    clue_number = 1
-    
-    for w in filtered_formatted:
-        word_upper = w["word"]
-        if word_upper in placed_words_map:
-            p = placed_words_map[word_upper]
-            row = p["row"]
-            col = p["col"]
-            
-            # Check if this cell already has a number (shared starting cell)
-            cell_key = (row, col)
-            if cell_key in cell_numbers:
-                # Use existing number for shared cell
-                number = cell_numbers[cell_key]
-            else:
-                # Assign new number
-                number = clue_number
-                cell_numbers[cell_key] = number
-                clue_number += 1
-            
-            clues.append(CrosswordClue(
-                number=number,
-                direction=p["direction"].lower(),
-                clue=w["clue"],
-                answer=word_upper,
-                row=row,
-                col=col
-            ))
+    # Live layouts are not banked: the words and clues come from the client.
+    # The bank is only filled by app/scripts/build_crossword_bank.py.
+    puzzle = generate_crossword(filtered_formatted, size=payload.size)
+
+    # Words that are too long or could not be placed without clashing
+    unplaced = too_long + puzzle.unplaced
+    if unplaced:
+        print(f"⚠️ Crossword: {len(unplaced)} words not placed: {unplaced}")
 
     # If no words were placed, return error
-    if not clues:
+    if not puzzle.entries:
         raise HTTPException(
             status_code=500,
             detail="Crossword generation failed: no words could be placed"
         )
 
-    return CrosswordTodayResponse(grid=grid, words=clues)
+    return _puzzle_response(puzzle_payload(puzzle, unplaced=unplaced))
+
+
+@router.get("/practice", response_model=CrosswordTodayResponse)
+def crossword_practice(
+    level: str = "a1",
+    language: str = "es",
+    db: Session = Depends(get_db)
+) -> Response:
+    """
+    Get a random practice crossword from the pre-generated bank.
+    The bank is filled by app/scripts/build_crossword_bank.py.
+    Practice puzzles are not stored or ranked, so they come in the full
+    format and are checked client-side.
+    """
+    if level not in LEVELS:
+        raise HTTPException(status_code=400, detail=f"Unknown level '{level}'")
+    if language not in LANGUAGES:
+        raise HTTPException(status_code=400, detail=f"Unknown language '{language}'")
+
+    layout = draw_layout(db, level, language)
+    if layout is None:
+        raise HTTPException(status_code=404, detail="No practice crosswords available")
+
+    return _puzzle_response(puzzle_payload(layout, level=level, language=language))
+
+
+@router.post("/{crossword_id}/check", response_model=CrosswordCheckResponse)
+def check_stored_crossword(
+    crossword_id: int,
+    payload: CrosswordCheckRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: Optional[dict] = Depends(optional_access_token)
+) -> CrosswordCheckResponse:
+    """
+    Check answers against the stored solution of a crossword.
+    Signed-in users get the submission recorded as a CrosswordAttempt.
+    
+    Ranked (daily) puzzles can't be checked during the player's own timed
+    attempt. Until the player has completed their ranked attempt (always,
+    for anonymous callers), checks are rate-limited, only report cell
+    counts without per-word results, and are not recorded, so they can't be
+    used to work out the solution before the timed attempt.
+    
+    Args:
+        crossword_id: Id of the stored crossword (e.g. from /crossword/daily)
+        payload: Compact answers and optional solving time
+        request: Incoming request (client address for rate limiting)
+        db: Database session
+        user: Optional authenticated user dict
+    
+    Returns:
+        CrosswordCheckResponse with cell counts and per-word results
+    """
+    solution = get_solution(db, crossword_id)
+    if solution is None:
+        raise HTTPException(status_code=404, detail="Crossword not found")
+
+    user_id = user.get("user_id") if user else None
+    aggregate_only = False
+    if solution.ranked and not (user_id and has_ranked_result(db, crossword_id, user_id)):
+        if user_id and has_open_attempt(db, crossword_id, user_id):
+            raise HTTPException(
+                status_code=409,
+                detail="Answers can't be checked during a timed attempt; complete the attempt instead"
+            )
+        caller = f"user:{user_id}" if user_id else f"ip:{request.client.host if request.client else ''}"
+        if not allow_ranked_check(crossword_id, caller):
+            raise HTTPException(status_code=429, detail="Too many checks, please wait a moment")
+        aggregate_only = True
+
+    try:
+        answers = normalize_answers(solution, payload.answers)
+    except AnswerFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = check_answers(solution, answers)
+
+    attempt_id = None
+    if user_id and not aggregate_only:
+        attempt_id = record_attempt(db, crossword_id, user_id, result, payload.time_taken_seconds).id
+
+    return CrosswordCheckResponse(
+        crossword_id=crossword_id,
+        attempt_id=attempt_id,
+        correct_cells=result.correct_cells,
+        total_cells=result.total_cells,
+        accuracy=result.accuracy,
+        solved=result.solved,
+        results=[] if aggregate_only else result.results
+    )
+
+
+@router.post("/{crossword_id}/attempts", response_model=CrosswordAttemptStartResponse, status_code=201)
+def start_crossword_attempt(
+    crossword_id: int,
+    db: Session = Depends(get_db),
+    user: dict = Depends(require_access_token)
+) -> CrosswordAttemptStartResponse:
+    """
+    Start a timed attempt at a stored crossword.
+    Complete it with /crossword/{crossword_id}/attempts/{attempt_id}/complete.
+    """
+    if get_solution(db, crossword_id) is None:
+        raise HTTPException(status_code=404, detail="Crossword not found")
+
+    attempt = start_attempt(db, crossword_id, user["user_id"])
+    return CrosswordAttemptStartResponse(
+        attempt_id=attempt.id,
+        crossword_id=crossword_id,
+        started_at=attempt.started_at.isoformat()
+    )
+
+
+@router.post(
+    "/{crossword_id}/attempts/{attempt_id}/complete",
+    response_model=CrosswordAttemptCompleteResponse
+)
+def complete_crossword_attempt(
+    crossword_id: int,
+    attempt_id: int,
+    payload: CrosswordCheckRequest,
+    db: Session = Depends(get_db),
+    user: dict = Depends(require_access_token)
+) -> CrosswordAttemptCompleteResponse:
+    """
+    Check and finish an attempt, timing it from its start, and rank it.
+    Only the player's first completed attempt is ranked; later ones are
+    checked but leave the leaderboard as it is.
+    The client-reported time_taken_seconds is ignored here.
+    """
+    attempt = db.get(CrosswordAttempt, attempt_id)
+    if attempt is None or attempt.crossword_id != crossword_id or attempt.user_id != user["user_id"]:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    if attempt.completed_at is not None:
+        raise HTTPException(status_code=409, detail="Attempt already completed")
+    # Completing is atomic (see complete_attempt); the check above only saves work
+
+    solution = get_solution(db, crossword_id)
+    if solution is None:
+        raise HTTPException(status_code=404, detail="Crossword not found")
+    try:
+        answers = normalize_answers(solution, payload.answers)
+    except AnswerFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = check_answers(solution, answers)
+    try:
+        standing = complete_attempt(db, attempt, result)
+    except AttemptAlreadyCompletedError:
+        raise HTTPException(status_code=409, detail="Attempt already completed")
+
+    return CrosswordAttemptCompleteResponse(
+        crossword_id=crossword_id,
+        attempt_id=attempt_id,
+        correct_cells=result.correct_cells,
+        total_cells=result.total_cells,
+        accuracy=result.accuracy,
+        solved=result.solved,
+        results=result.results,
+        time_taken_seconds=attempt.time_taken_seconds,
+        ranked=standing.ranked,
+        rank=standing.rank,
+        players=standing.players,
+        percentile=standing.percentile,
+        best_time_seconds=standing.best_time_seconds,
+        best_accuracy=standing.best_correct_cells / result.total_cells if result.total_cells else 0.0
+    )
+
+
+@router.get("/{crossword_id}/leaderboard", response_model=LeaderboardResponse)
+def crossword_leaderboard(
+    crossword_id: int,
+    limit: int = Query(default=10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    user: Optional[dict] = Depends(optional_access_token)
+) -> Response:
+    """
+    Get the top players of a crossword and, for signed-in users, their own rank.
+    Ranked by fewest wrong cells, then fastest time.
+    """
+    solution = get_solution(db, crossword_id)
+    if solution is None:
+        raise HTTPException(status_code=404, detail="Crossword not found")
+
+    board = get_leaderboard(db, crossword_id)
+    top = board.top(limit)
+    solution_cells = solution.total_cells
+
+    users = {
+        u.id: u for u in
+        db.query(User.id, User.name, User.profile_picture)
+        .filter(User.id.in_([user_id for user_id, _ in top]))
+    } if top else {}
+
+    # Plain dicts in the LeaderboardResponse shape, sent without re-validation
+    entries = [
+        {
+            "rank": board.rank_of(key),
+            "user_id": user_id,
+            "name": users[user_id].name if user_id in users else None,
+            "profile_picture": users[user_id].profile_picture if user_id in users else None,
+            "time_taken_seconds": key[1],
+            "accuracy": (solution_cells - key[0]) / solution_cells if solution_cells else 0.0,
+            "solved": key[0] == 0
+        }
+        for user_id, key in top
+    ]
+
+    me = None
+    if user and user.get("user_id"):
+        standing = board.standing(user["user_id"])
+        if standing is not None:
+            me = {"rank": standing[0], "players": standing[1], "percentile": standing[2]}
+
+    return json_response({
+        "crossword_id": crossword_id,
+        "players": len(board),
+        "fastest_time_seconds": top[0][1][1] if top and top[0][1][0] == 0 else None,
+        "entries": entries,
+        "me": me
+    })
 
 
 @router.post("/check")
@@ -162,6 +426,8 @@ def check_crossword(
 ) -> Dict[str, Any]:
     """
     Check crossword answers against the correct solutions.
+    Legacy endpoint for puzzles that are not stored; prefer
+    /crossword/{crossword_id}/check, which checks against the stored solution.
     
     Args:
         payload: Request containing grid and words with answers
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from typing import Any, Dict
+from app.core.db import pool_stats
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/db-pool")
+def get_db_pool_metrics() -> Dict[str, Any]:
+    """
+    Get this worker's database pool telemetry: checkout wait times, checkout
+    timeouts, connections checked out / idle, and overflow in use.
+    """
+    return pool_stats()
@@ -1,32 +1,63 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from dotenv import load_dotenv
-import google.generativeai as genai
-from google.api_core import exceptions as google_exceptions
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import TimeoutError as DBTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
 import base64
-import os
-import json
-import hashlib
-from typing import Optional, List, Dict, Any
+import logging
+from typing import Optional, List, Dict, Any, BinaryIO, Iterable, Iterator
+
+from app.core.db import get_async_db
+from app.core.responses import json_response
+from app.services import mnemonic_service
+from app.services.blob_store import get_blob_store, is_valid_digest, sniff_image_type
+from app.services.ai_service import (
+    GeminiClient,
+    AIServiceError,
+    AIResponseError,
+    AITimeoutError,
+    get_ai_client,
+)
 
-from app.core.db import get_db
-from app.models.mnemonic_cache import MnemonicCache
+router = APIRouter(prefix="/mnemonic", tags=["Mnemonic"])
 
-load_dotenv()
+# Images are content-addressed, so a URL never changes what it points to
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
-API_KEY = os.getenv("GEMINI_API_KEY")
-if API_KEY is None:
-    raise RuntimeError("GEMINI_API_KEY environment variable is not set")
 
-genai.configure(api_key=API_KEY)
+def _ai_http_error(e: Exception, what: str) -> HTTPException:
+    """Map an AI service failure (or database pool timeout) to the HTTP error returned to the client."""
+    if isinstance(e, DBTimeoutError):
+        return HTTPException(status_code=503, detail=f"Failed to generate {what}: database is busy")
+    if isinstance(e, AITimeoutError):
+        return HTTPException(status_code=504, detail=f"Timed out generating {what}: {str(e)}")
+    if isinstance(e, AIResponseError):
+        return HTTPException(status_code=500, detail=f"Failed to parse {what} response: {str(e)}")
+    return HTTPException(status_code=503, detail=f"Failed to generate {what}: {str(e)}")
 
-router = APIRouter(prefix="/mnemonic", tags=["Mnemonic"])
+
+def _image_url(image_sha256: Optional[str]) -> Optional[str]:
+    """Path of the streaming endpoint serving an image digest."""
+    return f"{router.prefix}/image/{image_sha256}" if image_sha256 else None
+
+
+def _image_base64(image_sha256: Optional[str]) -> Optional[str]:
+    """Inline base64 copy of a stored image, for clients that still expect it."""
+    if not image_sha256:
+        return None
+    data = mnemonic_service.load_image(image_sha256)
+    return base64.b64encode(data).decode("utf-8") if data else None
 
 
-def _hash_string(s: str) -> str:
-    """Generate SHA256 hash of a string for cache keys."""
-    return hashlib.sha256(s.lower().strip().encode()).hexdigest()
+def _images_base64(digests: Iterable[str]) -> Dict[str, str]:
+    """Inline base64 copies of the images the blob store still has, by digest."""
+    images = {}
+    for digest in digests:
+        encoded = _image_base64(digest)
+        if encoded is not None:
+            images[digest] = encoded
+    return images
 
 
 class MnemonicRequest(BaseModel):
@@ -53,6 +84,8 @@ class MnemonicTextResponse(BaseModel):
 class MnemonicImageResponse(BaseModel):
     """Response schema for image-only mnemonic generation."""
     image_base64: Optional[str] = None
+    image_sha256: Optional[str] = None
+    image_url: Optional[str] = None  # Served by GET /mnemonic/image/{image_sha256}
     cached: bool = False
 
 
@@ -65,12 +98,16 @@ class MnemonicImageRequest(BaseModel):
 
 
 @router.post("/generate", response_model=MnemonicResponse)
-async def generate_mnemonic(req: MnemonicRequest) -> MnemonicResponse:
+async def generate_mnemonic(
+    req: MnemonicRequest,
+    ai: GeminiClient = Depends(get_ai_client)
+) -> MnemonicResponse:
     """
     Generate a mnemonic (memory aid) for a word using AI.
     
     Args:
         req: Request containing word and definition
+        ai: Shared Gemini client
     
     Returns:
         MnemonicResponse with mnemonic word, sentence, and optional image
@@ -78,122 +115,19 @@ async def generate_mnemonic(req: MnemonicRequest) -> MnemonicResponse:
     Raises:
         HTTPException: If AI service fails or returns invalid data
     """
-    # ----------------------------------------------------------
-    # 1. Generate mnemonic JSON
-    # ----------------------------------------------------------
-    prompt_text = f"""
-    Create mnemonic JSON.
-
-    Word: {req.word}
-    Definition: {req.definition}
-
-    STRICT OUTPUT:
-    {{
-      "mnemonic_word": "...",
-      "mnemonic_sentence": "..."
-    }}
-    """
-
-    try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        text_res = model.generate_content(contents=[prompt_text])
-    except (google_exceptions.GoogleAPIError, Exception) as e:
-        raise HTTPException(
-            status_code=503,
-            detail=f"Failed to generate mnemonic text: {str(e)}"
-        )
-
-    if not text_res or not text_res.text:
-        raise HTTPException(
-            status_code=503,
-            detail="Empty response from AI service"
-        )
-
-    # Clean markdown
-    raw = text_res.text.strip()
-    raw = raw.replace("```json", "").replace("```", "")
-    raw = raw.replace("**", "")
-    raw = raw.strip()
-
     try:
-        parsed = json.loads(raw)
-        mnemonic_word = parsed.get("mnemonic_word")
-        mnemonic_sentence = parsed.get("mnemonic_sentence")
-        
-        if not mnemonic_word or not mnemonic_sentence:
-            raise ValueError("Missing required fields in response")
-    except (json.JSONDecodeError, KeyError, ValueError) as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to parse mnemonic response: {str(e)}"
-        )
-
-    # ----------------------------------------------------------
-    # 2. Generate image
-    # ----------------------------------------------------------
-    # Image should combine the mnemonic (for the word being learned) with the definition context
-    prompt_image = (
-        f"Funny colorful cartoon illustration representing the mnemonic: {mnemonic_sentence}. "
-        f"This is a memory aid for the word '{req.word}' which means: {req.definition}. "
-        "No text in the image. Highly visual and memorable. "
-        "The illustration should help remember the word through the mnemonic connection."
-    )
+        mnemonic_word, mnemonic_sentence = await ai.generate_mnemonic_text(req.word, req.definition)
+    except (AIServiceError, DBTimeoutError) as e:
+        raise _ai_http_error(e, "mnemonic text")
 
+    # Image generation failure is not critical in combined endpoint
     image_base64 = None
     try:
-        print(f"🖼️ Generating image in combined endpoint for word: {req.word}")
-        try:
-            img_model = genai.GenerativeModel("gemini-2.5-flash-image")
-        except:
-            try:
-                img_model = genai.GenerativeModel("gemini-2.0-flash-exp")
-            except:
-                img_model = genai.GenerativeModel("gemini-2.5-flash")
-        print(f"📝 Image prompt: {prompt_image[:100]}...")
-        img_res = img_model.generate_content(prompt_image)
-        print(f"✅ Image generation response received")
-
-        # Extract raw bytes from inline_data
-        if img_res and img_res.parts:
-            print(f"📦 Checking {len(img_res.parts)} parts for image data")
-            for i, part in enumerate(img_res.parts):
-                print(f"  Part {i}: has inline_data={part.inline_data is not None}")
-                if part.inline_data is not None:
-                    print(f"  Part {i}: mime_type={part.inline_data.mime_type}")
-                    print(f"  Part {i}: data type={type(part.inline_data.data)}, length={len(part.inline_data.data) if part.inline_data.data else 0}")
-                    
-                    if part.inline_data.data:
-                        if isinstance(part.inline_data.data, bytes):
-                            raw_bytes = part.inline_data.data
-                            image_base64 = base64.b64encode(raw_bytes).decode("utf-8")
-                            print(f"✅ Image extracted from bytes: {len(image_base64)} chars base64")
-                        elif isinstance(part.inline_data.data, str):
-                            try:
-                                base64.b64decode(part.inline_data.data)
-                                image_base64 = part.inline_data.data
-                                print(f"✅ Image extracted from string (already base64): {len(image_base64)} chars")
-                            except:
-                                image_base64 = base64.b64encode(part.inline_data.data.encode()).decode("utf-8")
-                                print(f"✅ Image extracted from string (encoded): {len(image_base64)} chars base64")
-                        else:
-                            raw_bytes = bytes(part.inline_data.data)
-                            image_base64 = base64.b64encode(raw_bytes).decode("utf-8")
-                            print(f"✅ Image extracted (converted to bytes): {len(image_base64)} chars base64")
-                        
-                        if image_base64 and len(image_base64) > 0:
-                            break
-            else:
-                print(f"⚠️ No inline_data found in response parts")
-                if hasattr(img_res, 'text') and img_res.text:
-                    print(f"📄 Response text: {img_res.text[:200]}")
-        else:
-            print(f"⚠️ No parts in response")
-    except (google_exceptions.GoogleAPIError, Exception) as e:
-        # Image generation failure is not critical in combined endpoint
-        import logging
-        error_msg = f"Image generation failed (non-critical): {str(e)}"
-        logging.warning(error_msg)
-        print(f"⚠️ {error_msg}")
+        image_bytes = await ai.generate_mnemonic_image(req.word, req.definition, mnemonic_sentence)
+        if image_bytes:
+            image_base64 = base64.b64encode(image_bytes).decode("utf-8")
+    except AIServiceError as e:
+        logging.warning(f"Image generation failed (non-critical): {str(e)}")
 
     return MnemonicResponse(
         mnemonic_word=mnemonic_word,
@@ -205,7 +139,8 @@ async def generate_mnemonic(req: MnemonicRequest) -> MnemonicResponse:
 @router.post("/generate-text", response_model=MnemonicTextResponse)
 async def generate_mnemonic_text(
     req: MnemonicRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    ai: GeminiClient = Depends(get_ai_client)
 ) -> MnemonicTextResponse:
     """
     Generate mnemonic text only (fast, ~2 seconds).
@@ -214,119 +149,33 @@ async def generate_mnemonic_text(
     Args:
         req: Request containing word and definition
         db: Database session
+        ai: Shared Gemini client
     
     Returns:
         MnemonicTextResponse with mnemonic word and sentence
     """
-    # Generate cache key
-    word_hash = _hash_string(req.word)
-    definition_hash = _hash_string(req.definition)
     language = req.language or "en"  # Default to 'en' if not specified
-    
-    # Check cache first
-    cached = db.query(MnemonicCache).filter(
-        MnemonicCache.word_hash == word_hash,
-        MnemonicCache.language == language,
-        MnemonicCache.definition_hash == definition_hash
-    ).first()
-    
-    if cached and cached.mnemonic_word and cached.mnemonic_sentence:
-        return MnemonicTextResponse(
-            mnemonic_word=cached.mnemonic_word,
-            mnemonic_sentence=cached.mnemonic_sentence,
-            cached=True
-        )
-    
-    # Generate mnemonic text
-    prompt_text = f"""
-    Create mnemonic JSON.
-
-    Word: {req.word}
-    Definition: {req.definition}
-
-    STRICT OUTPUT:
-    {{
-      "mnemonic_word": "...",
-      "mnemonic_sentence": "..."
-    }}
-    """
 
+    # Checks cache first; concurrent misses for the same word share one generation
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        text_res = model.generate_content(contents=[prompt_text])
-    except (google_exceptions.GoogleAPIError, Exception) as e:
-        raise HTTPException(
-            status_code=503,
-            detail=f"Failed to generate mnemonic text: {str(e)}"
-        )
-
-    if not text_res or not text_res.text:
-        raise HTTPException(
-            status_code=503,
-            detail="Empty response from AI service"
+        mnemonic_word, mnemonic_sentence, cached = await mnemonic_service.get_or_generate_text(
+            db, ai, req.word, req.definition, language
         )
-
-    # Clean markdown
-    raw = text_res.text.strip()
-    raw = raw.replace("```json", "").replace("```", "")
-    raw = raw.replace("**", "")
-    raw = raw.strip()
-
-    try:
-        parsed = json.loads(raw)
-        mnemonic_word = parsed.get("mnemonic_word")
-        mnemonic_sentence = parsed.get("mnemonic_sentence")
-        
-        if not mnemonic_word or not mnemonic_sentence:
-            raise ValueError("Missing required fields in response")
-    except (json.JSONDecodeError, KeyError, ValueError) as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to parse mnemonic response: {str(e)}"
-        )
-    
-    # Save to cache (without image for now)
-    # Use merge to handle case where entry might already exist
-    try:
-        existing = db.query(MnemonicCache).filter(
-            MnemonicCache.word_hash == word_hash,
-            MnemonicCache.language == language,
-            MnemonicCache.definition_hash == definition_hash
-        ).first()
-        
-        if existing:
-            # Update existing entry
-            existing.mnemonic_word = mnemonic_word
-            existing.mnemonic_sentence = mnemonic_sentence
-        else:
-            # Create new entry
-            cache_entry = MnemonicCache(
-                word_hash=word_hash,
-                language=language,
-                definition_hash=definition_hash,
-                mnemonic_word=mnemonic_word,
-                mnemonic_sentence=mnemonic_sentence,
-                image_base64=None  # Image will be added later
-            )
-            db.add(cache_entry)
-        db.commit()
-    except Exception as e:
-        # If cache save fails, continue anyway (not critical)
-        db.rollback()
-        import logging
-        logging.warning(f"Failed to cache mnemonic: {str(e)}")
+    except (AIServiceError, DBTimeoutError) as e:
+        raise _ai_http_error(e, "mnemonic text")
 
     return MnemonicTextResponse(
         mnemonic_word=mnemonic_word,
         mnemonic_sentence=mnemonic_sentence,
-        cached=False
+        cached=cached
     )
 
 
 @router.post("/generate-image", response_model=MnemonicImageResponse)
 async def generate_mnemonic_image(
     req: MnemonicImageRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    ai: GeminiClient = Depends(get_ai_client)
 ) -> MnemonicImageResponse:
     """
     Generate mnemonic image only (slower, ~8 seconds).
@@ -335,163 +184,73 @@ async def generate_mnemonic_image(
     Args:
         req: Request containing word, definition, and mnemonic sentence
         db: Database session
+        ai: Shared Gemini client
     
     Returns:
         MnemonicImageResponse with base64 image
     """
-    # Generate cache key
-    word_hash = _hash_string(req.word)
-    definition_hash = _hash_string(req.definition)
     language = req.language or "en"  # Default to 'en' if not specified
-    
-    # Check cache first
-    cached = db.query(MnemonicCache).filter(
-        MnemonicCache.word_hash == word_hash,
-        MnemonicCache.language == language,
-        MnemonicCache.definition_hash == definition_hash
-    ).first()
-    
-    if cached and cached.image_base64:
-        return MnemonicImageResponse(
-            image_base64=cached.image_base64,
-            cached=True
-        )
-    
-    # Generate image
-    prompt_image = (
-        f"Funny colorful cartoon illustration representing the mnemonic: {req.mnemonic_sentence}. "
-        f"This is a memory aid for the word '{req.word}' which means: {req.definition}. "
-        "No text in the image. Highly visual and memorable. "
-        "The illustration should help remember the word through the mnemonic connection."
-    )
 
-    image_base64 = None
+    # Checks cache first; concurrent misses for the same word share one generation
     try:
-        print(f"🖼️ Generating image for word: {req.word}")
-        # Use gemini-2.5-flash-image for image generation (official Google model)
-        try:
-            img_model = genai.GenerativeModel("gemini-2.5-flash-image")
-        except Exception as model_err:
-            print(f"⚠️ Model gemini-2.5-flash-image not available, trying alternatives: {model_err}")
-            # Fallback options
-            try:
-                img_model = genai.GenerativeModel("gemini-2.0-flash-exp")
-            except:
-                try:
-                    img_model = genai.GenerativeModel("gemini-1.5-flash")
-                except:
-                    img_model = genai.GenerativeModel("gemini-pro")
-        
-        print(f"📝 Image prompt: {prompt_image[:100]}...")
-        img_res = img_model.generate_content(prompt_image)
-        print(f"✅ Image generation response received, type: {type(img_res)}")
-
-        # Extract raw bytes from inline_data
-        if img_res and img_res.parts:
-            print(f"📦 Checking {len(img_res.parts)} parts for image data")
-            for i, part in enumerate(img_res.parts):
-                print(f"  Part {i}: has inline_data={part.inline_data is not None}")
-                if part.inline_data is not None:
-                    print(f"  Part {i}: mime_type={part.inline_data.mime_type}")
-                    print(f"  Part {i}: data type={type(part.inline_data.data)}, length={len(part.inline_data.data) if part.inline_data.data else 0}")
-                    
-                    # Try different ways to extract the data
-                    if part.inline_data.data:
-                        # Data might be bytes or base64 string
-                        if isinstance(part.inline_data.data, bytes):
-                            raw_bytes = part.inline_data.data
-                            image_base64 = base64.b64encode(raw_bytes).decode("utf-8")
-                            print(f"✅ Image extracted from bytes: {len(image_base64)} chars base64")
-                        elif isinstance(part.inline_data.data, str):
-                            # Already a base64 string or needs encoding
-                            try:
-                                # Try to decode if it's base64, otherwise encode it
-                                base64.b64decode(part.inline_data.data)
-                                image_base64 = part.inline_data.data
-                                print(f"✅ Image extracted from string (already base64): {len(image_base64)} chars")
-                            except:
-                                # Not base64, encode it
-                                image_base64 = base64.b64encode(part.inline_data.data.encode()).decode("utf-8")
-                                print(f"✅ Image extracted from string (encoded): {len(image_base64)} chars base64")
-                        else:
-                            # Try to convert to bytes
-                            raw_bytes = bytes(part.inline_data.data)
-                            image_base64 = base64.b64encode(raw_bytes).decode("utf-8")
-                            print(f"✅ Image extracted (converted to bytes): {len(image_base64)} chars base64")
-                        
-                        if image_base64 and len(image_base64) > 0:
-                            break
-                    
-            if not image_base64 or len(image_base64) == 0:
-                print(f"⚠️ No image data extracted from parts")
-                # Check if response has text (maybe error message)
-                if hasattr(img_res, 'text') and img_res.text:
-                    print(f"📄 Response text: {img_res.text[:500]}")
-                    
-                    # Try to extract base64 from text if it's in the response
-                    import re
-                    base64_match = re.search(r'data:image/[^;]+;base64,([A-Za-z0-9+/=]+)', img_res.text)
-                    if base64_match:
-                        image_base64 = base64_match.group(1)
-                        print(f"✅ Extracted base64 from response text: {len(image_base64)} chars")
-        else:
-            print(f"⚠️ No parts in response, response: {img_res}")
-            
-        if not image_base64 or len(image_base64) == 0:
-            raise ValueError(f"Image generation returned empty data. Response had {len(img_res.parts) if img_res and img_res.parts else 0} parts.")
-            
-    except (google_exceptions.GoogleAPIError, Exception) as e:
-        # Image generation failure - log and raise
-        import logging
-        error_msg = f"Image generation failed: {str(e)}"
-        logging.error(error_msg, exc_info=True)
-        print(f"❌ {error_msg}")
-        print(f"❌ Exception type: {type(e).__name__}")
-        print(f"❌ Full traceback:")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(
-            status_code=503,
-            detail=f"Image generation is currently unavailable. Gemini models analyze images but don't generate them. {str(e)}"
+        image_sha256, cached = await mnemonic_service.get_or_generate_image(
+            db, ai, req.word, req.definition, language, req.mnemonic_sentence
         )
-    
-    # Update cache with image
-    if image_base64:
-        try:
-            # Find or create cache entry
-            cache_entry = db.query(MnemonicCache).filter(
-                MnemonicCache.word_hash == word_hash,
-                MnemonicCache.language == language,
-                MnemonicCache.definition_hash == definition_hash
-            ).first()
-            
-            if cache_entry:
-                # Update existing cache entry with image
-                cache_entry.image_base64 = image_base64
-            else:
-                # Create new cache entry (edge case - text endpoint wasn't called first)
-                cache_entry = MnemonicCache(
-                    word_hash=word_hash,
-                    language=language,
-                    definition_hash=definition_hash,
-                    mnemonic_word="",  # Empty if text wasn't generated first
-                    mnemonic_sentence=req.mnemonic_sentence,
-                    image_base64=image_base64
-                )
-                db.add(cache_entry)
-            db.commit()
-        except Exception as e:
-            # If cache update fails, continue anyway (not critical)
-            db.rollback()
-            import logging
-            logging.warning(f"Failed to update cache with image: {str(e)}")
+    except (AIServiceError, DBTimeoutError) as e:
+        logging.error(f"Image generation failed: {str(e)}", exc_info=True)
+        raise _ai_http_error(e, "mnemonic image")
+
+    # Blob reads are blocking I/O (a database query by default)
+    image_base64 = await run_in_threadpool(_image_base64, image_sha256)
 
     return MnemonicImageResponse(
         image_base64=image_base64,
-        cached=False
+        image_sha256=image_sha256,
+        image_url=_image_url(image_sha256),
+        cached=cached
     )
 
 
+def _iter_blob(f: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    with f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+@router.get("/image/{image_sha256}")
+def get_mnemonic_image(image_sha256: str, request: Request) -> Response:
+    """
+    Stream a mnemonic image from the blob store.
+    
+    The digest is the ETag and the response is cacheable forever, so
+    browsers and CDNs only ever download an image once.
+    
+    Args:
+        image_sha256: SHA-256 digest of the image
+        request: Incoming request (for If-None-Match)
+    
+    Returns:
+        Image bytes, or 304 if the client already has them
+    """
+    if not is_valid_digest(image_sha256):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    etag = f'"{image_sha256}"'
+    headers = {"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in if_none_match or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    f = get_blob_store().open(image_sha256)
+    if f is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    media_type = sniff_image_type(f.read(16))
+    f.seek(0)
+    return StreamingResponse(_iter_blob(f), media_type=media_type, headers=headers)
+
+
 class CachedMnemonicRequest(BaseModel):
     """Request schema for fetching cached mnemonics."""
     word: str = Field(..., min_length=1, description="Word to look up")
@@ -507,12 +266,18 @@ class CachedMnemonicResponse(BaseModel):
     mnemonic_word: Optional[str] = None
     mnemonic_sentence: Optional[str] = None
     image_base64: Optional[str] = None
+    image_sha256: Optional[str] = None
+    image_url: Optional[str] = None
     found: bool = False
 
 
 class BulkCachedMnemonicRequest(BaseModel):
     """Request schema for fetching multiple cached mnemonics."""
     words: List[CachedMnemonicRequest] = Field(..., description="List of words to look up")
+    include_images: bool = Field(
+        default=True,
+        description="Inline image_base64 in results; when false only image_url/image_sha256 are returned"
+    )
 
 
 class BulkCachedMnemonicResponse(BaseModel):
@@ -523,11 +288,12 @@ class BulkCachedMnemonicResponse(BaseModel):
 @router.post("/get-cached", response_model=BulkCachedMnemonicResponse)
 async def get_cached_mnemonics(
     req: BulkCachedMnemonicRequest,
-    db: Session = Depends(get_db)
-) -> BulkCachedMnemonicResponse:
+    db: AsyncSession = Depends(get_async_db)
+) -> Response:
     """
-    Fetch cached mnemonics for multiple words.
+    Fetch cached mnemonics for multiple words in a single query.
     Useful for displaying word history with images.
+    Results are returned in request order, one per requested word.
     
     Args:
         req: Request containing list of words to look up
@@ -536,37 +302,59 @@ async def get_cached_mnemonics(
     Returns:
         BulkCachedMnemonicResponse with cached mnemonic data for each word
     """
-    results = []
+    keys = [
+        mnemonic_service.cache_key(w.word, w.definition, w.language.lower())
+        for w in req.words
+    ]
+    # One round trip for all (deduplicated) keys not already in memory
+    found = await db.run_sync(mnemonic_service.lookup_many, keys)
     
-    for word_req in req.words:
-        # Generate cache key
-        word_hash = _hash_string(word_req.word)
-        definition_hash = _hash_string(word_req.definition)
-        language = word_req.language.lower()
-        
-        # Look up in cache
-        cached = db.query(MnemonicCache).filter(
-            MnemonicCache.word_hash == word_hash,
-            MnemonicCache.language == language,
-            MnemonicCache.definition_hash == definition_hash
-        ).first()
+    # Each distinct image is read once, even if several entries share it.
+    # Images missing from the blob store are reported as absent, so clients
+    # regenerate them instead of following a dead image_url.
+    digests = {cached.image_sha256 for cached in found.values() if cached.image_sha256}
+    if req.include_images:
+        images: Dict[str, Optional[str]] = await run_in_threadpool(_images_base64, digests)
+    else:
+        images = dict.fromkeys(await run_in_threadpool(get_blob_store().existing, digests))
+    
+    # Plain dicts in the CachedMnemonicResponse shape, sent without re-validation
+    results = []
+    for word_req, key in zip(req.words, keys):
+        cached = found.get(key)
         
         if cached:
-            results.append(CachedMnemonicResponse(
-                word=word_req.word,
-                definition=word_req.definition,
-                language=word_req.language,
-                mnemonic_word=cached.mnemonic_word if cached.mnemonic_word else None,
-                mnemonic_sentence=cached.mnemonic_sentence if cached.mnemonic_sentence else None,
-                image_base64=cached.image_base64 if cached.image_base64 else None,
-                found=True
-            ))
+            image_sha256 = cached.image_sha256 if cached.image_sha256 in images else None
+            results.append({
+                "word": word_req.word,
+                "definition": word_req.definition,
+                "language": word_req.language,
+                "mnemonic_word": cached.mnemonic_word or None,
+                "mnemonic_sentence": cached.mnemonic_sentence or None,
+                "image_base64": images.get(image_sha256) if image_sha256 else None,
+                "image_sha256": image_sha256,
+                "image_url": _image_url(image_sha256),
+                "found": True
+            })
         else:
-            results.append(CachedMnemonicResponse(
-                word=word_req.word,
-                definition=word_req.definition,
-                language=word_req.language,
-                found=False
-            ))
+            results.append({
+                "word": word_req.word,
+                "definition": word_req.definition,
+                "language": word_req.language,
+                "mnemonic_word": None,
+                "mnemonic_sentence": None,
+                "image_base64": None,
+                "image_sha256": None,
+                "image_url": None,
+                "found": False
+            })
     
-    return BulkCachedMnemonicResponse(results=results)
+    return json_response({"results": results})
+
+
+@router.get("/cache-stats")
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Get hit/miss/eviction counters of this worker's in-memory mnemonic cache.
+    """
+    return mnemonic_service.cache_stats()
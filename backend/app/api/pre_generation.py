@@ -1,65 +1,104 @@
 """
 API endpoint for triggering pre-generation of mnemonics.
 """
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from app.core.db import get_db
-from app.services.pre_generation import pre_generate_all_combinations
-import asyncio
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import get_async_db
+from app.models.mnemonic_cache import MnemonicCache
+from app.models.pre_generation_job import PreGenerationJob
+from app.services.pre_generation_jobs import (
+    JobAlreadyRunning,
+    create_job,
+    describe_job,
+    get_latest_job,
+    launch_job,
+)
 
 router = APIRouter(prefix="/pre-generation", tags=["Pre-Generation"])
 
 
-@router.post("/run")
+@router.post("/run", status_code=202)
 async def trigger_pre_generation(
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    run_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Trigger pre-generation of mnemonics for all language/level combinations.
-    This runs in the background to avoid blocking the request.
+    Returns a job id immediately; the job runs in a background worker thread.
+    Poll /pre-generation/status (or /pre-generation/jobs/{job_id}) for progress.
+    Only one job per date can be active; a second request gets 409.
     """
     try:
-        # Run pre-generation in background
-        loop = asyncio.get_event_loop()
-        stats = await pre_generate_all_combinations(db)
-        
-        return {
-            "status": "success",
-            "message": "Pre-generation completed",
-            "stats": stats
-        }
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Pre-generation failed: {str(e)}"
+        job = await db.run_sync(create_job, run_date)
+    except JobAlreadyRunning as e:
+        return JSONResponse(
+            status_code=409,
+            content={
+                "status": "already_running",
+                "message": str(e),
+                "job_id": e.job_id,
+            }
         )
 
+    launch_job(job.id)
+
+    return {
+        "status": job.status,
+        "message": "Pre-generation started",
+        "job_id": job.id,
+        "run_date": job.run_date.isoformat(),
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_pre_generation_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get progress, ETA and errors for a pre-generation job."""
+    job = await db.get(PreGenerationJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return await db.run_sync(describe_job, job)
+
 
 @router.get("/status")
 async def get_pre_generation_status(
-    db: Session = Depends(get_db)
+    job_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get status of pre-generated mnemonics.
-    Returns count of cached mnemonics per language/level.
+    Returns count of cached mnemonics per language/level, plus live progress
+    of the given job (default: the latest job for today).
     """
-    from app.models.mnemonic_cache import MnemonicCache
-    from sqlalchemy import func
-    
     # Count cached mnemonics with images per language
-    stats = (
-        db.query(
+    stats = (await db.execute(
+        select(
             MnemonicCache.language,
             func.count(MnemonicCache.id).label('count')
         )
-        .filter(MnemonicCache.image_base64.isnot(None))
+        .where(or_(
+            MnemonicCache.image_sha256.isnot(None),
+            MnemonicCache.image_base64.isnot(None)  # not yet moved to the blob store
+        ))
         .group_by(MnemonicCache.language)
-        .all()
-    )
+    )).all()
+
+    if job_id is not None:
+        job = await db.get(PreGenerationJob, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+    else:
+        job = await db.run_sync(get_latest_job, date.today())
     
     return {
         "status": "ok",
-        "cached_mnemonics": {lang: count for lang, count in stats}
+        "cached_mnemonics": {lang: count for lang, count in stats},
+        "job": await db.run_sync(describe_job, job) if job is not None else None
     }
-
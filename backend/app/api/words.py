@@ -1,63 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from datetime import date
-from typing import Optional, List
+from typing import Collection, Optional, List
 from app.core.db import get_db
 from app.models.vocabulary import Vocabulary
-from app.models.user_word_history import UserWordHistory
+from app.core.responses import json_response, rows_to_dicts
 from app.core.security import optional_access_token
 from app.schemas.words import DailyWordsRequest, DailyWordsResponse, WordOut
-from app.services.word_service import get_daily_words_for_user, assign_daily_words
-from sqlalchemy import func
+from app.services.word_service import get_daily_words_for_user, assign_daily_words, record_served_words
+from app.services import word_sampler
 
 router = APIRouter(prefix="/words", tags=["Words"])
 
+WORD_OUT_FIELDS = tuple(WordOut.model_fields)
 
-def get_random_words(db: Session, limit: int = 10, level: Optional[str] = None) -> List[Vocabulary]:
+
+def get_random_words(
+    db: Session,
+    limit: int = 10,
+    level: Optional[str] = None,
+    exclude: Optional[Collection[int]] = None
+) -> List[Vocabulary]:
     """
-    Get random words from database (database-agnostic approach).
+    Get random words from database using the in-memory id index.
     
     Args:
         db: Database session
         limit: Number of words to return
         level: Optional difficulty level filter (a1, a2, b1, b2)
+        exclude: Optional word ids to leave out
     
     Returns:
         List of random Vocabulary objects
     """
-    query = db.query(Vocabulary)
-    
-    # Filter by level if provided
-    if level:
-        query = query.filter(Vocabulary.level == level)
-    
-    # Check total count for debugging
-    total_count = query.count()
-    print(f"🔍 Database query: level={level}, total words matching={total_count}")
+    words = word_sampler.sample_words(db, limit, level=level, exclude=exclude)
     
-    if total_count == 0:
+    if not words:
         print(f"⚠️ WARNING: No words found with level={level}")
-        # Try without level filter to see if any words exist
-        all_count = db.query(Vocabulary).count()
-        print(f"🔍 Total words in database (all levels): {all_count}")
-        return []
+        print(f"🔍 Total words in database (all levels): {word_sampler.level_size(db)}")
     
-    # Try PostgreSQL/SQLite random(), fallback to Python random if needed
-    try:
-        words = (
-            query
-            .order_by(func.random())
-            .limit(limit)
-            .all()
-        )
-        print(f"✅ Retrieved {len(words)} words from database")
-        return words
-    except Exception as e:
-        print(f"❌ Error in get_random_words: {e}")
-        # Fallback: get all and shuffle in Python (not ideal for large datasets)
-        import random
-        all_words = query.all()
-        return random.sample(all_words, min(limit, len(all_words)))
+    return words
+
+
+def _daily_words_response(day: date, words: List[Vocabulary]) -> Response:
+    """DailyWordsResponse body built straight from the rows (no per-word model validation)."""
+    return json_response({
+        "date": day.isoformat(),
+        "count": len(words),
+        "words": rows_to_dicts(words, WORD_OUT_FIELDS),
+    })
 
 
 @router.post("/daily", response_model=DailyWordsResponse)
@@ -65,7 +56,7 @@ def get_daily_words(
     request: DailyWordsRequest = DailyWordsRequest(),
     db: Session = Depends(get_db),
     user: Optional[dict] = Depends(optional_access_token)
-) -> DailyWordsResponse:
+) -> Response:
     """
     Get daily words for user. Returns cached words if available for today,
     otherwise generates and saves new words.
@@ -107,40 +98,26 @@ def get_daily_words(
         if len(words) < limit:
             print(f"⚠️ Warning: Only got {len(deterministic_words)} deterministic words, filling with random")
             remaining_needed = limit - len(words)
-            random_words = get_random_words(db, limit=remaining_needed + 20, level=level)
             deterministic_ids = {w.id for w in deterministic_words}
-            random_words = [w for w in random_words if w.id not in deterministic_ids]
-            words.extend(random_words[:remaining_needed])
-            words = words[:limit]
+            words.extend(get_random_words(db, limit=remaining_needed, level=level, exclude=deterministic_ids))
         
         print(f"✅ Found {len(words)} words in database ({len(deterministic_words)} deterministic)")
         print(f"   First 10 words: {[w.word for w in words[:10]]}")
         
-        return DailyWordsResponse(
-            date=today.isoformat(),
-            count=len(words),
-            words=[WordOut.model_validate(w) for w in words]
-        )
+        return _daily_words_response(today, words)
 
     user_id = user.get("user_id")
     if not user_id:
         raise HTTPException(status_code=400, detail="Invalid user token")
 
     # Check if user already has today's words
-    existing_words = get_daily_words_for_user(db, user_id)
+    existing_words = get_daily_words_for_user(db, user_id, level)
     
     if existing_words:
-        # Filter by level if specified
-        if level:
-            existing_words = [w for w in existing_words if w.level == level]
         # If we have enough words of the requested level, return them
         if len(existing_words) >= 10:
             existing_words = existing_words[:10]
-            return DailyWordsResponse(
-                date=today.isoformat(),
-                count=len(existing_words),
-                words=[WordOut.model_validate(w) for w in existing_words]
-            )
+            return _daily_words_response(today, existing_words)
         # If we have some words but not enough, we'll generate new ones below
 
     # For authenticated users, use deterministic words for first 10
@@ -158,31 +135,13 @@ def get_daily_words(
     # Fallback: if we don't have enough, fill with random
     if len(words) < limit:
         remaining_needed = limit - len(words)
-        random_words = get_random_words(db, limit=remaining_needed + 20, level=level)
         deterministic_ids = {w.id for w in deterministic_words}
-        random_words = [w for w in random_words if w.id not in deterministic_ids]
-        words.extend(random_words[:remaining_needed])
-        words = words[:limit]
-    
-    # Save these words to user history
-    entries = []
-    for w in words:
-        entries.append(
-            UserWordHistory(
-                user_id=user_id,
-                word_id=w.id,
-                served_date=today,
-                completed=False
-            )
-        )
+        words.extend(get_random_words(db, limit=remaining_needed, level=level, exclude=deterministic_ids))
     
-    db.add_all(entries)
+    # Save these words to user history (already-recorded words are skipped)
+    record_served_words(db, user_id, [w.id for w in words], today)
     db.commit()
     
     print(f"✅ Found {len(words)} words for authenticated user ({len(deterministic_words)} deterministic)")
 
-    return DailyWordsResponse(
-        date=today.isoformat(),
-        count=len(words),
-        words=[WordOut.model_validate(w) for w in words]
-    )
+    return _daily_words_response(today, words)
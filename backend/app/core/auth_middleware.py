@@ -0,0 +1,38 @@
+"""
+Authentication middleware: decodes the bearer token once per request.
+
+The claims (or None for anonymous / invalid tokens) are left in
+request.state under AUTH_STATE_KEY, where optional_access_token,
+require_access_token and the user dependencies in app.core.user_context
+pick them up instead of decoding the header again. Written as a plain ASGI
+middleware so it adds no per-request task or body wrapping.
+"""
+from typing import Optional
+
+from app.core.security import AUTH_STATE_KEY, decode_access_token
+
+
+def bearer_token(headers) -> Optional[str]:
+    """Token from an ASGI header list's Authorization: Bearer header, if any."""
+    for name, value in headers:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token.strip():
+                return token.strip()
+            return None
+    return None
+
+
+class AuthMiddleware:
+    """Decode the request's access token into request.state before routing."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            token = bearer_token(scope["headers"])
+            scope.setdefault("state", {})[AUTH_STATE_KEY] = (
+                decode_access_token(token) if token is not None else None
+            )
+        await self.app(scope, receive, send)
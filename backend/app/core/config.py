@@ -0,0 +1,135 @@
+# app/core/config.py
+"""
+Runtime configuration, read once from the environment and backend/.env.
+
+get_settings() builds the Settings object on first call and returns the same
+instance afterwards. Secrets (DATABASE_URL, JWT_SECRET, GOOGLE_CLIENT_ID,
+GEMINI_API_KEY) are optional here so modules can be imported without them;
+whatever needs one asks for it with Settings.require() when first used.
+
+Database pool sizing: sync endpoints run in FastAPI's threadpool (40 threads
+by default), so up to 40 requests can want a connection at once, while
+Postgres caps connections for all workers together. Each worker holds at
+most DB_POOL_SIZE + DB_MAX_OVERFLOW connections per engine; keep
+
+    workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) + scripts/jobs < max_connections
+
+Requests beyond that wait up to DB_POOL_TIMEOUT seconds for a connection to
+be returned. Pre-ping and recycling replace connections the server (or a
+proxy in between) has closed, instead of failing the request that gets one.
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+class Settings(BaseSettings):
+    """Typed application settings; field names are the env var names, lowercased."""
+
+    # backend/.env, then ./.env; real environment variables win over both
+    model_config = SettingsConfigDict(
+        env_file=(BACKEND_DIR / ".env", ".env"),
+        extra="ignore",
+    )
+
+    # --- Secrets, checked when first needed ---
+    database_url: Optional[str] = None
+    jwt_secret: Optional[str] = None
+    google_client_id: Optional[str] = None
+    gemini_api_key: Optional[str] = None
+
+    # Comma-separated allowed origins, or "*" (development)
+    cors_origins: str = "*"
+
+    # --- Database pool ---
+    # Connections kept open per worker
+    db_pool_size: int = 10
+    # Extra connections opened under bursts and closed when returned
+    db_max_overflow: int = 10
+    # Seconds to wait for a connection before failing the request
+    db_pool_timeout: float = 10
+    # Replace connections older than this many seconds (-1 to never recycle)
+    db_pool_recycle: int = 1800
+    # Test connections with a lightweight ping when checked out
+    db_pool_pre_ping: bool = True
+    # Reuse the most recently returned connection, so surplus ones go idle and get recycled
+    db_pool_use_lifo: bool = True
+    # Postgres only: seconds to wait when opening a connection, and the
+    # per-statement timeout in milliseconds (0 disables it)
+    db_connect_timeout: int = 10
+    db_statement_timeout_ms: int = 30000
+
+    # --- Auth ---
+    jwt_algorithm: str = "HS256"
+    auth_claims_cache_size: int = 4096
+    auth_claims_cache_ttl: int = 300
+    auth_user_cache_size: int = 2048
+    auth_user_cache_ttl: int = 60
+
+    # --- Google sign-in (see app/services/google_verifier.py) ---
+    google_certs_url: str = "https://www.googleapis.com/oauth2/v3/certs"
+    google_certs_timeout: float = 5
+    google_certs_default_ttl: int = 300
+    google_certs_refresh_ahead: int = 300
+    google_certs_min_refresh_interval: int = 30
+    google_token_leeway: int = 10
+
+    # --- Gemini ---
+    gemini_max_concurrency: int = 4
+    gemini_text_timeout: float = 30
+    gemini_image_timeout: float = 90
+
+    # --- Mnemonics ---
+    mnemonic_lru_size: int = 256
+    mnemonic_lru_ttl_seconds: float = 600
+    # How long a request waits for another worker's generation of the same
+    # mnemonic before giving up (504)
+    mnemonic_claim_wait_seconds: float = 30
+    # Store images in this directory instead of the database; only for
+    # hosts whose disk survives deploys
+    blob_store_dir: Optional[str] = None
+    pre_gen_text_workers: int = 4
+    pre_gen_image_workers: int = 2
+    pre_gen_text_rpm: float = 60
+    pre_gen_image_rpm: float = 10
+
+    # --- Words ---
+    vocab_index_ttl_seconds: float = 3600
+
+    # --- Crosswords ---
+    crossword_max_grid_size: int = 20
+    crossword_time_budget_ms: float = 50
+    crossword_max_attempts: int = 200
+    crossword_solution_cache_size: int = 256
+    crossword_bank_max_islands: int = 1
+    crossword_bank_min_intersections_per_word: float = 0.9
+    crossword_bank_cache_size: int = 512
+    crossword_bank_index_ttl_seconds: float = 600
+    daily_crossword_cache_size: int = 64
+    daily_crossword_cache_ttl_seconds: float = 86400
+    daily_crossword_time_budget_ms: float = 500
+    leaderboard_cache_size: int = 128
+    leaderboard_reload_seconds: float = 30
+    crossword_ranked_checks_per_minute: float = 2
+
+    def require(self, name: str) -> str:
+        """
+        Return a setting that must be set.
+
+        Raises:
+            RuntimeError: If it is not set
+        """
+        value = getattr(self, name)
+        if value is None:
+            raise RuntimeError(f"{name.upper()} environment variable is not set")
+        return value
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, reading the environment on first call."""
+    return Settings()
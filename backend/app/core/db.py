@@ -1,33 +1,188 @@
 # app/core/db.py
+"""
+Database engines and sessions.
 
-from sqlalchemy import create_engine
+The sync and async engines are created on first use (or by the app's
+lifespan startup), not at import, so models and routers can be imported
+without DATABASE_URL. SessionLocal and AsyncSessionLocal sessions bind to
+them the first time they need a connection.
+"""
+from sqlalchemy import URL, create_engine, make_url, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import DeclarativeMeta
-from dotenv import load_dotenv
-import os
-
-# Load .env file
-load_dotenv()
-
-DATABASE_URL = os.getenv("DATABASE_URL")
-if DATABASE_URL is None:
-    raise RuntimeError("DATABASE_URL environment variable is not set")
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+from app.core.config import get_settings
+from app.core.db_pool import InstrumentedQueuePool
+import hashlib
+import threading
 
 # SQLAlchemy Base
 Base: DeclarativeMeta = declarative_base()
 
-# Engine
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,  # set True for debugging SQL
-    future=True
-)
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+_engine_lock = threading.Lock()
+
+
+def database_url() -> str:
+    """
+    The configured DATABASE_URL.
+
+    Raises:
+        RuntimeError: If DATABASE_URL is not set
+    """
+    return get_settings().require("database_url")
+
+
+def connect_args_for(url: str) -> Dict[str, Any]:
+    """Driver connect arguments: connect and statement timeouts on Postgres."""
+    if make_url(url).get_backend_name() != "postgresql":
+        return {}
+    settings = get_settings()
+    args: Dict[str, Any] = {"connect_timeout": settings.db_connect_timeout}
+    if settings.db_statement_timeout_ms > 0:
+        args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+    return args
+
+
+def async_url_for(url: str) -> Tuple[URL, Dict[str, Any]]:
+    """
+    The async-driver URL for a sync DATABASE_URL, plus its connect arguments.
+
+    Postgres goes through asyncpg, which takes the connect timeout, the
+    statement timeout and sslmode as connect arguments rather than libpq
+    options.
+    """
+    u = make_url(url)
+    if u.get_backend_name() == "sqlite":
+        return u.set(drivername="sqlite+aiosqlite"), {}
+    if u.get_backend_name() != "postgresql":
+        return u, {}
+
+    settings = get_settings()
+    args: Dict[str, Any] = {"timeout": settings.db_connect_timeout}
+    if settings.db_statement_timeout_ms > 0:
+        args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+    if "sslmode" in u.query:
+        args["ssl"] = u.query["sslmode"]
+        u = u.difference_update_query(["sslmode"])
+    return u.set(drivername="postgresql+asyncpg"), args
+
+
+def _pool_kwargs() -> Dict[str, Any]:
+    """Pool sizing and timeouts shared by both engines (see app/core/config.py)."""
+    settings = get_settings()
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_use_lifo": settings.db_pool_use_lifo,
+    }
+
+
+def get_engine() -> Engine:
+    """
+    Return the process-wide sync engine, creating it on first use.
+
+    Raises:
+        RuntimeError: If DATABASE_URL is not set
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                url = database_url()
+                _engine = create_engine(
+                    url,
+                    echo=False,  # set True for debugging SQL
+                    future=True,
+                    poolclass=InstrumentedQueuePool,
+                    connect_args=connect_args_for(url),
+                    **_pool_kwargs(),
+                )
+    return _engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Return the process-wide async engine, creating it on first use.
+
+    It is used by the async def routes, so queries don't block the event
+    loop. It has its own pool (same sizing) and is only used from the API's
+    event loop; background job threads keep using SessionLocal.
+
+    Raises:
+        RuntimeError: If DATABASE_URL is not set
+    """
+    global _async_engine
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                url, connect_args = async_url_for(database_url())
+                _async_engine = create_async_engine(
+                    url,
+                    echo=False,
+                    connect_args=connect_args,
+                    **_pool_kwargs(),
+                )
+    return _async_engine
+
+
+def init_db() -> None:
+    """Create both engines now instead of on the first query."""
+    get_engine()
+    get_async_engine()
+
+
+async def dispose_engines() -> None:
+    """Close all pooled connections of both engines (app shutdown)."""
+    global _engine, _async_engine
+    with _engine_lock:
+        engine, async_engine = _engine, _async_engine
+        _engine = _async_engine = None
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
+
+
+class _LazyBoundSession(Session):
+    """Session that binds to the sync engine when it first needs a connection."""
+
+    def get_bind(self, *args, **kwargs):
+        if self.bind is None:
+            self.bind = get_engine()
+        return super().get_bind(*args, **kwargs)
+
+
+class _LazyAsyncBoundSession(Session):
+    """Sync side of an AsyncSession, bound to the async engine on first use."""
+
+    def get_bind(self, *args, **kwargs):
+        if self.bind is None:
+            self.bind = get_async_engine().sync_engine
+        return super().get_bind(*args, **kwargs)
+
 
 # SessionLocal for DB operations
 SessionLocal = sessionmaker(
+    class_=_LazyBoundSession,
     autocommit=False,
     autoflush=False,
-    bind=engine,
+)
+
+# Objects stay loaded after commit: attribute refreshes would be implicit I/O
+AsyncSessionLocal = async_sessionmaker(
+    sync_session_class=_LazyAsyncBoundSession,
+    autoflush=False,
+    expire_on_commit=False,
 )
 
 
@@ -38,3 +193,73 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency for getting an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Checkout wait times, timeouts, occupancy and overflow of the engine's pool."""
+    engine = get_engine()
+    stats = engine.pool.metrics.snapshot(engine.pool)
+    async_pool = get_async_engine().pool
+    stats["async_pool"] = {
+        "pool_size": async_pool.size(),
+        "checked_out": async_pool.checkedout(),
+        "checked_in": async_pool.checkedin(),
+        "overflow": async_pool.overflow(),
+    }
+    return stats
+
+
+def insert_for(db: Session, model):
+    """
+    INSERT for the session's dialect, with on_conflict_do_update/nothing.
+
+    Postgres in production; SQLite (which supports the same ON CONFLICT
+    clauses on index_elements) in tests.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert(model)
+    return pg_insert(model)
+
+
+def advisory_lock_id(name: str) -> int:
+    """Map a lock name to a signed 64-bit Postgres advisory lock id."""
+    digest = hashlib.sha256(name.encode()).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+@contextmanager
+def advisory_lock(name: str) -> Iterator[bool]:
+    """
+    Try to take a session-level Postgres advisory lock without waiting.
+
+    The lock is held on a dedicated connection for the duration of the
+    block, so it is released even if the worker dies mid-way. On databases
+    without advisory locks this always yields True.
+
+    Yields:
+        True if the lock was acquired, False if another session holds it
+    """
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+
+    lock_id = advisory_lock_id(name)
+    with engine.connect() as conn:
+        acquired = conn.execute(
+            text("SELECT pg_try_advisory_lock(:id)"), {"id": lock_id}
+        ).scalar()
+        conn.commit()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": lock_id})
+                conn.commit()
+
@@ -0,0 +1,98 @@
+"""
+Connection pool with checkout telemetry.
+
+InstrumentedQueuePool is a QueuePool that times every checkout (the wait for
+a free connection, plus connecting when it opens an overflow one) and counts
+checkout timeouts. PoolMetrics.snapshot() combines those counters with the
+pool's current occupancy for GET /metrics/db-pool.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+# Recent checkout waits kept for percentiles
+WAIT_SAMPLES = 2048
+
+
+class PoolMetrics:
+    """Checkout counters and recent wait times of one pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.peak_checked_out = 0
+
+    def record(self, wait: float, checked_out: int, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.total_wait += wait
+                self._waits.append(wait)
+            self.max_wait = max(self.max_wait, wait)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def snapshot(self, pool: QueuePool) -> Dict[str, Any]:
+        """Counters plus the pool's current size, occupancy and overflow."""
+        with self._lock:
+            waits = sorted(self._waits)
+            checkouts = self.checkouts
+            stats = {
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_mean": round(self.total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+                "wait_ms_p50": round(waits[len(waits) // 2] * 1000, 3) if waits else 0.0,
+                "wait_ms_p99": round(waits[min(len(waits) - 1, int(len(waits) * 0.99))] * 1000, 3) if waits else 0.0,
+                "wait_ms_max": round(self.max_wait * 1000, 3),
+                "peak_checked_out": self.peak_checked_out,
+            }
+        stats.update({
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            # Connections open beyond pool_size (negative while the pool is still filling)
+            "overflow": pool.overflow(),
+            "timeout_seconds": pool.timeout(),
+        })
+        return stats
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout wait times, timeouts and peak occupancy."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        # QueuePool._do_get retries by calling itself; only the outer call is timed
+        self._in_checkout = threading.local()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        if getattr(self._in_checkout, "active", False):
+            return super()._do_get()
+
+        self._in_checkout.active = True
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - start, self.checkedout(), timed_out=True)
+            raise
+        finally:
+            self._in_checkout.active = False
+        self.metrics.record(time.perf_counter() - start, self.checkedout())
+        return record
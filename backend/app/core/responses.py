@@ -0,0 +1,46 @@
+"""
+orjson-backed JSON responses.
+
+ORJSONResponse is the app's default response class. Bulk endpoints build
+plain dicts straight from ORM rows (rows_to_dicts) and return json_response,
+so their payloads are neither validated against a response model nor passed
+through jsonable_encoder; the response models only document the shapes.
+"""
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import orjson
+from fastapi.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON (dates, datetimes and UUIDs included)."""
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None
+) -> ORJSONResponse:
+    """Send already-shaped content as-is, without response model validation."""
+    return ORJSONResponse(content=content, status_code=status_code, headers=headers)
+
+
+def rows_to_dicts(rows: Iterable[Any], fields: Sequence[str]) -> List[Dict[str, Any]]:
+    """Copy the given attributes of ORM rows (or row tuples) into dicts."""
+    if len(fields) == 1:
+        field = fields[0]
+        get_one = attrgetter(field)
+        return [{field: get_one(row)} for row in rows]
+    get = attrgetter(*fields)
+    return [dict(zip(fields, get(row))) for row in rows]
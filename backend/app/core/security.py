@@ -1,25 +1,34 @@
 # app/core/security.py
 
-import os
+import time
 import jwt
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Dict, Any
-from fastapi import Depends
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPBearer
 from jwt.exceptions import DecodeError, InvalidTokenError
-from dotenv import load_dotenv
+from app.core.config import get_settings
+from app.utils.lru_cache import LRUCache
 
-load_dotenv()
+# JWT_SECRET and JWT_ALGORITHM are read when a token is first signed or verified
 
-JWT_SECRET = os.getenv("JWT_SECRET")
-JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
-
-if JWT_SECRET is None:
-    raise RuntimeError("JWT_SECRET environment variable is not set")
+# Key in request.state under which AuthMiddleware leaves the decoded claims
+AUTH_STATE_KEY = "auth_claims"
 
 bearer = HTTPBearer(auto_error=False)
 
 
+@lru_cache(maxsize=1)
+def _claims_cache() -> LRUCache:
+    """
+    Verified token -> claims, so repeat requests with the same token skip the
+    signature check. Entries never outlive the token's own expiry.
+    """
+    settings = get_settings()
+    return LRUCache(settings.auth_claims_cache_size, settings.auth_claims_cache_ttl)
+
+
 def create_access_token(data: dict, expires_minutes: int = 60 * 24) -> str:
     """
     Create a JWT access token.
@@ -34,27 +43,81 @@ def create_access_token(data: dict, expires_minutes: int = 60 * 24) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=expires_minutes)
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    settings = get_settings()
+    return jwt.encode(to_encode, settings.require("jwt_secret"), algorithm=settings.jwt_algorithm)
 
 
-def optional_access_token(credentials=Depends(bearer)) -> Optional[Dict[str, Any]]:
+def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verify a JWT access token, using the claims cache when the token was seen recently.
+
+    The returned dict is shared between requests; treat it as read-only.
+
+    Args:
+        token: Encoded JWT token string
+
+    Returns:
+        Decoded token payload dict, or None if the token is invalid or expired
+
+    Raises:
+        RuntimeError: If JWT_SECRET is not set
+    """
+    cache = _claims_cache()
+    claims = cache.get(token)
+    if claims is not None:
+        return claims
+
+    settings = get_settings()
+    secret = settings.require("jwt_secret")
+    try:
+        claims = jwt.decode(token, secret, algorithms=[settings.jwt_algorithm])
+    except (DecodeError, InvalidTokenError):
+        return None
+    except Exception:
+        return None
+
+    ttl = settings.auth_claims_cache_ttl
+    if "exp" in claims:
+        ttl = min(ttl, claims["exp"] - time.time())
+    if ttl > 0:
+        cache.set(token, claims, ttl)
+    return claims
+
+
+def claims_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the token claims cache."""
+    return _claims_cache().stats()
+
+
+def optional_access_token(request: Request, credentials=Depends(bearer)) -> Optional[Dict[str, Any]]:
     """
     Optional JWT token verification dependency.
     Returns None if no token is provided or if token is invalid.
+
+    Uses the claims AuthMiddleware already decoded for this request, if any.
     
     Returns:
         Decoded token payload dict or None
     """
+    state = request.scope.get("state")
+    if state is not None and AUTH_STATE_KEY in state:
+        return state[AUTH_STATE_KEY]
+
     if credentials is None:
         return None
+    return decode_access_token(credentials.credentials)
 
-    try:
-        return jwt.decode(
-            credentials.credentials,
-            JWT_SECRET,
-            algorithms=[JWT_ALGORITHM]
-        )
-    except (DecodeError, InvalidTokenError):
-        return None
-    except Exception:
-        return None
+
+def require_access_token(user: Optional[Dict[str, Any]] = Depends(optional_access_token)) -> Dict[str, Any]:
+    """
+    Required JWT token verification dependency.
+    
+    Returns:
+        Decoded token payload dict (always has user_id)
+    
+    Raises:
+        HTTPException: 401 if the token is missing or invalid
+    """
+    if user is None or not user.get("user_id"):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return user
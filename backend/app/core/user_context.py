@@ -0,0 +1,134 @@
+"""
+Signed-in user context with an in-process snapshot cache.
+
+current_user / optional_current_user resolve the request's access token to
+a UserSnapshot: an immutable copy of the users row, cached per user id for
+AUTH_USER_CACHE_TTL seconds so endpoints that need the user do not SELECT it
+on every request. Any ORM update or delete of a User drops its snapshot in
+this process (see the mapper listeners below); other workers pick the change
+up when their snapshot expires. Code that changes users with bulk
+query().update() must call invalidate_user itself.
+"""
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.db import get_db
+from app.core.security import optional_access_token, require_access_token
+from app.models.user import User
+from app.utils.lru_cache import LRUCache
+
+
+@lru_cache(maxsize=1)
+def _users() -> LRUCache:
+    """User id -> UserSnapshot (AUTH_USER_CACHE_SIZE entries, AUTH_USER_CACHE_TTL seconds)."""
+    settings = get_settings()
+    return LRUCache(settings.auth_user_cache_size, settings.auth_user_cache_ttl)
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Read-only copy of a users row."""
+    id: int
+    google_id: str
+    email: str
+    name: str
+    profile_picture: Optional[str]
+    learning_language: Optional[str]
+    streak_count: int
+    last_active_date: Optional[date]
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            google_id=user.google_id,
+            email=user.email,
+            name=user.name,
+            profile_picture=user.profile_picture,
+            learning_language=user.learning_language,
+            streak_count=user.streak_count or 0,
+            last_active_date=user.last_active_date,
+            created_at=user.created_at,
+        )
+
+    def to_response(self) -> Dict[str, Any]:
+        """Dict shaped like UserResponse."""
+        data = asdict(self)
+        data["last_active_date"] = str(self.last_active_date) if self.last_active_date else None
+        data["created_at"] = self.created_at.isoformat() if self.created_at else None
+        return data
+
+
+def get_user_snapshot(db: Session, user_id: int) -> Optional[UserSnapshot]:
+    """
+    Look up a user by id, from the snapshot cache when possible.
+
+    Args:
+        db: Database session (only used on a cache miss)
+        user_id: User ID
+
+    Returns:
+        UserSnapshot, or None if there is no such user
+    """
+    snapshot = _users().get(user_id)
+    if snapshot is not None:
+        return snapshot
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        return None
+    snapshot = UserSnapshot.from_user(user)
+    _users().set(user_id, snapshot)
+    return snapshot
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a user's cached snapshot (call after changing the users row)."""
+    _users().invalidate(user_id)
+
+
+def user_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the user snapshot cache."""
+    return _users().stats()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _drop_snapshot(mapper, connection, target: User) -> None:
+    invalidate_user(target.id)
+
+
+def optional_current_user(
+    claims: Optional[Dict[str, Any]] = Depends(optional_access_token),
+    db: Session = Depends(get_db)
+) -> Optional[UserSnapshot]:
+    """
+    Signed-in user dependency; None for anonymous requests or unknown users.
+    """
+    if claims is None or not claims.get("user_id"):
+        return None
+    return get_user_snapshot(db, claims["user_id"])
+
+
+def current_user(
+    claims: Dict[str, Any] = Depends(require_access_token),
+    db: Session = Depends(get_db)
+) -> UserSnapshot:
+    """
+    Required signed-in user dependency.
+
+    Raises:
+        HTTPException: 401 if the token is missing or invalid, or the user no longer exists
+    """
+    user = get_user_snapshot(db, claims["user_id"])
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return user
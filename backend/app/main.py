@@ -1,19 +1,56 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import logging
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import words, crossword, auth, mnemonic, pre_generation
-import os
-from dotenv import load_dotenv
+from app.api import words, crossword, auth, mnemonic, pre_generation, metrics
+from app.core.auth_middleware import AuthMiddleware
+from app.core.config import get_settings
+from app.core.db import dispose_engines, init_db
+from app.core.responses import ORJSONResponse
+from app.services.ai_service import close_ai_client, get_ai_client
+from app.services.google_verifier import get_google_verifier
+from sqlalchemy.exc import TimeoutError as DBTimeoutError
+
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the database engines and API clients when the server starts, and
+    release them on shutdown. Importing the app does neither, so tests and
+    tools can import routers without every secret set.
+    """
+    settings.require("jwt_secret")
+    init_db()
+    get_google_verifier()
+    # Only the mnemonic routes and pre-generation need Gemini
+    if settings.gemini_api_key:
+        get_ai_client()
+    else:
+        logging.warning("GEMINI_API_KEY is not set; mnemonic generation is unavailable")
+    yield
+    close_ai_client()
+    await dispose_engines()
 
-load_dotenv()
 
 app = FastAPI(
     title="EaseeVocab API",
     description="API for vocabulary learning with crosswords and mnemonics",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+
+@app.exception_handler(DBTimeoutError)
+async def db_pool_timeout(request: Request, e: DBTimeoutError) -> ORJSONResponse:
+    """No pooled connection freed up within DB_POOL_TIMEOUT: ask the client to retry."""
+    return ORJSONResponse(status_code=503, content={"detail": "Database is busy, please retry"})
+
+
 # CORS configuration - use environment variable for production
-cors_origins = os.getenv("CORS_ORIGINS", "*").split(",")
+cors_origins = settings.cors_origins.split(",")
 if cors_origins == ["*"]:
     # Development mode - allow all origins
     allow_origins = ["*"]
@@ -29,12 +66,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Decode the bearer token once per request (see app/core/auth_middleware.py)
+app.add_middleware(AuthMiddleware)
+
 # Include routers
 app.include_router(words.router)
 app.include_router(crossword.router)
 app.include_router(auth.router)
 app.include_router(mnemonic.router)
 app.include_router(pre_generation.router)
+app.include_router(metrics.router)
 
 
 @app.get("/")
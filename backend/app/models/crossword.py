@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, UniqueConstraint, JSON
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from .base import Base
@@ -8,10 +8,19 @@ class Crossword(Base):
 
     id = Column(Integer, primary_key=True, index=True)
 
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Set for a user's own puzzle; NULL for the shared daily puzzle of a level/language
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     puzzle_date = Column(Date, nullable=False)
+    level = Column(String, nullable=True)
+    language = Column(String(2), nullable=True)
 
-    grid = Column(JSONB, nullable=False)       # 2D array of letters + #
-    clues = Column(JSONB, nullable=False)      # list of across/down clues
+    # Plain JSON on SQLite (tests)
+    grid = Column(JSONB().with_variant(JSON(), "sqlite"), nullable=False)       # 2D array of letters + #
+    clues = Column(JSONB().with_variant(JSON(), "sqlite"), nullable=False)      # list of across/down clues
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # One shared daily puzzle per date, level and language
+    __table_args__ = (
+        UniqueConstraint('puzzle_date', 'level', 'language', name='uq_crosswords_daily'),
+    )
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, JSON
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class CrosswordBankEntry(Base):
+    """A pre-generated, high-quality crossword layout for one set of answer words."""
+    __tablename__ = "crossword_bank"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # sha256 of the sorted, uppercased answers (see crossword_bank.word_set_key)
+    word_set_hash = Column(String(64), unique=True, nullable=False)
+    # Plain JSON on SQLite (tests)
+    words = Column(ARRAY(String).with_variant(JSON(), "sqlite"), nullable=False)  # sorted answers
+
+    # Where the words came from; NULL for layouts of user-supplied words
+    level = Column(String, nullable=True)
+    language = Column(String(2), nullable=True)
+
+    grid = Column(JSONB().with_variant(JSON(), "sqlite"), nullable=False)
+    clues = Column(JSONB().with_variant(JSON(), "sqlite"), nullable=False)      # same shape as crosswords.clues
+
+    score = Column(Float, nullable=False)
+    intersections = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_crossword_bank_level_language', 'level', 'language'),
+    )
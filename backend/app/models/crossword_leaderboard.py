@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class CrosswordLeaderboardEntry(Base):
+    """Ranked (first completed) attempt of a user on a crossword; later completions only count."""
+    __tablename__ = "crossword_leaderboard"
+
+    crossword_id = Column(Integer, ForeignKey("crosswords.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+
+    # Ranking key of the ranked attempt: fewest wrong cells, then fastest
+    miss_cells = Column(Integer, nullable=False)
+    best_time_seconds = Column(Integer, nullable=False)
+
+    correct_cells = Column(Integer, nullable=False)
+    total_cells = Column(Integer, nullable=False)
+    attempts = Column(Integer, nullable=False, default=1)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index('ix_crossword_leaderboard_rank', 'crossword_id', 'miss_cells', 'best_time_seconds'),
+    )
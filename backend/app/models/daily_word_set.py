@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Date, DateTime, Integer, JSON
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class DailyWordSet(Base):
+    """The deterministic words of the day for one level, computed once per date."""
+    __tablename__ = "daily_word_sets"
+
+    set_date = Column(Date, primary_key=True)
+    level = Column(String, primary_key=True)
+
+    # Vocabulary ids, sorted ascending (same English words for every language)
+    # Plain JSON on SQLite (tests)
+    word_ids = Column(ARRAY(Integer).with_variant(JSON(), "sqlite"), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
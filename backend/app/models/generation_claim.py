@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime
+from .base import Base
+
+
+class GenerationClaim(Base):
+    """A worker's short-lived claim on generating one cache entry; others wait for its result."""
+    __tablename__ = "generation_claims"
+
+    # e.g. "mnemonic-text:<word_hash>:<language>:<definition_hash>"
+    name = Column(String(200), primary_key=True)
+    # Random id of the claiming call; only the owner releases the claim
+    owner = Column(String(32), nullable=False)
+    # A claim whose owner died is taken over once it expires
+    expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime, LargeBinary
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class ImageBlob(Base):
+    """Content-addressed image bytes (see app/services/blob_store.py)."""
+    __tablename__ = "image_blobs"
+
+    # Hex SHA-256 of data
+    sha256 = Column(String(64), primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    # Orphan cleanup leaves recently stored blobs alone
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
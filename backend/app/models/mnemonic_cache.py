@@ -17,7 +17,11 @@ class MnemonicCache(Base):
     # Cached content
     mnemonic_word = Column(Text, nullable=False)
     mnemonic_sentence = Column(Text, nullable=False)
-    image_base64 = Column(Text, nullable=True)  # Can be large, but cached for reuse
+    # SHA-256 of the image bytes in the blob store (see app/services/blob_store.py)
+    image_sha256 = Column(String(64), nullable=True)
+    # Legacy inline images; moved to the blob store on first read or by
+    # app/scripts/migrate_images_to_blob_store.py
+    image_base64 = Column(Text, nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
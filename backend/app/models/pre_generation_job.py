@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class PreGenerationJob(Base):
+    """A background pre-generation run for one date."""
+    __tablename__ = "pre_generation_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    run_date = Column(Date, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending/running/succeeded/failed
+
+    total_items = Column(Integer, nullable=False, default=0)
+    done_items = Column(Integer, nullable=False, default=0)
+    error_items = Column(Integer, nullable=False, default=0)
+
+    progress = Column(JSONB, nullable=True)  # per language/level counters
+    stats = Column(JSONB, nullable=True)     # final pipeline stats
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+
+    # At most one pending/running job per date
+    __table_args__ = (
+        Index(
+            'uq_pre_generation_jobs_active_date', 'run_date',
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Text, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class PreGenerationProgress(Base):
+    """Per-word progress of a daily pre-generation run, so a crashed run can resume."""
+    __tablename__ = "pre_generation_progress"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    run_date = Column(Date, nullable=False)
+    language = Column(String(2), nullable=False)  # 'es' or 'fr'
+    level = Column(String, nullable=False)
+    word_id = Column(Integer, ForeignKey("vocabulary.id"), nullable=False)
+
+    text_done = Column(Boolean, default=False, nullable=False)
+    image_done = Column(Boolean, default=False, nullable=False)
+
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('run_date', 'language', 'level', 'word_id', name='uq_pre_generation_progress'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, Boolean
+from sqlalchemy import Column, Integer, ForeignKey, Date, Boolean, UniqueConstraint
 from .base import Base
 
 class UserWordHistory(Base):
@@ -11,3 +11,9 @@ class UserWordHistory(Base):
 
     served_date = Column(Date, nullable=False)
     completed = Column(Boolean, default=False)
+
+    # A word is served to a user at most once per day. Column order matters:
+    # the (user_id, served_date) prefix is the index behind daily lookups.
+    __table_args__ = (
+        UniqueConstraint('user_id', 'served_date', 'word_id', name='uq_user_word_history_user_date_word'),
+    )
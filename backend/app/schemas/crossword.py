@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Literal, Optional, Union
 from pydantic import BaseModel, Field
 
 
@@ -7,9 +7,12 @@ from pydantic import BaseModel, Field
 # ----------------------------------------------------
 class CrosswordTodayRequest(BaseModel):
     """Request schema for generating today's crossword."""
-    limit: Optional[int] = Field(default=None, ge=1, le=10, description="Number of words in crossword")
+    limit: Optional[int] = Field(default=None, ge=1, le=10, description="Number of words in crossword (ignored for the shared daily puzzle)")
     words: Optional[List[str]] = Field(default=None, description="Specific words to use for crossword (translated words)")
     clues: Optional[Dict[str, str]] = Field(default=None, description="Mapping of words to clues (word -> clue)")
+    level: Optional[str] = Field(default=None, description="Level of the shared daily puzzle served when no words are given (default 'a1')")
+    language: Optional[str] = Field(default=None, description="Answer language of the shared daily puzzle ('es' or 'fr', default 'es')")
+    size: Optional[int] = Field(default=None, ge=3, description="Maximum grid width and height for the given words (default: sized to the words, capped by the server)")
 
 
 # ----------------------------------------------------
@@ -29,6 +32,29 @@ class CrosswordTodayResponse(BaseModel):
     """Response schema for today's crossword."""
     grid: List[List[Dict[str, Any]]]  # 2D list representing crossword layout
     words: List[CrosswordClue]  # List of clues with placement info
+    unplaced: List[str] = Field(default_factory=list, description="Words left out of the layout")
+    crossword_id: Optional[int] = Field(default=None, description="Id of the stored puzzle (shared daily puzzles only)")
+    puzzle_date: Optional[str] = None
+    level: Optional[str] = None
+    language: Optional[str] = None
+
+
+class CrosswordCompactResponse(BaseModel):
+    """Compact stored (daily) crossword: row-string grid, clue arrays, no answers."""
+    format: Literal["compact"] = "compact"
+    height: int
+    width: int
+    grid: List[str] = Field(..., description="One string per row: '#' block, '.' letter cell")
+    clues: List[List[Union[int, str]]] = Field(
+        ...,
+        description="Per word: [number, 'a'|'d', row, col, length, clue]; "
+                    "check answers with POST /crossword/{crossword_id}/check"
+    )
+    unplaced: List[str] = Field(default_factory=list)
+    crossword_id: Optional[int] = None
+    puzzle_date: Optional[str] = None
+    level: Optional[str] = None
+    language: Optional[str] = None
 
 
 # ----------------------------------------------------
@@ -69,3 +95,88 @@ class CrosswordSubmitResponse(BaseModel):
     accuracy: float
     correct_words: List[str]
     wrong_words: List[str]
+
+
+# ----------------------------------------------------
+# REQUEST: Check answers of a stored crossword
+# ----------------------------------------------------
+class CrosswordCheckRequest(BaseModel):
+    """Compact answers for a stored crossword."""
+    answers: Union[str, List[str]] = Field(
+        ...,
+        description="Row-major letters: one flat string, or one string per row "
+                    "('.' or ' ' for empty cells; block cells are ignored)"
+    )
+    time_taken_seconds: Optional[int] = Field(default=None, ge=0, description="Solving time, stored with the attempt")
+
+
+class CrosswordWordResult(BaseModel):
+    """Whether one clue's answer is correct."""
+    number: int
+    direction: str
+    correct: bool
+
+
+# ----------------------------------------------------
+# RESPONSE: Check answers of a stored crossword
+# ----------------------------------------------------
+class CrosswordCheckResponse(BaseModel):
+    """Result of checking a stored crossword."""
+    crossword_id: int
+    attempt_id: Optional[int] = None  # set for signed-in users
+    correct_cells: int
+    total_cells: int
+    accuracy: float
+    solved: bool
+    results: List[CrosswordWordResult] = Field(
+        ...,
+        description="Per-word results; empty for ranked puzzles until the player's ranked attempt is completed"
+    )
+
+
+# ----------------------------------------------------
+# Attempts and leaderboards
+# ----------------------------------------------------
+class CrosswordAttemptStartResponse(BaseModel):
+    """A started attempt; complete it to be timed and ranked."""
+    attempt_id: int
+    crossword_id: int
+    started_at: str
+
+
+class CrosswordAttemptCompleteResponse(CrosswordCheckResponse):
+    """Checked attempt with the player's leaderboard standing."""
+    time_taken_seconds: int
+    ranked: bool = Field(..., description="Whether this was the player's first, ranked completion")
+    rank: int
+    players: int
+    percentile: float = Field(..., description="Share of players ranked below, in percent")
+    best_time_seconds: int
+    best_accuracy: float
+
+
+class LeaderboardEntry(BaseModel):
+    """One player's best result on a crossword."""
+    rank: int
+    user_id: int
+    name: Optional[str] = None
+    profile_picture: Optional[str] = None
+    time_taken_seconds: int
+    accuracy: float
+    solved: bool
+
+
+class LeaderboardStanding(BaseModel):
+    """The requesting player's own position."""
+    rank: int
+    players: int
+    percentile: float
+
+
+class LeaderboardResponse(BaseModel):
+    """Top players of a crossword: fewest wrong cells, then fastest."""
+    crossword_id: int
+    players: int
+    fastest_time_seconds: Optional[int] = None  # fastest fully solved attempt
+    entries: List[LeaderboardEntry]
+    me: Optional[LeaderboardStanding] = None
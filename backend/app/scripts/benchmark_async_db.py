@@ -0,0 +1,132 @@
+"""
+Benchmark sync vs async database sessions under concurrent async requests.
+
+Runs --concurrency coroutines on one event loop, as uvicorn runs async def
+routes, each doing --requests / --concurrency queries that take --query-ms
+on the server. The "sync" mode uses SessionLocal directly in the coroutine
+(what the async routes did before get_async_db), the "async" mode uses
+AsyncSessionLocal. A ticker coroutine measures event-loop lag meanwhile:
+how late a 5 ms sleep wakes up, i.e. how long other requests would stall.
+
+Usage:
+    python -m app.scripts.benchmark_async_db [--concurrency 50] [--requests 1000] [--query-ms 20] [--modes sync async]
+
+Needs a Postgres DATABASE_URL.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import text
+
+from app.core.db import AsyncSessionLocal, SessionLocal, dispose_engines
+
+TICK_SECONDS = 0.005
+QUERY_SQL = text("SELECT pg_sleep(:s)")
+
+
+def percentile(samples: List[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+async def sync_query(seconds: float) -> None:
+    with SessionLocal() as db:
+        db.execute(QUERY_SQL, {"s": seconds})
+
+
+async def async_query(seconds: float) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(QUERY_SQL, {"s": seconds})
+
+
+async def ticker(lags: List[float], stop: asyncio.Event) -> None:
+    """Record how late each TICK_SECONDS sleep wakes up."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(loop.time() - start - TICK_SECONDS)
+
+
+async def run_mode(mode: str, concurrency: int, total: int, query_ms: int) -> Dict[str, Any]:
+    """Run one mode; returns throughput, query latency and event-loop lag."""
+    query = sync_query if mode == "sync" else async_query
+    seconds = query_ms / 1000
+    latencies: List[float] = []
+    lags: List[float] = []
+    stop = asyncio.Event()
+
+    # Open the pool's connections first so both modes start warm
+    await asyncio.gather(*(query(0) for _ in range(min(concurrency, 10))))
+
+    async def client(n: int) -> None:
+        for _ in range(n):
+            t0 = time.perf_counter()
+            await query(seconds)
+            latencies.append(time.perf_counter() - t0)
+
+    per_client, extra = divmod(total, concurrency)
+    tick = asyncio.create_task(ticker(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(client(per_client + (i < extra)) for i in range(concurrency)))
+    wall = time.perf_counter() - started
+    stop.set()
+    await tick
+
+    return {
+        "mode": mode,
+        "rps": round(total / wall, 1),
+        "query_ms_p50": round(statistics.median(latencies) * 1000, 1),
+        "query_ms_p99": round(percentile(latencies, 0.99) * 1000, 1),
+        "lag_ms_p50": round(percentile(lags, 0.5) * 1000, 1),
+        "lag_ms_p99": round(percentile(lags, 0.99) * 1000, 1),
+        "lag_ms_max": round(max(lags, default=0.0) * 1000, 1),
+    }
+
+
+def print_results(results: List[Dict[str, Any]]):
+    columns: List[Tuple[str, str]] = [
+        ("mode", "mode"),
+        ("rps", "rps"),
+        ("query_ms_p50", "query p50"),
+        ("query_ms_p99", "query p99"),
+        ("lag_ms_p50", "lag p50"),
+        ("lag_ms_p99", "lag p99"),
+        ("lag_ms_max", "lag max"),
+    ]
+    print("\n" + "".join(f"{label:>11}" for _, label in columns))
+    for r in results:
+        print("".join(f"{r[key]:>11}" for key, _ in columns))
+
+
+async def main(modes: List[str], concurrency: int, total: int, query_ms: int):
+    results = []
+    try:
+        for mode in modes:
+            print(f"⏱️ {mode}: {total} queries from {concurrency} coroutines, {query_ms} ms each...")
+            results.append(await run_mode(mode, concurrency, total, query_ms))
+    finally:
+        await dispose_engines()
+    print_results(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async database sessions")
+    parser.add_argument("--modes", nargs="+", choices=["sync", "async"], default=["sync", "async"],
+                        help="Session types to compare (default: both)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent coroutines (default: 50)")
+    parser.add_argument("--requests", type=int, default=1000, help="Queries per mode (default: 1000)")
+    parser.add_argument("--query-ms", type=int, default=20, help="Server-side duration of each query (default: 20)")
+
+    args = parser.parse_args()
+    asyncio.run(main(args.modes, args.concurrency, args.requests, args.query_ms))
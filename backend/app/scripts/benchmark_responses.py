@@ -0,0 +1,136 @@
+"""
+Benchmark requests per second and latency of the main read endpoints.
+
+Runs against a live server (e.g. `uvicorn app.main:app --workers 1`) with a
+pool of threads, each with its own keep-alive session. Save a run with
+--save, then run again after a change with --compare to print the deltas:
+
+    python -m app.scripts.benchmark_responses --save before.json
+    # ...change, restart the server...
+    python -m app.scripts.benchmark_responses --compare before.json
+
+Usage:
+    python -m app.scripts.benchmark_responses [--base-url http://localhost:8000] [--requests 2000] [--concurrency 16] [--endpoints words-daily crossword-daily ...] [--save FILE] [--compare FILE]
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+import requests
+
+WORDS = ["casa", "perro", "gato", "mesa", "libro", "agua", "ventana", "luna", "flor", "escuela"]
+
+
+def _endpoints(base_url: str) -> Dict[str, Callable[[requests.Session], requests.Response]]:
+    """Requests to benchmark, keyed by name."""
+    daily = requests.get(f"{base_url}/crossword/daily", params={"level": "a1", "language": "es"}, timeout=30)
+    daily.raise_for_status()
+    crossword_id = daily.json().get("crossword_id")
+
+    mnemonic_words = [
+        {"word": w["word"], "definition": w["definition"], "language": "es"}
+        for w in requests.post(f"{base_url}/words/daily", json={"level": "a1"}, timeout=30).json()["words"]
+    ]
+
+    return {
+        "words-daily": lambda s: s.post(f"{base_url}/words/daily", json={"level": "a1", "limit": 10}),
+        "crossword-daily": lambda s: s.get(f"{base_url}/crossword/daily", params={"level": "a1", "language": "es"}),
+        "crossword-daily-compact": lambda s: s.get(
+            f"{base_url}/crossword/daily", params={"level": "a1", "language": "es", "format": "compact"}
+        ),
+        "crossword-today": lambda s: s.post(f"{base_url}/crossword/today", json={"words": WORDS}),
+        "crossword-leaderboard": lambda s: s.get(f"{base_url}/crossword/{crossword_id}/leaderboard"),
+        "mnemonic-get-cached": lambda s: s.post(
+            f"{base_url}/mnemonic/get-cached", json={"words": mnemonic_words, "include_images": False}
+        ),
+    }
+
+
+def run_endpoint(call: Callable[[requests.Session], requests.Response], total: int, concurrency: int) -> Dict[str, Any]:
+    """Send `total` requests from `concurrency` threads; return throughput and latency percentiles."""
+    local = threading.local()
+    errors = 0
+    errors_lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        response = call(session)
+        elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code >= 400:
+            with errors_lock:
+                errors += 1
+        return elapsed
+
+    # Warm up connections and caches
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(concurrency * 2)))
+    errors = 0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        timings = sorted(pool.map(one, range(total)))
+    wall = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / wall, 1),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "p50_ms": round(timings[len(timings) // 2], 2),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 2),
+    }
+
+
+def _delta(before: float, after: float) -> str:
+    return f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+
+
+def print_results(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]):
+    print(f"\n{'endpoint':<26}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, r in results.items():
+        print(f"{name:<26}{r['rps']:>10}{r['p50_ms']:>10}{r['p99_ms']:>10}{r['errors']:>8}")
+        if name in baseline:
+            b = baseline[name]
+            print(f"{'  vs baseline':<26}{_delta(b['rps'], r['rps']):>10}"
+                  f"{_delta(b['p50_ms'], r['p50_ms']):>10}{_delta(b['p99_ms'], r['p99_ms']):>10}")
+
+
+def main(base_url: str, total: int, concurrency: int, names: List[str], save: str, compare: str):
+    endpoints = _endpoints(base_url.rstrip("/"))
+    baseline = {}
+    if compare:
+        with open(compare) as f:
+            baseline = json.load(f)
+
+    results = {}
+    for name in names or endpoints:
+        print(f"⏱️ {name}: {total} requests, {concurrency} concurrent...")
+        results[name] = run_endpoint(endpoints[name], total, concurrency)
+
+    print_results(results, baseline)
+
+    if save:
+        with open(save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Saved results to {save}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark API response throughput and latency")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="Server to benchmark (default: http://localhost:8000)")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint (default: 2000)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients (default: 16)")
+    parser.add_argument("--endpoints", nargs="+", default=[], help="Endpoints to run (default: all)")
+    parser.add_argument("--save", default=None, help="Write results to this JSON file")
+    parser.add_argument("--compare", default=None, help="Compare with results saved by an earlier run")
+
+    args = parser.parse_args()
+    main(args.base_url, args.requests, args.concurrency, args.endpoints, args.save, args.compare)
@@ -0,0 +1,171 @@
+"""
+Benchmark the daily user_word_history lookup at a realistic table size.
+
+Seeds synthetic users and history rows (1M by default), times
+get_daily_words_for_user for random users, prints the query plan and, with
+--compare, the plan and latency with the (user_id, served_date, word_id)
+index temporarily dropped (inside a rolled-back transaction).
+
+Synthetic rows are deleted afterwards unless --keep is given. PostgreSQL only.
+
+Usage:
+    python -m app.scripts.benchmark_word_history [--rows 1000000] [--users 5000] [--samples 300] [--compare] [--keep]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import text
+
+from app.core.db import SessionLocal
+from app.services.word_service import get_daily_words_for_user
+
+BENCH_PREFIX = "bench-word-history-"
+WORDS_PER_DAY = 10
+
+DAILY_LOOKUP_SQL = """
+    SELECT vocabulary.* FROM vocabulary
+    JOIN user_word_history ON vocabulary.id = user_word_history.word_id
+    WHERE user_word_history.user_id = :user_id AND user_word_history.served_date = CURRENT_DATE
+    ORDER BY user_word_history.word_id
+    LIMIT 10
+"""
+
+
+def seed(db, rows: int, users: int) -> list:
+    """Create synthetic users and about `rows` history rows; return the user ids."""
+    days = max(1, rows // (users * WORDS_PER_DAY))
+
+    db.execute(text("""
+        INSERT INTO users (google_id, email, name, streak_count)
+        SELECT :prefix || n, :prefix || n || '@example.invalid', 'Benchmark user ' || n, 0
+        FROM generate_series(1, :users) AS n
+        ON CONFLICT DO NOTHING
+    """), {"prefix": BENCH_PREFIX, "users": users})
+
+    # Ten consecutive vocabulary ids per (user, day), offset pseudo-randomly
+    result = db.execute(text("""
+        WITH ids AS (SELECT array_agg(id ORDER BY id) AS a, count(*) AS n FROM vocabulary),
+             bench_users AS (SELECT id FROM users WHERE google_id LIKE :prefix || '%')
+        INSERT INTO user_word_history (user_id, word_id, served_date, completed)
+        SELECT u.id,
+               ids.a[1 + ((u.id * 7919 + d * 104729 + k) % ids.n)],
+               CURRENT_DATE - d,
+               false
+        FROM bench_users u
+        CROSS JOIN generate_series(0, :days - 1) AS d
+        CROSS JOIN generate_series(0, :per_day - 1) AS k
+        CROSS JOIN ids
+        ON CONFLICT DO NOTHING
+    """), {"prefix": BENCH_PREFIX, "days": days, "per_day": WORDS_PER_DAY})
+    db.commit()
+    print(f"🌱 Inserted {result.rowcount} history rows ({users} users x {days} days x {WORDS_PER_DAY} words)")
+
+    db.execute(text("ANALYZE user_word_history"))
+    db.commit()
+
+    return [
+        user_id for (user_id,) in
+        db.execute(text("SELECT id FROM users WHERE google_id LIKE :prefix || '%'"), {"prefix": BENCH_PREFIX})
+    ]
+
+
+def time_lookups(db, user_ids: list, samples: int, lookup) -> dict:
+    timings = []
+    for user_id in random.sample(user_ids, min(samples, len(user_ids))):
+        start = time.perf_counter()
+        lookup(user_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "mean": statistics.fmean(timings),
+        "p50": timings[len(timings) // 2],
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "max": timings[-1],
+    }
+
+
+def print_timings(label: str, timings: dict):
+    print(f"⏱️ {label}: mean={timings['mean']:.2f}ms p50={timings['p50']:.2f}ms "
+          f"p95={timings['p95']:.2f}ms max={timings['max']:.2f}ms")
+
+
+def print_plan(db, user_id: int):
+    plan = db.execute(text("EXPLAIN (ANALYZE, BUFFERS) " + DAILY_LOOKUP_SQL), {"user_id": user_id})
+    for (line,) in plan:
+        print(f"   {line}")
+
+
+def cleanup(db):
+    db.execute(text("""
+        DELETE FROM user_word_history
+        WHERE user_id IN (SELECT id FROM users WHERE google_id LIKE :prefix || '%')
+    """), {"prefix": BENCH_PREFIX})
+    db.execute(text("DELETE FROM users WHERE google_id LIKE :prefix || '%'"), {"prefix": BENCH_PREFIX})
+    db.commit()
+    print("🧹 Removed synthetic users and history rows")
+
+
+def run_benchmark(rows: int, users: int, samples: int, compare: bool, keep: bool):
+    db = SessionLocal()
+    try:
+        # Seeding a million rows can outlast the app's DB_STATEMENT_TIMEOUT_MS
+        db.execute(text("SET statement_timeout = 0"))
+        user_ids = seed(db, rows, users)
+        total = db.execute(text("SELECT count(*) FROM user_word_history")).scalar()
+        print(f"📊 user_word_history now has {total} rows")
+
+        # Warm up connection and caches
+        time_lookups(db, user_ids, 20, lambda user_id: get_daily_words_for_user(db, user_id))
+
+        print_timings(
+            "get_daily_words_for_user",
+            time_lookups(db, user_ids, samples, lambda user_id: get_daily_words_for_user(db, user_id)),
+        )
+        db.rollback()
+        print("📋 Plan with index:")
+        print_plan(db, user_ids[0])
+        db.rollback()
+
+        if compare:
+            # DDL is transactional in PostgreSQL: drop the index, measure, roll back
+            db.execute(text(
+                "ALTER TABLE user_word_history DROP CONSTRAINT uq_user_word_history_user_date_word"
+            ))
+            print_timings(
+                "without index",
+                time_lookups(
+                    db, user_ids, max(1, samples // 10),
+                    lambda user_id: db.execute(text(DAILY_LOOKUP_SQL), {"user_id": user_id}).all(),
+                ),
+            )
+            print("📋 Plan without index:")
+            print_plan(db, user_ids[0])
+            db.rollback()
+
+        if not keep:
+            cleanup(db)
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Benchmark failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark daily word history lookups")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="History rows to seed (default: 1000000)")
+    parser.add_argument("--users", type=int, default=5000, help="Synthetic users (default: 5000)")
+    parser.add_argument("--samples", type=int, default=300, help="Lookups to time (default: 300)")
+    parser.add_argument("--compare", action="store_true", help="Also measure without the index")
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic rows afterwards")
+
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.users, args.samples, args.compare, args.keep)
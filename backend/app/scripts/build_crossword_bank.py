@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Build the crossword bank: high-quality layouts generated offline across all cores.
+
+For every level and language this lays out
+  - the daily word sets of the next --days days (several seeds each), so the
+    daily puzzles and users sending the day's words get a banked layout, and
+  - random word sets drawn from the level's translations until --sets of
+    them pass the quality bar, for practice puzzles.
+
+Layouts are searched in a process pool with a larger time budget than live
+requests get; only those passing crossword_bank.meets_bank_quality are
+stored. Re-running only adds or improves layouts.
+
+--prune first deletes layouts that were not built from the vocabulary: the
+API used to bank good live layouts of client-supplied words and clues, and
+those must not be served as practice puzzles.
+
+Usage:
+    python -m app.scripts.build_crossword_bank [--levels a1 a2] [--languages es fr] [--sets 100] [--days 7] [--workers 8] [--time-budget-ms 300] [--prune]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Add backend to path
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../.."))
+sys.path.insert(0, BACKEND_ROOT)
+
+from app.core.db import SessionLocal
+from app.models.crossword_bank import CrosswordBankEntry
+from app.models.vocabulary import Vocabulary
+from app.services import daily_words
+from app.services.crossword_bank import meets_bank_quality, store_layout, word_set_key
+from app.services.crossword_puzzle import CrosswordPuzzle
+from app.services.crossword_service import generate_crossword, max_grid_size
+from app.services.pre_generation import LANGUAGES, LEVELS
+
+DAILY_SEEDS = 8            # layouts tried per daily word set
+MAX_CANDIDATES_PER_SET = 30  # random sets tried per accepted one before giving up
+
+# (level, language, words, seed, time budget in ms)
+Task = Tuple[str, str, List[Dict[str, str]], int, float]
+
+
+def _layout_task(task: Task) -> Tuple[Task, Optional[CrosswordPuzzle]]:
+    """Worker: lay out one word set; return the puzzle only if it is bank quality."""
+    _, _, words, seed, time_budget_ms = task
+    puzzle = generate_crossword(words, time_budget_ms=time_budget_ms, seed=seed)
+    if not meets_bank_quality(puzzle, len(words)):
+        return task, None
+    return task, puzzle
+
+
+def _format(words: List[Vocabulary], language: str) -> List[Dict[str, str]]:
+    return [
+        {"word": daily_words.translation_for(w, language).upper(), "clue": w.definition}
+        for w in words
+    ]
+
+
+def _word_pool(db, level: str, language: str) -> List[Dict[str, str]]:
+    """Distinct answers of a level that fit the grid, with their clues."""
+    pool = {}
+    for word in db.query(Vocabulary).filter(Vocabulary.level == level).order_by(Vocabulary.id):
+        formatted = _format([word], language)[0]
+        if 2 <= len(formatted["word"]) <= max_grid_size():
+            pool.setdefault(formatted["word"], formatted)
+    return list(pool.values())
+
+
+def prune_layouts(db, levels: List[str], languages: List[str]) -> int:
+    """
+    Delete bank layouts whose answers and clues don't all come from the vocabulary.
+
+    Returns:
+        Number of layouts deleted
+    """
+    doomed = [
+        entry_id for (entry_id,) in
+        db.query(CrosswordBankEntry.id).filter(
+            (CrosswordBankEntry.level.is_(None)) | (CrosswordBankEntry.language.is_(None))
+        )
+    ]
+    for level in levels:
+        for language in languages:
+            known = {
+                (w["word"], w["clue"])
+                for w in _format(db.query(Vocabulary).filter(Vocabulary.level == level).all(), language)
+            }
+            rows = (
+                db.query(CrosswordBankEntry.id, CrosswordBankEntry.clues)
+                .filter(CrosswordBankEntry.level == level)
+                .filter(CrosswordBankEntry.language == language)
+            )
+            doomed.extend(
+                entry_id for entry_id, entry_clues in rows
+                if any((c["answer"], c["clue"]) not in known for c in entry_clues)
+            )
+    if doomed:
+        db.query(CrosswordBankEntry).filter(CrosswordBankEntry.id.in_(doomed)).delete(synchronize_session=False)
+        db.commit()
+    return len(doomed)
+
+
+def _store(db, results, stats: Dict[str, int]) -> int:
+    """Store the accepted layouts of a batch; return how many there were."""
+    accepted = 0
+    stats["candidates"] += len(results)
+    for (level, language, words, _, _), puzzle in results:
+        if puzzle is None:
+            continue
+        store_layout(db, [w["word"] for w in words], puzzle, level, language)
+        accepted += 1
+    db.commit()
+    stats["accepted"] += accepted
+    return accepted
+
+
+def build_bank(
+    levels: List[str],
+    languages: List[str],
+    sets: int,
+    days: int,
+    workers: int,
+    time_budget_ms: float,
+    seed: Optional[int] = None,
+    prune: bool = False
+) -> Dict[str, int]:
+    rng = random.Random(seed)
+    stats = {"candidates": 0, "accepted": 0}
+    batch_size = workers * 8
+
+    with SessionLocal() as db, ProcessPoolExecutor(max_workers=workers) as pool:
+        if prune:
+            print(f"🧹 Pruned {prune_layouts(db, levels, languages)} layouts not built from the vocabulary")
+        for level in levels:
+            for language in languages:
+                # Daily word sets of the coming days
+                tasks: List[Task] = []
+                for offset in range(days):
+                    words = daily_words.get_daily_words(db, level, day=date.today() + timedelta(days=offset))
+                    formatted = [w for w in _format(words, language) if len(w["word"]) <= max_grid_size()]
+                    if formatted:
+                        tasks.extend(
+                            (level, language, formatted, rng.getrandbits(32), time_budget_ms)
+                            for _ in range(DAILY_SEEDS)
+                        )
+                results = list(pool.map(_layout_task, tasks, chunksize=4))
+                daily_sets = {word_set_key(w["word"] for w in task[2]) for task, puzzle in results if puzzle}
+                _store(db, results, stats)
+                print(f"📅 {level}/{language}: {len(daily_sets)}/{days} daily word sets banked")
+
+                # Random word sets for practice
+                word_pool = _word_pool(db, level, language)
+                size = min(daily_words.DAILY_WORD_SET_SIZE, len(word_pool))
+                if size == 0:
+                    continue
+                seen = {
+                    key for (key,) in
+                    db.query(CrosswordBankEntry.word_set_hash)
+                    .filter(CrosswordBankEntry.level == level)
+                    .filter(CrosswordBankEntry.language == language)
+                }
+                accepted = 0
+                tried = 0
+                while accepted < sets and tried < sets * MAX_CANDIDATES_PER_SET:
+                    tasks = []
+                    for _ in range(batch_size):
+                        words = rng.sample(word_pool, size)
+                        key = word_set_key(w["word"] for w in words)
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        tasks.append((level, language, words, rng.getrandbits(32), time_budget_ms))
+                    if not tasks:
+                        break
+                    tried += len(tasks)
+                    accepted += _store(db, list(pool.map(_layout_task, tasks, chunksize=4)), stats)
+                print(f"🧩 {level}/{language}: {accepted} practice layouts banked from {tried} candidates")
+
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the bank of pre-generated crosswords")
+    parser.add_argument("--levels", nargs="+", default=LEVELS, choices=LEVELS, help="Levels to build (default: all)")
+    parser.add_argument("--languages", nargs="+", default=LANGUAGES, choices=LANGUAGES, help="Languages to build (default: all)")
+    parser.add_argument("--sets", type=int, default=100, help="Practice layouts to add per level and language (default: 100)")
+    parser.add_argument("--days", type=int, default=7, help="Days of daily word sets to lay out, from today (default: 7)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument("--time-budget-ms", type=float, default=300, help="Search budget per layout (default: 300)")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed, for reproducible runs")
+    parser.add_argument("--prune", action="store_true",
+                        help="First delete layouts whose words or clues are not from the vocabulary")
+
+    args = parser.parse_args()
+    started = time.perf_counter()
+    try:
+        stats = build_bank(
+            args.levels, args.languages, args.sets, args.days,
+            max(1, args.workers), args.time_budget_ms, args.seed, args.prune,
+        )
+    except Exception as e:
+        print(f"❌ Building the crossword bank failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - started
+    rate = stats["accepted"] / stats["candidates"] * 100 if stats["candidates"] else 0.0
+    print(f"\n✅ Stored {stats['accepted']} layouts from {stats['candidates']} candidates "
+          f"({rate:.1f}% accepted) in {elapsed:.1f}s "
+          f"({stats['candidates'] / elapsed:.1f} layouts/s with {args.workers} workers)")
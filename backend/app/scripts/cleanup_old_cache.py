@@ -3,11 +3,11 @@ Cleanup script for old mnemonic cache entries.
 Run this periodically to prevent database from growing too large.
 
 Usage:
-    python -m app.scripts.cleanup_old_cache [--days 90]
+    python -m app.scripts.cleanup_old_cache [--days 90] [--grace-minutes 60]
 """
 import argparse
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 # Add parent directory to path
@@ -15,14 +15,21 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from app.core.db import SessionLocal
 from app.models.mnemonic_cache import MnemonicCache
+from app.services.blob_store import get_blob_store
 
 
-def cleanup_old_cache(days: int = 90):
+# Images stored more recently than this are never treated as orphans: a
+# worker saves the image before the cache row that points to it
+ORPHAN_GRACE_MINUTES = 60
+
+
+def cleanup_old_cache(days: int = 90, grace_minutes: int = ORPHAN_GRACE_MINUTES):
     """
     Delete cache entries older than specified days.
     
     Args:
         days: Number of days to keep (default: 90)
+        grace_minutes: Keep unreferenced images stored less than this long ago
     """
     db = SessionLocal()
     try:
@@ -46,6 +53,9 @@ def cleanup_old_cache(days: int = 90):
         print(f"✅ Deleted {deleted} cache entries older than {days} days.")
         print(f"   Cutoff date: {cutoff.strftime('%Y-%m-%d %H:%M:%S')} UTC")
         
+        removed = cleanup_orphaned_images(db, grace_minutes)
+        print(f"✅ Removed {removed} images no longer referenced by any cache entry.")
+        
     except Exception as e:
         db.rollback()
         print(f"❌ Error cleaning up cache: {e}")
@@ -54,6 +64,41 @@ def cleanup_old_cache(days: int = 90):
         db.close()
 
 
+def cleanup_orphaned_images(db, grace_minutes: int = ORPHAN_GRACE_MINUTES) -> int:
+    """
+    Delete blob store images that no cache entry points to.
+    
+    Images are content-addressed and may be shared by several entries, so
+    they can only be removed once no row references them. Images newer than
+    grace_minutes are kept, since one may have just been stored by a worker
+    that hasn't written its cache row yet.
+    
+    Args:
+        db: Database session
+        grace_minutes: Minimum age of an image before it can be deleted
+    
+    Returns:
+        Number of images deleted
+    """
+    # Take the cutoff before reading references, so any image stored before
+    # it has had its row written by the time the references are read
+    stored_before = datetime.now(timezone.utc) - timedelta(minutes=grace_minutes)
+    referenced = {
+        digest for (digest,) in
+        db.query(MnemonicCache.image_sha256)
+        .filter(MnemonicCache.image_sha256.isnot(None))
+        .distinct()
+    }
+    
+    store = get_blob_store()
+    removed = 0
+    for digest in list(store.iter_digests(stored_before=stored_before)):
+        if digest not in referenced:
+            store.delete(digest)
+            removed += 1
+    return removed
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Cleanup old mnemonic cache entries")
     parser.add_argument(
@@ -62,7 +107,13 @@ if __name__ == "__main__":
         default=90,
         help="Number of days to keep (default: 90)"
     )
+    parser.add_argument(
+        "--grace-minutes",
+        type=int,
+        default=ORPHAN_GRACE_MINUTES,
+        help=f"Keep unreferenced images newer than this (default: {ORPHAN_GRACE_MINUTES})"
+    )
     
     args = parser.parse_args()
-    cleanup_old_cache(args.days)
+    cleanup_old_cache(args.days, args.grace_minutes)
 
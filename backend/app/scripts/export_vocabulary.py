@@ -13,12 +13,9 @@ CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../.."))
 sys.path.insert(0, BACKEND_ROOT)
 
-from dotenv import load_dotenv
 from app.core.db import SessionLocal
 from app.models.vocabulary import Vocabulary
 
-load_dotenv()
-
 def export_to_csv(output_path: str = "vocabulary_export.csv"):
     """Export vocabulary to CSV file."""
     db = SessionLocal()
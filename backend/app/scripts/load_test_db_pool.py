@@ -0,0 +1,176 @@
+"""
+Load-test database pool configurations.
+
+Simulates FastAPI's threadpool: --threads workers (40, as FastAPI runs sync
+endpoints) each check a connection out, run a query that holds it for
+--hold-ms, and return it. Every configuration gets its own engine built like
+app.core.db's (InstrumentedQueuePool, timeouts, pre-ping, recycle), and the
+report shows throughput, checkout wait percentiles, checkout timeouts, peak
+occupancy and overflow, plus query errors.
+
+With --kill-idle, the pool is warmed up and its idle connections are then
+terminated server-side (as a Postgres restart or a proxy idle timeout would),
+so the run shows stale-connection errors with --no-pre-ping and none with it.
+
+Usage:
+    python -m app.scripts.load_test_db_pool [--threads 40] [--requests 2000] [--hold-ms 20] [--configs 5:0 10:10 20:20] [--pool-timeout 10] [--kill-idle] [--no-pre-ping]
+
+Each config is POOL_SIZE:MAX_OVERFLOW. Needs a Postgres DATABASE_URL.
+"""
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import create_engine, exc, text
+
+from app.core.config import get_settings
+from app.core.db import connect_args_for, database_url
+from app.core.db_pool import InstrumentedQueuePool
+
+APPLICATION_NAME = "easeevocab-pool-load-test"
+
+
+def make_engine(pool_size: int, max_overflow: int, pool_timeout: float, pre_ping: bool):
+    """Engine configured like app.core.db's, with the given pool sizing."""
+    settings = get_settings()
+    connect_args = connect_args_for(database_url())
+    connect_args["application_name"] = APPLICATION_NAME
+    return create_engine(
+        database_url(),
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=pre_ping,
+        pool_use_lifo=settings.db_pool_use_lifo,
+        connect_args=connect_args,
+    )
+
+
+def kill_idle_connections(engine, pool_size: int) -> int:
+    """Open pool_size connections, return them to the pool, then terminate them server-side."""
+    connections = [engine.connect() for _ in range(pool_size)]
+    for conn in connections:
+        conn.execute(text("SELECT 1"))
+    for conn in connections:
+        conn.close()
+
+    with create_engine(database_url(), future=True).connect() as admin:
+        killed = admin.execute(
+            text(
+                "SELECT count(pg_terminate_backend(pid)) FROM pg_stat_activity "
+                "WHERE application_name = :name AND pid <> pg_backend_pid()"
+            ),
+            {"name": APPLICATION_NAME},
+        ).scalar()
+        admin.commit()
+    return killed
+
+
+def run_config(
+    pool_size: int,
+    max_overflow: int,
+    threads: int,
+    total: int,
+    hold_ms: int,
+    pool_timeout: float,
+    pre_ping: bool,
+    kill_idle: bool
+) -> Dict[str, Any]:
+    """Run one configuration; returns throughput, errors and the pool's metrics."""
+    engine = make_engine(pool_size, max_overflow, pool_timeout, pre_ping)
+    killed = kill_idle_connections(engine, pool_size) if kill_idle else 0
+
+    errors = {"timeouts": 0, "stale": 0}
+    errors_lock = threading.Lock()
+
+    def one(_):
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT pg_sleep(:s)"), {"s": hold_ms / 1000})
+        except exc.TimeoutError:
+            with errors_lock:
+                errors["timeouts"] += 1
+        except exc.DBAPIError:
+            with errors_lock:
+                errors["stale"] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - started
+
+    metrics = engine.pool.metrics.snapshot(engine.pool)
+    engine.dispose()
+    return {
+        "config": f"{pool_size}:{max_overflow}",
+        "rps": round(total / wall, 1),
+        "killed": killed,
+        "checkout_timeouts": errors["timeouts"],
+        "query_errors": errors["stale"],
+        **metrics,
+    }
+
+
+def print_results(results: List[Dict[str, Any]]):
+    columns: List[Tuple[str, str]] = [
+        ("config", "size:ovf"),
+        ("rps", "rps"),
+        ("wait_ms_p50", "wait p50"),
+        ("wait_ms_p99", "wait p99"),
+        ("wait_ms_max", "wait max"),
+        ("checkout_timeouts", "timeouts"),
+        ("query_errors", "errors"),
+        ("peak_checked_out", "peak"),
+        ("killed", "killed"),
+    ]
+    print("\n" + "".join(f"{label:>11}" for _, label in columns))
+    for r in results:
+        print("".join(f"{r[key]:>11}" for key, _ in columns))
+
+
+def main(
+    configs: List[str],
+    threads: int,
+    total: int,
+    hold_ms: int,
+    pool_timeout: float,
+    pre_ping: bool,
+    kill_idle: bool
+):
+    results = []
+    for spec in configs:
+        pool_size, max_overflow = (int(n) for n in spec.split(":"))
+        print(f"🔌 pool_size={pool_size} max_overflow={max_overflow}: "
+              f"{total} checkouts from {threads} threads, {hold_ms} ms each...")
+        results.append(run_config(
+            pool_size, max_overflow, threads, total, hold_ms, pool_timeout, pre_ping, kill_idle
+        ))
+    print_results(results)
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Load-test database pool configurations")
+    parser.add_argument("--configs", nargs="+",
+                        default=[f"{settings.db_pool_size}:{settings.db_max_overflow}"],
+                        help="POOL_SIZE:MAX_OVERFLOW pairs (default: the configured one)")
+    parser.add_argument("--threads", type=int, default=40, help="Concurrent workers (default: 40, FastAPI's threadpool)")
+    parser.add_argument("--requests", type=int, default=2000, help="Checkouts per configuration (default: 2000)")
+    parser.add_argument("--hold-ms", type=int, default=20, help="How long each checkout holds its connection (default: 20)")
+    parser.add_argument("--pool-timeout", type=float, default=settings.db_pool_timeout,
+                        help=f"Checkout timeout in seconds (default: {settings.db_pool_timeout})")
+    parser.add_argument("--no-pre-ping", action="store_true", help="Disable pre-ping")
+    parser.add_argument("--kill-idle", action="store_true", help="Terminate the warmed-up pool's connections before the run")
+
+    args = parser.parse_args()
+    main(args.configs, args.threads, args.requests, args.hold_ms, args.pool_timeout, not args.no_pre_ping, args.kill_idle)
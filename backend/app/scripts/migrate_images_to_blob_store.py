@@ -0,0 +1,135 @@
+"""
+Move inline base64 images from mnemonic_cache.image_base64 into the blob store.
+
+Rows are also migrated lazily when they are first read, so this only needs to
+run once after deploying the blob store to reclaim table space in one go.
+An inline image is only dropped once it reads back from the blob store.
+
+With --from-dir it also copies images from a local blob directory (the old
+default, backend/blob_store) into the configured store, which is the
+database unless BLOB_STORE_DIR is set.
+
+Usage:
+    python -m app.scripts.migrate_images_to_blob_store [--batch-size 50] [--from-dir backend/blob_store]
+"""
+import argparse
+import base64
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.core.db import SessionLocal
+from app.models.mnemonic_cache import MnemonicCache
+from app.services.blob_store import LocalBlobStore, get_blob_store
+
+
+def migrate_images(batch_size: int = 50):
+    """
+    Move legacy images to the blob store in batches.
+
+    Args:
+        batch_size: Rows per transaction (each row carries a full image)
+    """
+    store = get_blob_store()
+    db = SessionLocal()
+    moved = 0
+    failed = 0
+    last_id = 0
+    try:
+        while True:
+            rows = (
+                db.query(MnemonicCache.id, MnemonicCache.image_base64)
+                .filter(MnemonicCache.image_base64.isnot(None))
+                .filter(MnemonicCache.id > last_id)
+                .order_by(MnemonicCache.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+
+            # Store the whole batch first: the blob store may use its own
+            # database connection, which must not wait on this transaction
+            stored = {}
+            for row_id, image_base64 in rows:
+                last_id = row_id
+                try:
+                    data = base64.b64decode(image_base64)
+                except ValueError as e:
+                    print(f"⚠️ Skipping row {row_id}: invalid base64 ({e})")
+                    failed += 1
+                    continue
+
+                digest = store.put(data)
+                if store.get(digest) != data:
+                    print(f"⚠️ Skipping row {row_id}: image did not read back from the blob store")
+                    failed += 1
+                    continue
+                stored[row_id] = digest
+            db.rollback()  # end the read transaction
+
+            for row_id, digest in stored.items():
+                db.query(MnemonicCache).filter(MnemonicCache.id == row_id).update(
+                    {"image_sha256": digest, "image_base64": None},
+                    synchronize_session=False,
+                )
+                moved += 1
+            db.commit()
+            print(f"   Moved {moved} images so far...")
+
+        print(f"✅ Moved {moved} images to {type(store).__name__}")
+        if failed:
+            print(f"⚠️ {failed} rows were left in place")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error migrating images: {e}")
+        raise
+    finally:
+        db.close()
+
+
+def copy_local_blobs(from_dir: str) -> int:
+    """
+    Copy every image in a local blob directory into the configured blob store.
+
+    Args:
+        from_dir: Root of a LocalBlobStore
+
+    Returns:
+        Number of images copied
+    """
+    source = LocalBlobStore(from_dir)
+    store = get_blob_store()
+    copied = 0
+    for digest in source.iter_digests():
+        data = source.get(digest)
+        if data is None:
+            continue
+        if store.put(data) != digest:
+            print(f"⚠️ Skipping {digest}: contents don't match the digest")
+            continue
+        copied += 1
+    print(f"✅ Copied {copied} images from {from_dir} to {type(store).__name__}")
+    return copied
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move cached mnemonic images to the blob store")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50,
+        help="Rows per transaction (default: 50)"
+    )
+    parser.add_argument(
+        "--from-dir",
+        default=None,
+        help="Also copy images from this local blob directory"
+    )
+
+    args = parser.parse_args()
+    if args.from_dir:
+        copy_local_blobs(args.from_dir)
+    migrate_images(args.batch_size)
@@ -4,49 +4,90 @@ Daily pre-generation script for mnemonics.
 Run this script daily (via cron, Railway cron, or scheduled task) to pre-generate
 the first 3 flashcards for each language/level combination.
 
+Re-running on the same day resumes from the stored per-word progress. The run
+is recorded as a pre-generation job, so it will not start while another job
+(e.g. one triggered via POST /pre-generation/run) is active for today.
+
 Usage:
-    python -m app.scripts.pre_generate_daily
+    python -m app.scripts.pre_generate_daily [--text-workers 4] [--image-workers 2]
 """
 import sys
 import os
 import asyncio
+import argparse
 
 # Add backend to path
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../.."))
 sys.path.insert(0, BACKEND_ROOT)
 
-from dotenv import load_dotenv
+from app.core.config import get_settings
 from app.core.db import SessionLocal
-from app.services.pre_generation import pre_generate_all_combinations
+from app.services.pre_generation_jobs import JobAlreadyRunning, create_job, execute_job
+
 
-load_dotenv()
+def _format_latency(summary: dict) -> str:
+    if not summary["count"]:
+        return "n/a"
+    return (
+        f"n={summary['count']} mean={summary['mean']}s "
+        f"p50={summary['p50']}s p95={summary['p95']}s max={summary['max']}s"
+    )
 
 
-async def main():
+async def main(text_workers: int, image_workers: int):
     """Main function to run pre-generation."""
-    db = SessionLocal()
     try:
-        print("🚀 Starting daily pre-generation...")
-        stats = await pre_generate_all_combinations(db)
+        with SessionLocal() as db:
+            try:
+                job_id = create_job(db).id
+            except JobAlreadyRunning as e:
+                print(f"⏭️ {e}, skipping")
+                return 0
+
+        print(f"🚀 Starting daily pre-generation (job {job_id})...")
+        stats = await execute_job(
+            job_id,
+            text_workers=text_workers,
+            image_workers=image_workers,
+        )
         print("\n✅ Pre-generation completed successfully!")
-        print(f"📊 Summary:")
+        print("📊 Summary:")
         print(f"   Combinations: {stats['total_combinations']}")
         print(f"   Words processed: {stats['total_words_processed']}")
         print(f"   Already cached: {stats['total_cached']}")
         print(f"   Newly generated: {stats['total_generated']}")
         print(f"   Errors: {stats['total_errors']}")
+        print("⏱️ Performance:")
+        print(f"   Wall time: {stats['elapsed_seconds']}s")
+        print(f"   Throughput: {stats['throughput_per_minute']} words/min")
+        print(f"   Text stage: {_format_latency(stats['stage_latency']['text'])}")
+        print(f"   Image stage: {_format_latency(stats['stage_latency']['image'])}")
         return 0
     except Exception as e:
         print(f"❌ Pre-generation failed: {e}")
         import traceback
         traceback.print_exc()
         return 1
-    finally:
-        db.close()
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Pre-generate today's mnemonics")
+    parser.add_argument(
+        "--text-workers",
+        type=int,
+        default=settings.pre_gen_text_workers,
+        help=f"Concurrent text generations (default: {settings.pre_gen_text_workers})"
+    )
+    parser.add_argument(
+        "--image-workers",
+        type=int,
+        default=settings.pre_gen_image_workers,
+        help=f"Concurrent image generations (default: {settings.pre_gen_image_workers})"
+    )
+
+    args = parser.parse_args()
+    exit_code = asyncio.run(main(args.text_workers, args.image_workers))
     sys.exit(exit_code)
 
@@ -0,0 +1,283 @@
+"""
+Shared async client for Gemini mnemonic generation.
+
+The google-generativeai SDK is synchronous, so every call is dispatched to a
+dedicated bounded thread pool instead of running on the event loop. The pool
+size caps how many Gemini calls are in flight per worker, and each call gets
+its own timeout (enforced both on the awaiting side and on the HTTP request).
+
+The SDK is imported when the client is created, not with this module, as it
+is slow to import and only the mnemonic routes and pre-generation use it.
+"""
+import asyncio
+import base64
+import json
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+TEXT_MODEL = "gemini-2.5-flash"
+IMAGE_MODEL = "gemini-2.5-flash-image"
+
+_DATA_URI_RE = re.compile(r"data:image/[^;]+;base64,([A-Za-z0-9+/=]+)")
+
+
+class AIServiceError(Exception):
+    """Raised when the AI service fails or returns no usable data."""
+
+
+class AITimeoutError(AIServiceError):
+    """Raised when a generation call does not finish within its timeout."""
+
+
+class AIResponseError(AIServiceError):
+    """Raised when the AI service responds but the payload cannot be parsed."""
+
+
+def build_mnemonic_prompt(word: str, definition: str) -> str:
+    """Build the prompt asking Gemini for mnemonic JSON."""
+    return f"""
+    Create mnemonic JSON.
+
+    Word: {word}
+    Definition: {definition}
+
+    STRICT OUTPUT:
+    {{
+      "mnemonic_word": "...",
+      "mnemonic_sentence": "..."
+    }}
+    """
+
+
+def build_image_prompt(word: str, definition: str, mnemonic_sentence: str) -> str:
+    """Build the prompt for the mnemonic illustration."""
+    # Image should combine the mnemonic (for the word being learned) with the definition context
+    return (
+        f"Funny colorful cartoon illustration representing the mnemonic: {mnemonic_sentence}. "
+        f"This is a memory aid for the word '{word}' which means: {definition}. "
+        "No text in the image. Highly visual and memorable. "
+        "The illustration should help remember the word through the mnemonic connection."
+    )
+
+
+def parse_mnemonic_json(text: str) -> Tuple[str, str]:
+    """
+    Parse the model's mnemonic JSON, tolerating markdown fences.
+
+    Returns:
+        Tuple of (mnemonic_word, mnemonic_sentence)
+
+    Raises:
+        AIResponseError: If the payload is not valid JSON or misses fields
+    """
+    raw = text.strip()
+    raw = raw.replace("```json", "").replace("```", "")
+    raw = raw.replace("**", "")
+    raw = raw.strip()
+
+    try:
+        parsed = json.loads(raw)
+        mnemonic_word = parsed.get("mnemonic_word")
+        mnemonic_sentence = parsed.get("mnemonic_sentence")
+
+        if not mnemonic_word or not mnemonic_sentence:
+            raise ValueError("Missing required fields in response")
+    except (json.JSONDecodeError, AttributeError, ValueError) as e:
+        raise AIResponseError(str(e)) from e
+
+    return mnemonic_word, mnemonic_sentence
+
+
+def extract_image_bytes(response: Any) -> Optional[bytes]:
+    """
+    Extract raw image bytes from a Gemini response.
+
+    Inline data may come back as bytes, as a base64 string, or (rarely) as a
+    data URI embedded in the text part.
+    """
+    if not response or not response.parts:
+        return None
+
+    for part in response.parts:
+        inline = part.inline_data
+        if inline is None or not inline.data:
+            continue
+
+        data = inline.data
+        if isinstance(data, bytes):
+            return data
+        if isinstance(data, str):
+            try:
+                return base64.b64decode(data, validate=True)
+            except ValueError:
+                return data.encode()
+        return bytes(data)
+
+    text = getattr(response, "text", None)
+    if text:
+        match = _DATA_URI_RE.search(text)
+        if match:
+            return base64.b64decode(match.group(1))
+
+    return None
+
+
+class GeminiClient:
+    """
+    Async facade over the synchronous Gemini SDK.
+
+    Calls are queued on a private thread pool whose size is the concurrency
+    limit. If the awaiting coroutine times out or is cancelled (e.g. the
+    client disconnected), a call that has not started yet is dropped from
+    the queue; one that is already running is bounded by the SDK timeout.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int = 4,
+        text_timeout: float = 30.0,
+        image_timeout: float = 90.0,
+    ):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self.max_concurrency = max_concurrency
+        self.text_timeout = text_timeout
+        self.image_timeout = image_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="gemini",
+        )
+
+    def close(self) -> None:
+        """Stop the thread pool; calls already running are left to finish."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn: Callable[[], Any], timeout: float) -> Any:
+        """Run a blocking SDK call in the pool and await it with a timeout."""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, fn)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError as e:
+            raise AITimeoutError(f"Gemini call timed out after {timeout:.0f}s") from e
+
+    async def generate_mnemonic_text(
+        self,
+        word: str,
+        definition: str,
+        timeout: Optional[float] = None,
+    ) -> Tuple[str, str]:
+        """
+        Generate the mnemonic word and sentence for a word.
+
+        Returns:
+            Tuple of (mnemonic_word, mnemonic_sentence)
+
+        Raises:
+            AIServiceError: If the call fails, times out or returns bad data
+        """
+        timeout = timeout or self.text_timeout
+        prompt = build_mnemonic_prompt(word, definition)
+
+        def call():
+            model = self._genai.GenerativeModel(TEXT_MODEL)
+            return model.generate_content(
+                contents=[prompt],
+                request_options={"timeout": timeout},
+            )
+
+        try:
+            res = await self._run(call, timeout)
+        except AIServiceError:
+            raise
+        except Exception as e:
+            raise AIServiceError(str(e)) from e
+
+        if not res or not res.text:
+            raise AIServiceError("Empty response from AI service")
+
+        return parse_mnemonic_json(res.text)
+
+    async def generate_mnemonic_image(
+        self,
+        word: str,
+        definition: str,
+        mnemonic_sentence: str,
+        timeout: Optional[float] = None,
+    ) -> Optional[bytes]:
+        """
+        Generate the mnemonic illustration for a word.
+
+        Returns:
+            Raw image bytes, or None if the model returned no image data
+
+        Raises:
+            AIServiceError: If the call fails or times out
+        """
+        timeout = timeout or self.image_timeout
+        prompt = build_image_prompt(word, definition, mnemonic_sentence)
+
+        def call():
+            model = self._genai.GenerativeModel(IMAGE_MODEL)
+            return model.generate_content(
+                prompt,
+                request_options={"timeout": timeout},
+            )
+
+        try:
+            res = await self._run(call, timeout)
+        except AIServiceError:
+            raise
+        except Exception as e:
+            raise AIServiceError(str(e)) from e
+
+        image_bytes = extract_image_bytes(res)
+        if not image_bytes:
+            logger.warning("Image generation for %r returned no image data", word)
+        return image_bytes
+
+
+_client: Optional[GeminiClient] = None
+_client_lock = threading.Lock()
+
+
+def get_ai_client() -> GeminiClient:
+    """
+    Return the process-wide Gemini client, creating it on first use.
+
+    Also usable as a FastAPI dependency.
+
+    Raises:
+        RuntimeError: If GEMINI_API_KEY is not set
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                settings = get_settings()
+                _client = GeminiClient(
+                    api_key=settings.require("gemini_api_key"),
+                    max_concurrency=settings.gemini_max_concurrency,
+                    text_timeout=settings.gemini_text_timeout,
+                    image_timeout=settings.gemini_image_timeout,
+                )
+    return _client
+
+
+def close_ai_client() -> None:
+    """Shut down the process-wide Gemini client's thread pool, if it was created."""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
@@ -0,0 +1,209 @@
+"""
+Content-addressed storage for binary blobs (mnemonic images).
+
+Blobs are stored once as raw bytes and addressed by the hex SHA-256 of their
+content, so identical images are deduplicated and a digest can be served
+with a permanent ETag.
+
+By default blobs live in the image_blobs table: the web service's disk is
+ephemeral (render.yaml, free plan) and is wiped on every deploy, while the
+database is not. Setting BLOB_STORE_DIR selects the local filesystem backend
+instead, for hosts with a persistent disk; it shards files into two-level
+directories (ab/cd/abcd...) and writes atomically.
+"""
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional, Set
+
+from app.core.config import get_settings
+from app.core.db import SessionLocal, insert_for
+from app.models.image_blob import ImageBlob
+
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def compute_digest(data: bytes) -> str:
+    """Return the hex SHA-256 digest used as the blob key."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_valid_digest(digest: str) -> bool:
+    """Check that a string is a lowercase hex SHA-256 digest."""
+    return bool(DIGEST_RE.match(digest))
+
+
+def sniff_image_type(head: bytes) -> str:
+    """Guess an image MIME type from its first bytes."""
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    return "application/octet-stream"
+
+
+class BlobStore:
+    """Interface for content-addressed blob storage backends."""
+
+    def put(self, data: bytes) -> str:
+        """Store data (no-op if already present) and return its digest."""
+        raise NotImplementedError
+
+    def open(self, digest: str) -> Optional[BinaryIO]:
+        """Open a blob for streaming, or return None if it does not exist."""
+        raise NotImplementedError
+
+    def exists(self, digest: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, digest: str) -> None:
+        raise NotImplementedError
+
+    def iter_digests(self, stored_before: Optional[datetime] = None) -> Iterator[str]:
+        """Yield the digest of every stored blob (only those stored before stored_before, if given)."""
+        raise NotImplementedError
+
+    def existing(self, digests: Iterable[str]) -> Set[str]:
+        """Return the subset of digests that are stored."""
+        return {digest for digest in digests if self.exists(digest)}
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """Read a whole blob, or return None if it does not exist."""
+        f = self.open(digest)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+
+class LocalBlobStore(BlobStore):
+    """Blob store backed by a directory on the local filesystem."""
+
+    def __init__(self, root: os.PathLike | str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, digest: str) -> Path:
+        if not is_valid_digest(digest):
+            raise ValueError(f"Invalid blob digest: {digest!r}")
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def put(self, data: bytes) -> str:
+        digest = compute_digest(data)
+        path = self._path(digest)
+        if path.exists():
+            return digest
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file in the same directory, then rename, so readers
+        # never see a partially written blob
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return digest
+
+    def open(self, digest: str) -> Optional[BinaryIO]:
+        try:
+            return open(self._path(digest), "rb")
+        except FileNotFoundError:
+            return None
+
+    def exists(self, digest: str) -> bool:
+        return self._path(digest).exists()
+
+    def delete(self, digest: str) -> None:
+        try:
+            self._path(digest).unlink()
+        except FileNotFoundError:
+            pass
+
+    def iter_digests(self, stored_before: Optional[datetime] = None) -> Iterator[str]:
+        cutoff = stored_before.timestamp() if stored_before else None
+        for path in self.root.glob("*/*/*"):
+            if not is_valid_digest(path.name):
+                continue
+            if cutoff is not None:
+                try:
+                    if path.stat().st_mtime >= cutoff:
+                        continue
+                except FileNotFoundError:
+                    continue
+            yield path.name
+
+
+class DatabaseBlobStore(BlobStore):
+    """Blob store backed by the image_blobs table, through the sync engine."""
+
+    def put(self, data: bytes) -> str:
+        digest = compute_digest(data)
+        with SessionLocal() as db:
+            stmt = insert_for(db, ImageBlob).values(
+                sha256=digest,
+                data=data,
+                created_at=datetime.now(timezone.utc),
+            ).on_conflict_do_nothing(index_elements=["sha256"])
+            db.execute(stmt)
+            db.commit()
+        return digest
+
+    def open(self, digest: str) -> Optional[BinaryIO]:
+        data = self.get(digest)
+        return io.BytesIO(data) if data is not None else None
+
+    def get(self, digest: str) -> Optional[bytes]:
+        with SessionLocal() as db:
+            return db.query(ImageBlob.data).filter(ImageBlob.sha256 == digest).scalar()
+
+    def exists(self, digest: str) -> bool:
+        return bool(self.existing([digest]))
+
+    def existing(self, digests: Iterable[str]) -> Set[str]:
+        digests = list(set(digests))
+        if not digests:
+            return set()
+        with SessionLocal() as db:
+            rows = db.query(ImageBlob.sha256).filter(ImageBlob.sha256.in_(digests))
+            return {digest for (digest,) in rows}
+
+    def delete(self, digest: str) -> None:
+        with SessionLocal() as db:
+            db.query(ImageBlob).filter(ImageBlob.sha256 == digest).delete(synchronize_session=False)
+            db.commit()
+
+    def iter_digests(self, stored_before: Optional[datetime] = None) -> Iterator[str]:
+        with SessionLocal() as db:
+            query = db.query(ImageBlob.sha256)
+            if stored_before is not None:
+                query = query.filter(ImageBlob.created_at < stored_before)
+            digests = [digest for (digest,) in query]
+        yield from digests
+
+
+_store: Optional[BlobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Return the process-wide blob store: BLOB_STORE_DIR if set, else the database."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                blob_dir = get_settings().blob_store_dir
+                _store = LocalBlobStore(blob_dir) if blob_dir else DatabaseBlobStore()
+    return _store
@@ -0,0 +1,191 @@
+"""
+Bank of pre-generated crossword layouts, indexed by word set.
+
+Layouts are built offline (see app/scripts/build_crossword_bank.py) with a
+bigger search budget than live requests get, and only kept if they pass
+meets_bank_quality. A request for a set of words looks its layout up by the
+hash of the sorted answers, so the same words get the stored layout instead
+of a live search; clue texts are taken from the request (see
+CrosswordPuzzle.with_clues). Only the builder script writes to the bank.
+
+Practice puzzles are drawn like word_sampler draws words: a dense array of
+entry ids per (level, language) is kept in memory, a random position is
+picked and that one row is loaded by primary key, instead of
+`ORDER BY random()` sorting the level's whole bank on every request. The
+index is rebuilt every CROSSWORD_BANK_INDEX_TTL_SECONDS to pick up layouts
+added by the builder.
+"""
+import hashlib
+import random
+import threading
+import time
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.db import insert_for
+from app.models.crossword_bank import CrosswordBankEntry
+from app.services.crossword_puzzle import CrosswordPuzzle
+from app.utils.lru_cache import LRUCache
+
+
+@lru_cache(maxsize=1)
+def _layouts() -> LRUCache:
+    """Word set hash -> banked layout (CROSSWORD_BANK_CACHE_SIZE entries)."""
+    # Stored layouts only get replaced by better ones, so hits can be cached for long
+    return LRUCache(get_settings().crossword_bank_cache_size, 3600)
+
+# (level, language) -> ids of its bank entries
+_index: Dict[Tuple[str, str], array] = {}
+_index_built_at: Dict[Tuple[str, str], float] = {}
+_index_lock = threading.Lock()
+_rng = random.Random()
+
+
+def word_set_key(words: Iterable[str]) -> str:
+    """Hash identifying a set of answers, independent of order and case."""
+    answers = sorted({w.upper() for w in words})
+    return hashlib.sha256("\n".join(answers).encode("utf-8")).hexdigest()
+
+
+def meets_bank_quality(puzzle: CrosswordPuzzle, word_count: int) -> bool:
+    """
+    Whether a generated puzzle is good enough to be stored in the bank: every
+    word placed, at most CROSSWORD_BANK_MAX_ISLANDS disconnected groups, and
+    at least CROSSWORD_BANK_MIN_INTERSECTIONS_PER_WORD crossings per word.
+    """
+    settings = get_settings()
+    stats = puzzle.stats
+    return (
+        word_count > 0
+        and not puzzle.unplaced
+        and stats["islands"] <= settings.crossword_bank_max_islands
+        and stats["intersections"] >= settings.crossword_bank_min_intersections_per_word * word_count
+    )
+
+
+def store_layout(
+    db: Session,
+    words: Iterable[str],
+    puzzle: CrosswordPuzzle,
+    level: Optional[str] = None,
+    language: Optional[str] = None
+) -> None:
+    """
+    Store a layout for a word set, replacing the stored one only if it scores higher.
+    The caller commits.
+
+    Args:
+        db: Database session
+        words: Answers of the layout
+        puzzle: Generated puzzle
+        level: Level the words came from, if known
+        language: Answer language, if known
+    """
+    answers = sorted({w.upper() for w in words})
+    stmt = insert_for(db, CrosswordBankEntry).values(
+        word_set_hash=word_set_key(answers),
+        words=answers,
+        level=level,
+        language=language,
+        grid=puzzle.grid(),
+        clues=puzzle.clues(),
+        score=puzzle.stats["score"],
+        intersections=puzzle.stats["intersections"],
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CrosswordBankEntry.word_set_hash],
+        set_={
+            "grid": stmt.excluded.grid,
+            "clues": stmt.excluded.clues,
+            "score": stmt.excluded.score,
+            "intersections": stmt.excluded.intersections,
+            "level": func.coalesce(CrosswordBankEntry.level, stmt.excluded.level),
+            "language": func.coalesce(CrosswordBankEntry.language, stmt.excluded.language),
+        },
+        where=stmt.excluded.score > CrosswordBankEntry.score,
+    )
+    db.execute(stmt)
+    _layouts().invalidate(word_set_key(answers))
+
+
+def find_layout(db: Session, words: Iterable[str]) -> Optional[CrosswordPuzzle]:
+    """
+    Look up the banked layout of a word set.
+
+    Returns:
+        CrosswordPuzzle with the banked clue texts, or None if the set is not in the bank
+    """
+    key = word_set_key(words)
+    layout = _layouts().get(key)
+    if layout is not None:
+        return layout
+
+    row = (
+        db.query(CrosswordBankEntry.grid, CrosswordBankEntry.clues)
+        .filter(CrosswordBankEntry.word_set_hash == key)
+        .first()
+    )
+    if row is None:
+        return None
+
+    layout = CrosswordPuzzle.from_stored(row.grid, row.clues)
+    _layouts().set(key, layout)
+    return layout
+
+
+def invalidate_index() -> None:
+    """Drop the practice draw index so the next draw rebuilds it."""
+    with _index_lock:
+        _index.clear()
+        _index_built_at.clear()
+
+
+def _entry_ids(db: Session, level: str, language: str) -> array:
+    key = (level, language)
+    ttl = get_settings().crossword_bank_index_ttl_seconds
+    ids = _index.get(key)
+    if ids is not None and time.monotonic() - _index_built_at[key] < ttl:
+        return ids
+
+    with _index_lock:
+        ids = _index.get(key)
+        if ids is not None and time.monotonic() - _index_built_at[key] < ttl:
+            return ids
+        ids = array("l", (
+            entry_id for (entry_id,) in
+            db.query(CrosswordBankEntry.id)
+            .filter(CrosswordBankEntry.level == level)
+            .filter(CrosswordBankEntry.language == language)
+            .order_by(CrosswordBankEntry.id)
+        ))
+        _index[key] = ids
+        _index_built_at[key] = time.monotonic()
+        return ids
+
+
+def draw_layout(db: Session, level: str, language: str) -> Optional[CrosswordPuzzle]:
+    """
+    Pick a random banked layout for a level and language (for practice puzzles).
+
+    Returns:
+        CrosswordPuzzle, or None if the bank has none
+    """
+    for _ in range(2):
+        ids = _entry_ids(db, level, language)
+        if not ids:
+            return None
+        row = (
+            db.query(CrosswordBankEntry.grid, CrosswordBankEntry.clues)
+            .filter(CrosswordBankEntry.id == ids[_rng.randrange(len(ids))])
+            .first()
+        )
+        if row is not None:
+            return CrosswordPuzzle.from_stored(row.grid, row.clues)
+        # Entries were deleted (e.g. pruned by the builder): rebuild and retry once
+        invalidate_index()
+    return None
@@ -0,0 +1,183 @@
+"""
+Check crossword answers against the stored solution.
+
+A stored puzzle is turned once into a flat solution string plus a letter-cell
+mask and word spans, and cached by crossword id. Answers arrive as one flat
+string (or row strings joined into one), so checking is a handful of
+C-level string operations: a map/compress over the two strings for the cell
+count and one slice comparison per word.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import compress
+from operator import eq
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.crossword import Crossword
+from app.models.crossword_attempts import CrosswordAttempt
+from app.services.crossword_puzzle import ACROSS, CrosswordPuzzle
+from app.utils.lru_cache import LRUCache
+
+BLOCK = "#"
+
+
+@lru_cache(maxsize=1)
+def _solutions() -> LRUCache:
+    """Crossword id -> Solution (CROSSWORD_SOLUTION_CACHE_SIZE entries)."""
+    return LRUCache(get_settings().crossword_solution_cache_size, 86400)
+
+
+@dataclass(frozen=True)
+class Solution:
+    """Flat, row-major solution of a stored crossword."""
+    crossword_id: int
+    height: int
+    width: int
+    letters: str          # one char per cell, BLOCK for blocks
+    letter_mask: bytes    # 1 for letter cells, 0 for blocks
+    total_cells: int
+    # (number, direction, answer, start index, stride)
+    words: Tuple[Tuple[int, str, str, int, int], ...]
+    # Shared daily puzzle, with a leaderboard
+    ranked: bool = False
+
+
+@dataclass
+class CheckResult:
+    correct_cells: int
+    total_cells: int
+    results: List[Dict[str, Any]]
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct_cells / self.total_cells if self.total_cells else 0.0
+
+    @property
+    def solved(self) -> bool:
+        return self.total_cells > 0 and self.correct_cells == self.total_cells
+
+
+class AnswerFormatError(ValueError):
+    """Raised when an answer string does not match the puzzle's shape."""
+
+
+def build_solution(crossword_id: int, puzzle: CrosswordPuzzle, ranked: bool = False) -> Solution:
+    """Flatten a numbered puzzle into a Solution."""
+    width = puzzle.width
+    letters = "".join(BLOCK if letter is None else letter for letter in puzzle.letters)
+    letter_mask = bytes(letter is not None for letter in puzzle.letters)
+    words = tuple(
+        (
+            entry.number,
+            entry.direction,
+            entry.answer,
+            entry.row * width + entry.col,
+            1 if entry.direction == ACROSS else width,
+        )
+        for entry in puzzle.entries
+    )
+    return Solution(
+        crossword_id=crossword_id,
+        height=puzzle.height,
+        width=width,
+        letters=letters,
+        letter_mask=letter_mask,
+        total_cells=sum(letter_mask),
+        words=words,
+        ranked=ranked,
+    )
+
+
+def get_solution(db: Session, crossword_id: int) -> Optional[Solution]:
+    """Load (and cache) the solution of a stored crossword."""
+    solution = _solutions().get(crossword_id)
+    if solution is not None:
+        return solution
+
+    row = (
+        db.query(Crossword.id, Crossword.user_id, Crossword.grid, Crossword.clues)
+        .filter(Crossword.id == crossword_id)
+        .first()
+    )
+    if row is None:
+        return None
+
+    puzzle = CrosswordPuzzle.from_stored(row.grid, row.clues)
+    solution = build_solution(row.id, puzzle, ranked=row.user_id is None)
+    _solutions().set(crossword_id, solution)
+    return solution
+
+
+def normalize_answers(solution: Solution, answers: Union[str, Sequence[str]]) -> str:
+    """
+    Turn a flat answer string or a list of row strings into one uppercase
+    string of the puzzle's size. Any character stands for an empty cell in
+    positions where the letter is wrong, e.g. '.' or ' '.
+
+    Raises:
+        AnswerFormatError: If the shape does not match the puzzle
+    """
+    if isinstance(answers, str):
+        flat = answers
+    else:
+        if len(answers) != solution.height:
+            raise AnswerFormatError(f"Expected {solution.height} rows, got {len(answers)}")
+        for i, row in enumerate(answers):
+            if len(row) > solution.width:
+                raise AnswerFormatError(f"Row {i} is longer than {solution.width} cells")
+        flat = "".join(row.ljust(solution.width, ".") for row in answers)
+
+    if len(flat) != solution.height * solution.width:
+        raise AnswerFormatError(
+            f"Expected {solution.height * solution.width} cells, got {len(flat)}"
+        )
+
+    upper = flat.upper()
+    if len(upper) != len(flat):
+        # A few letters (e.g. 'ß') uppercase to two characters
+        upper = "".join(ch if len(ch.upper()) != 1 else ch.upper() for ch in flat)
+    return upper
+
+
+def check_answers(solution: Solution, answers: str) -> CheckResult:
+    """Compare normalized answers with the solution."""
+    letters = solution.letters
+    correct_cells = sum(compress(map(eq, answers, letters), solution.letter_mask))
+
+    results = []
+    for number, direction, answer, start, stride in solution.words:
+        end = start + stride * (len(answer) - 1) + 1
+        results.append({
+            "number": number,
+            "direction": direction,
+            "correct": answers[start:end:stride] == letters[start:end:stride],
+        })
+
+    return CheckResult(correct_cells=correct_cells, total_cells=solution.total_cells, results=results)
+
+
+def record_attempt(
+    db: Session,
+    crossword_id: int,
+    user_id: int,
+    result: CheckResult,
+    time_taken_seconds: Optional[int] = None
+) -> CrosswordAttempt:
+    """Store a checked submission as a CrosswordAttempt."""
+    attempt = CrosswordAttempt(
+        crossword_id=crossword_id,
+        user_id=user_id,
+        completed_at=datetime.now(timezone.utc),
+        completed=result.solved,
+        time_taken_seconds=time_taken_seconds,
+        correct_cells=result.correct_cells,
+        total_cells=result.total_cells,
+    )
+    db.add(attempt)
+    db.commit()
+    db.refresh(attempt)
+    return attempt
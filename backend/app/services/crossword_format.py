@@ -0,0 +1,113 @@
+"""
+Wire formats for crossword puzzles.
+
+"full" is the original shape: one dict per cell and one CrosswordClue-shaped
+dict per word, answers included. "compact", used for the stored daily
+puzzles, sends the grid as one string per row, '#' for blocks and '.' for
+letter cells, and each clue as a small array:
+
+    [number, "a" | "d", row, col, length, clue]
+
+Answers are left out entirely, not even as hashes: vocabulary words are few
+and short enough that any digest a client could check locally can be
+reversed with a lookup table. A compact puzzle can therefore only be
+checked by id, with POST /crossword/{crossword_id}/check, so only stored
+puzzles are sent compact; live and practice puzzles, which are not stored,
+are always full. For a 10-word puzzle compact is several times smaller than
+the full format.
+
+Payloads are built as plain dicts and encoded with orjson, so responses
+skip Pydantic validation (the response models only document the shapes).
+"""
+from typing import Any, Dict, List, Optional
+
+from app.core.responses import dumps
+from app.services.crossword_puzzle import CrosswordPuzzle
+
+FULL = "full"
+COMPACT = "compact"
+FORMATS = (FULL, COMPACT)
+
+BLOCK = "#"
+OPEN = "."
+
+_DIRECTIONS = {"across": "a", "down": "d"}
+
+
+def compact_grid(puzzle: CrosswordPuzzle) -> List[str]:
+    """Grid as row strings: BLOCK for blocks, OPEN for letter cells."""
+    cells = "".join(BLOCK if letter is None else OPEN for letter in puzzle.letters)
+    return [cells[r * puzzle.width:(r + 1) * puzzle.width] for r in range(puzzle.height)]
+
+
+def compact_clues(puzzle: CrosswordPuzzle) -> List[List[Any]]:
+    """Clues as [number, direction, row, col, length, clue] arrays."""
+    return [
+        [
+            entry.number,
+            _DIRECTIONS[entry.direction],
+            entry.row,
+            entry.col,
+            len(entry.answer),
+            entry.clue,
+        ]
+        for entry in puzzle.entries
+    ]
+
+
+def puzzle_payload(
+    puzzle: CrosswordPuzzle,
+    format: str = FULL,
+    unplaced: Optional[List[str]] = None,
+    crossword_id: Optional[int] = None,
+    puzzle_date: Optional[str] = None,
+    level: Optional[str] = None,
+    language: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build a crossword response body in the requested format.
+
+    Args:
+        puzzle: Numbered puzzle
+        format: FULL or COMPACT
+        unplaced: Words left out of the layout (default: the puzzle's)
+        crossword_id: Id of the stored puzzle, if any
+        puzzle_date: ISO date of a daily puzzle
+        level: Level of a daily or practice puzzle
+        language: Answer language of a daily or practice puzzle
+
+    Returns:
+        JSON-ready dict matching CrosswordTodayResponse or CrosswordCompactResponse
+    """
+    meta = {
+        "crossword_id": crossword_id,
+        "puzzle_date": puzzle_date,
+        "level": level,
+        "language": language,
+    }
+    if unplaced is None:
+        unplaced = puzzle.unplaced
+    if format == COMPACT:
+        payload = {
+            "format": COMPACT,
+            "height": puzzle.height,
+            "width": puzzle.width,
+            "grid": compact_grid(puzzle),
+            "clues": compact_clues(puzzle),
+            "unplaced": unplaced,
+        }
+        # Only the fields that are set
+        payload.update((key, value) for key, value in meta.items() if value is not None)
+        return payload
+
+    return {
+        "grid": puzzle.grid(),
+        "words": puzzle.clues(),
+        "unplaced": unplaced,
+        **meta,
+    }
+
+
+def encode(payload: Dict[str, Any]) -> bytes:
+    """Serialize a payload to a compact UTF-8 JSON body."""
+    return dumps(payload)
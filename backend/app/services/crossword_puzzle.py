@@ -0,0 +1,179 @@
+"""
+Canonical crossword puzzle model.
+
+A CrosswordPuzzle is what the generator returns and what the API, checking
+and persistence work from: the letters of a (trimmed) grid, the numbered
+across/down entries and, for every cell, the entries running through it.
+
+Numbering is standard row-major: cells are visited left to right, top to
+bottom, and each cell where an entry starts takes the next number (an across
+and a down entry starting in the same cell share it). The cell -> entry index
+is filled in the same pass: a letter continues the across entry of the cell
+to its left and the down entry of the cell above it when it lies within
+that entry's length.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+ACROSS = "across"
+DOWN = "down"
+
+NO_ENTRY = -1
+
+
+@dataclass(frozen=True)
+class CrosswordEntry:
+    """One numbered word of a puzzle."""
+    number: int
+    direction: str  # ACROSS or DOWN
+    row: int
+    col: int
+    answer: str
+    clue: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Clue dict as sent by the API and stored in crosswords.clues."""
+        return {
+            "number": self.number,
+            "direction": self.direction,
+            "clue": self.clue,
+            "answer": self.answer,
+            "row": self.row,
+            "col": self.col,
+        }
+
+
+@dataclass
+class CrosswordPuzzle:
+    """A numbered crossword: grid letters, entries and the cell -> entry index."""
+    height: int
+    width: int
+    letters: List[Optional[str]]  # row-major, None for blocks
+    entries: List[CrosswordEntry]  # by number, across before down
+    # Per row-major cell: (index of its across entry, index of its down entry), NO_ENTRY if none
+    cell_entries: List[Tuple[int, int]]
+    unplaced: List[str] = field(default_factory=list)
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def number(
+        cls,
+        height: int,
+        width: int,
+        letters: List[Optional[str]],
+        words: Iterable[Tuple[int, int, str, str, str]],
+        numbers: Optional[Dict[Tuple[int, int], int]] = None,
+        unplaced: Optional[List[str]] = None,
+        stats: Optional[Dict[str, Any]] = None
+    ) -> "CrosswordPuzzle":
+        """
+        Number a laid-out grid in one row-major pass.
+
+        Args:
+            height: Grid height
+            width: Grid width
+            letters: Row-major letters, None for blocks
+            words: (row, col, direction, answer, clue) of every placed word
+            numbers: Keep these start-cell numbers instead of renumbering
+                     (for puzzles stored before canonical numbering)
+            unplaced: Words left out of the layout
+            stats: Generator statistics
+
+        Returns:
+            CrosswordPuzzle
+        """
+        starts: Dict[int, List[Tuple[str, str, str]]] = {}
+        for row, col, direction, answer, clue in words:
+            starts.setdefault(row * width + col, []).append((direction, answer, clue))
+
+        entries: List[CrosswordEntry] = []
+        cell_entries: List[Tuple[int, int]] = []
+        next_number = 1
+        for idx, letter in enumerate(letters):
+            if letter is None:
+                cell_entries.append((NO_ENTRY, NO_ENTRY))
+                continue
+            row, col = divmod(idx, width)
+
+            # Entries running through here from the left and from above
+            across = NO_ENTRY
+            if col > 0:
+                left = cell_entries[idx - 1][0]
+                if left != NO_ENTRY and entries[left].col + len(entries[left].answer) > col:
+                    across = left
+            down = NO_ENTRY
+            if row > 0:
+                above = cell_entries[idx - width][1]
+                if above != NO_ENTRY and entries[above].row + len(entries[above].answer) > row:
+                    down = above
+
+            started = starts.get(idx)
+            if started:
+                if numbers is not None:
+                    number = numbers.get((row, col), next_number)
+                else:
+                    number = next_number
+                next_number = max(next_number, number) + 1
+                # Across first, so entries stay sorted by (number, direction)
+                for direction, answer, clue in sorted(started, key=lambda s: s[0] != ACROSS):
+                    entries.append(CrosswordEntry(number, direction, row, col, answer, clue))
+                    if direction == ACROSS:
+                        across = len(entries) - 1
+                    else:
+                        down = len(entries) - 1
+            cell_entries.append((across, down))
+
+        return cls(
+            height=height,
+            width=width,
+            letters=letters,
+            entries=entries,
+            cell_entries=cell_entries,
+            unplaced=list(unplaced or []),
+            stats=dict(stats or {}),
+        )
+
+    @classmethod
+    def from_stored(cls, grid: List[List[Dict[str, Any]]], clues: List[Dict[str, Any]]) -> "CrosswordPuzzle":
+        """Rebuild the model from a stored grid and clue list, keeping the stored numbers."""
+        height = len(grid)
+        width = len(grid[0]) if grid else 0
+        letters = [
+            None if cell.get("is_block") else cell.get("letter")
+            for row in grid for cell in row
+        ]
+        return cls.number(
+            height,
+            width,
+            letters,
+            ((c["row"], c["col"], c["direction"], c["answer"], c.get("clue", "")) for c in clues),
+            numbers={(c["row"], c["col"]): c["number"] for c in clues},
+        )
+
+    def entry_at(self, row: int, col: int, direction: str) -> Optional[CrosswordEntry]:
+        """The entry running through a cell in a direction, if any."""
+        index = self.cell_entries[row * self.width + col][0 if direction == ACROSS else 1]
+        return self.entries[index] if index != NO_ENTRY else None
+
+    def grid(self) -> List[List[Dict[str, Any]]]:
+        """Cell grid as sent by the API and stored in crosswords.grid."""
+        cells = [
+            {"letter": None, "is_block": True} if letter is None
+            else {"letter": letter, "is_block": False, "input": ""}
+            for letter in self.letters
+        ]
+        return [cells[r * self.width:(r + 1) * self.width] for r in range(self.height)]
+
+    def clues(self) -> List[Dict[str, Any]]:
+        """Clue dicts in number order."""
+        return [entry.to_dict() for entry in self.entries]
+
+    def with_clues(self, clue_texts: Dict[str, str]) -> "CrosswordPuzzle":
+        """Copy of the puzzle taking each clue text from clue_texts (answer -> clue) when given."""
+        entries = [
+            CrosswordEntry(e.number, e.direction, e.row, e.col, e.answer, clue_texts.get(e.answer, e.clue))
+            for e in self.entries
+        ]
+        return CrosswordPuzzle(
+            self.height, self.width, self.letters, entries, self.cell_entries, list(self.unplaced), dict(self.stats)
+        )
@@ -1,166 +1,487 @@
-from typing import List, Dict, Any
+import math
+import random
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, Iterator, List, Any, Optional, Tuple
 
+from app.core.config import get_settings
+from app.services.crossword_puzzle import CrosswordPuzzle
 
-# Grid size constant (can be made configurable)
-CROSSWORD_GRID_SIZE = 10
+# Each puzzle gets its own grid size (see auto_grid_size) between
+# CROSSWORD_MIN_GRID_SIZE and the CROSSWORD_MAX_GRID_SIZE setting; the
+# returned grid is trimmed to the bounding box of the placed letters
+CROSSWORD_MIN_GRID_SIZE = 10
+# Grid area per letter when auto-sizing: room for crossings without sprawl
+CROSSWORD_AREA_PER_LETTER = 2.0
 
+# Search limits (CROSSWORD_TIME_BUDGET_MS and CROSSWORD_MAX_ATTEMPTS settings):
+# generation stops at whichever is hit first, so latency is bounded by the
+# time budget (plus at most one attempt's worth of work).
+# Stop early once a complete, connected layout hasn't improved for this many attempts
+CROSSWORD_PATIENCE = 40
 
-def generate_crossword(words: List[Dict[str, str]]) -> Dict[str, Any]:
+# Layout score weights
+SCORE_PLACED = 100.0
+SCORE_INTERSECTION = 10.0
+SCORE_DENSITY = 20.0
+SCORE_ISLAND = -30.0
+
+ACROSS = "ACROSS"
+DOWN = "DOWN"
+
+# Bit flags in CrosswordGrid.used: which directions already run through a cell
+_ACROSS_BIT = 1
+_DOWN_BIT = 2
+
+# Placement: (row, col, direction)
+Slot = Tuple[int, int, str]
+
+
+class CrosswordGrid:
+    """
+    Flat, byte-backed crossword grid.
+
+    Letters are stored as small integer codes in a row-major bytearray, with a
+    column-major copy so vertical runs are contiguous too; 0 means empty. A
+    letter -> cells index gives the intersection candidates for a word
+    directly instead of looping over every placed word and letter pair.
+    """
+
+    def __init__(self, size: int = CROSSWORD_MIN_GRID_SIZE):
+        self.size = size
+        self.rows = bytearray(size * size)  # row-major letter codes
+        self.cols = bytearray(size * size)  # column-major copy of rows
+        self.used = bytearray(size * size)  # _ACROSS_BIT / _DOWN_BIT per cell
+        self.letter_cells: Dict[int, List[int]] = {}  # code -> row-major indexes
+        self.placements: List[Dict[str, Any]] = []
+        self.filled = 0
+        self.intersections = 0
+        self.islands = 0  # words placed without crossing anything
+        self.bounds: Optional[Tuple[int, int, int, int]] = None  # min_row, min_col, max_row, max_col
+        self._codes: Dict[str, int] = {}
+        self._letters: List[Optional[str]] = [None]
+
+    def encode(self, word: str) -> bytes:
+        """Map a word's letters to 1-byte codes (any alphabet, up to 255 letters)."""
+        codes = bytearray()
+        for ch in word:
+            code = self._codes.get(ch)
+            if code is None:
+                if len(self._letters) > 255:
+                    raise ValueError("Too many distinct letters for a crossword grid")
+                code = len(self._letters)
+                self._codes[ch] = code
+                self._letters.append(ch)
+            codes.append(code)
+        return bytes(codes)
+
+    def fits(self, codes: bytes, row: int, col: int, direction: str) -> Optional[int]:
+        """
+        Check whether an encoded word can go at a position.
+
+        Besides bounds and letter clashes, the word must not run along a word
+        in the same direction, must not touch other letters at either end,
+        and each new letter must have empty neighbours across the word, so
+        no accidental letter runs are formed.
+
+        Returns:
+            Number of cells shared with already placed words, or None if the
+            word does not fit
+        """
+        size = self.size
+        length = len(codes)
+        if row < 0 or col < 0:
+            return None
+        if direction == ACROSS:
+            if row >= size or col + length > size:
+                return None
+            start = row * size + col
+            segment = self.rows[start:start + length]
+            step, bit = 1, _ACROSS_BIT
+        else:
+            if col >= size or row + length > size:
+                return None
+            start = col * size + row
+            segment = self.cols[start:start + length]
+            step, bit = size, _DOWN_BIT
+
+        rows = self.rows
+        first = row * size + col
+        # Cells just before and after the word must be empty
+        if (col > 0 if direction == ACROSS else row > 0) and rows[first - step]:
+            return None
+        end = first + length * step
+        if (col + length < size if direction == ACROSS else row + length < size) and rows[end]:
+            return None
+
+        # Neighbours across the word: the lines on either side of it
+        side = size if direction == ACROSS else 1
+        has_before_line = (row if direction == ACROSS else col) > 0
+        has_after_line = (row if direction == ACROSS else col) < size - 1
+
+        crossings = 0
+        for i, (existing, code) in enumerate(zip(segment, codes)):
+            idx = first + i * step
+            if existing:
+                if existing != code or self.used[idx] & bit:
+                    return None
+                crossings += 1
+            elif (has_before_line and rows[idx - side]) or (has_after_line and rows[idx + side]):
+                return None
+        return crossings
+
+    def fresh(self) -> "CrosswordGrid":
+        """An empty grid of the same size sharing this grid's letter codes."""
+        grid = CrosswordGrid(self.size)
+        grid._codes = self._codes
+        grid._letters = self._letters
+        return grid
+
+    def place(self, word: str, codes: bytes, row: int, col: int, direction: str) -> None:
+        """Write an encoded word into the grid (caller checked fits())."""
+        size = self.size
+        across = direction == ACROSS
+        step = 1 if across else size
+        bit = _ACROSS_BIT if across else _DOWN_BIT
+        first = row * size + col
+        crossings = 0
+        for i, code in enumerate(codes):
+            idx = first + i * step
+            if not self.rows[idx]:
+                self.rows[idx] = code
+                r, c = divmod(idx, size)
+                self.cols[c * size + r] = code
+                self.letter_cells.setdefault(code, []).append(idx)
+                self.filled += 1
+            else:
+                crossings += 1
+            self.used[idx] |= bit
+        self.intersections += crossings
+        if not crossings:
+            self.islands += 1
+        self.bounds = self.grown_bounds(row, col, len(codes), direction)
+        self.placements.append({
+            "word": word,
+            "row": row,
+            "col": col,
+            "direction": direction
+        })
+
+    def grown_bounds(self, row: int, col: int, length: int, direction: str) -> Tuple[int, int, int, int]:
+        """Bounding box of the letters after adding a word at a position."""
+        end_row = row if direction == ACROSS else row + length - 1
+        end_col = col + length - 1 if direction == ACROSS else col
+        if self.bounds is None:
+            return row, col, end_row, end_col
+        min_row, min_col, max_row, max_col = self.bounds
+        return min(min_row, row), min(min_col, col), max(max_row, end_row), max(max_col, end_col)
+
+    @staticmethod
+    def bounds_area(bounds: Optional[Tuple[int, int, int, int]]) -> int:
+        if bounds is None:
+            return 0
+        min_row, min_col, max_row, max_col = bounds
+        return (max_row - min_row + 1) * (max_col - min_col + 1)
+
+    def crossing_slots(self, codes: bytes) -> Iterator[Slot]:
+        """Yield positions where the word would cross a placed letter (unchecked)."""
+        size = self.size
+        for i, code in enumerate(codes):
+            for idx in self.letter_cells.get(code, ()):
+                r, c = divmod(idx, size)
+                used = self.used[idx]
+                if not used & _DOWN_BIT:
+                    yield r - i, c, DOWN
+                if not used & _ACROSS_BIT:
+                    yield r, c - i, ACROSS
+
+    def free_slots(self, length: int, direction: str, first_line: int = 0) -> Iterator[Tuple[int, int]]:
+        """Yield the starts of runs of `length` empty cells, scanning lines from first_line."""
+        size = self.size
+        if length > size:
+            return
+        lines = self.rows if direction == ACROSS else self.cols
+        needle = bytes(length)
+        for n in range(size):
+            line = (first_line + n) % size
+            line_start = line * size
+            line_end = line_start + size
+            offset = lines.find(needle, line_start, line_end)
+            while offset != -1:
+                pos = offset - line_start
+                yield (line, pos) if direction == ACROSS else (pos, line)
+                offset = lines.find(needle, offset + 1, line_end)
+
+    def letter_at(self, row: int, col: int) -> Optional[str]:
+        return self._letters[self.rows[row * self.size + col]]
+
+    def to_puzzle(
+        self,
+        clues: Dict[str, Deque[str]],
+        unplaced: List[str],
+        stats: Dict[str, Any]
+    ) -> CrosswordPuzzle:
+        """
+        Number the layout, trimmed to the bounding box of its letters.
+
+        Args:
+            clues: Clue texts per word, consumed one per placement
+            unplaced: Words left out of the layout
+            stats: Search statistics
+        """
+        if self.bounds is None:
+            return CrosswordPuzzle.number(0, 0, [], [], unplaced=unplaced, stats=stats)
+        min_row, min_col, max_row, max_col = self.bounds
+        letters = [
+            self.letter_at(r, c)
+            for r in range(min_row, max_row + 1)
+            for c in range(min_col, max_col + 1)
+        ]
+        words = [
+            (
+                p["row"] - min_row,
+                p["col"] - min_col,
+                p["direction"].lower(),
+                p["word"],
+                clues[p["word"]].popleft(),
+            )
+            for p in self.placements
+        ]
+        return CrosswordPuzzle.number(
+            max_row - min_row + 1,
+            max_col - min_col + 1,
+            letters,
+            words,
+            unplaced=unplaced,
+            stats=stats,
+        )
+
+
+def max_grid_size() -> int:
+    """Largest grid width and height (CROSSWORD_MAX_GRID_SIZE)."""
+    return get_settings().crossword_max_grid_size
+
+
+def auto_grid_size(words: List[str]) -> int:
+    """
+    Pick a grid size for a word list: room for the longest word and about
+    CROSSWORD_AREA_PER_LETTER cells per letter, capped at CROSSWORD_MAX_GRID_SIZE.
+    """
+    if not words:
+        return CROSSWORD_MIN_GRID_SIZE
+    longest = max(len(w) for w in words)
+    by_area = math.ceil(math.sqrt(sum(len(w) for w in words) * CROSSWORD_AREA_PER_LETTER))
+    return min(max(CROSSWORD_MIN_GRID_SIZE, longest, by_area), max_grid_size())
+
+
+def score_layout(grid: CrosswordGrid) -> float:
+    """
+    Score a layout: words placed first, then intersections, then compactness.
+
+    Layouts are adjacency-valid by construction (see CrosswordGrid.fits), so
+    the remaining penalty is for words that float unconnected to the rest.
+    """
+    if not grid.placements:
+        return 0.0
+    density = grid.filled / grid.bounds_area(grid.bounds)
+    return (
+        SCORE_PLACED * len(grid.placements)
+        + SCORE_INTERSECTION * grid.intersections
+        + SCORE_DENSITY * density
+        + SCORE_ISLAND * max(0, grid.islands - 1)
+    )
+
+
+def _place_crossing(grid: CrosswordGrid, word: str, codes: bytes, rng: random.Random) -> bool:
+    """Place a word at its best crossing: most intersections, least bounding-box growth."""
+    best_key = None
+    best_slot = None
+    area = grid.bounds_area(grid.bounds)
+    seen = set()
+    for slot in grid.crossing_slots(codes):
+        if slot in seen:
+            continue
+        seen.add(slot)
+        row, col, direction = slot
+        crossings = grid.fits(codes, row, col, direction)
+        if not crossings:
+            continue
+        growth = grid.bounds_area(grid.grown_bounds(row, col, len(codes), direction)) - area
+        key = (crossings, -growth, rng.random())
+        if best_key is None or key > best_key:
+            best_key, best_slot = key, slot
+    if best_slot is None:
+        return False
+    grid.place(word, codes, *best_slot)
+    return True
+
+
+# Free slots considered when a word has to be placed unconnected
+_ISLAND_CANDIDATES = 16
+
+
+def _place_island(grid: CrosswordGrid, word: str, codes: bytes, rng: random.Random) -> bool:
+    """Place a word that crosses nothing in free space, keeping the layout compact."""
+    best_key = None
+    best_slot = None
+    area = grid.bounds_area(grid.bounds)
+    considered = 0
+    for direction in rng.sample((ACROSS, DOWN), 2):
+        for row, col in grid.free_slots(len(codes), direction, rng.randrange(grid.size)):
+            if grid.fits(codes, row, col, direction) != 0:
+                continue
+            growth = grid.bounds_area(grid.grown_bounds(row, col, len(codes), direction)) - area
+            if best_key is None or growth < best_key:
+                best_key, best_slot = growth, (row, col, direction)
+            considered += 1
+            if considered >= _ISLAND_CANDIDATES:
+                break
+    if best_slot is None:
+        return False
+    grid.place(word, codes, *best_slot)
+    return True
+
+
+def _build_layout(
+    grid: CrosswordGrid,
+    order: List[Tuple[str, bytes]],
+    rng: random.Random,
+    first_direction: str,
+    deadline: Optional[float]
+) -> bool:
+    """
+    Greedily place words in the given order.
+
+    Words that cannot cross anything yet are retried once the others are in,
+    and only then placed unconnected. Returns False if the deadline passed.
     """
-    Generate a crossword puzzle from a list of words with clues.
-    
+    size = grid.size
+    first, first_codes = order[0]
+    if first_direction == ACROSS:
+        grid.place(first, first_codes, size // 2, (size - len(first)) // 2, ACROSS)
+    else:
+        grid.place(first, first_codes, (size - len(first)) // 2, size // 2, DOWN)
+
+    deferred = []
+    for word, codes in order[1:]:
+        if deadline is not None and time.perf_counter() > deadline:
+            return False
+        if not _place_crossing(grid, word, codes, rng):
+            deferred.append((word, codes))
+
+    for word, codes in deferred:
+        if deadline is not None and time.perf_counter() > deadline:
+            return False
+        if not _place_crossing(grid, word, codes, rng):
+            _place_island(grid, word, codes, rng)
+    return True
+
+
+def generate_crossword(
+    words: List[Dict[str, str]],
+    size: Optional[int] = None,
+    time_budget_ms: Optional[float] = None,
+    max_attempts: Optional[int] = None,
+    seed: Optional[int] = None
+) -> CrosswordPuzzle:
+    """
+    Generate a numbered crossword puzzle from a list of words with clues.
+
+    Runs randomized restarts of a greedy best-crossing placement (the first
+    attempt places longest words first) and keeps the best-scoring layout
+    found before the time budget runs out. The first attempt always
+    completes so there is a result; later ones are abandoned at the deadline.
+
+    Candidate positions come from the letter index of placed cells, so the
+    work per attempt depends on the words, not on the grid area; a bigger
+    grid only costs its (C-level) allocation and free-space scans.
+
     Args:
         words: List of dicts with "word" and "clue" keys
               Example: [{"word": "ABOVE", "clue": "Higher than"}, ...]
-    
+        size: Maximum width and height of the grid (default: auto_grid_size)
+        time_budget_ms: Wall-clock budget for the search (default: CROSSWORD_TIME_BUDGET_MS)
+        max_attempts: Maximum number of layouts to try (default: CROSSWORD_MAX_ATTEMPTS)
+        seed: Optional random seed, for reproducible layouts
+
     Returns:
-        Dict with "grid" (2D array) and "placements" (list of placement info)
-    
+        CrosswordPuzzle trimmed to the placed letters, numbered row-major,
+        with the words that could not be placed and search stats
+        ("grid_size", "attempts", "score", "intersections", "islands", "elapsed_ms")
+
     Raises:
         ValueError: If words list is empty
     """
     if not words:
         raise ValueError("Words list cannot be empty")
 
-    SIZE = CROSSWORD_GRID_SIZE
-    grid = [["" for _ in range(SIZE)] for _ in range(SIZE)]
-    placements: List[Dict[str, Any]] = []
+    settings = get_settings()
+    if time_budget_ms is None:
+        time_budget_ms = settings.crossword_time_budget_ms
+    if max_attempts is None:
+        max_attempts = settings.crossword_max_attempts
 
-    def can_place_horizontal(word: str, row: int, col: int) -> bool:
-        """Check if word can be placed horizontally at position."""
-        if col + len(word) > SIZE:
-            return False
-        for i, ch in enumerate(word):
-            if grid[row][col + i] not in ("", ch):
-                return False
-        return True
-
-    def can_place_vertical(word: str, row: int, col: int) -> bool:
-        """Check if word can be placed vertically at position."""
-        if row + len(word) > SIZE:
-            return False
-        for i, ch in enumerate(word):
-            if grid[row + i][col] not in ("", ch):
-                return False
-        return True
-
-    def place_horizontal(word: str, row: int, col: int) -> None:
-        """Place word horizontally on grid."""
-        for i, ch in enumerate(word):
-            grid[row][col + i] = ch
-        placements.append({
-            "word": word,
-            "row": row,
-            "col": col,
-            "direction": "ACROSS"
-        })
+    started = time.perf_counter()
+    deadline = started + time_budget_ms / 1000
+    rng = random.Random(seed)
+    if size is None:
+        size = auto_grid_size([w["word"] for w in words])
+    base = CrosswordGrid(size)
 
-    def place_vertical(word: str, row: int, col: int) -> None:
-        """Place word vertically on grid."""
-        for i, ch in enumerate(word):
-            grid[row + i][col] = ch
-        placements.append({
-            "word": word,
-            "row": row,
-            "col": col,
-            "direction": "DOWN"
-        })
+    # Skip words that are too long for the grid
+    fitting = [(w["word"], base.encode(w["word"])) for w in words if len(w["word"]) <= size]
+
+    best: Optional[CrosswordGrid] = None
+    best_score = 0.0
+    attempts = 0
+    stale = 0
+    if fitting:
+        for attempt in range(max(1, max_attempts)):
+            if attempt and time.perf_counter() >= deadline:
+                break
+
+            if attempt == 0:
+                order = sorted(fitting, key=lambda item: -len(item[0]))
+                first_direction = ACROSS
+            else:
+                # Mostly longest-first, with noise so restarts explore other orders
+                order = sorted(fitting, key=lambda item: -len(item[0]) - rng.uniform(0, 4))
+                first_direction = rng.choice((ACROSS, DOWN))
 
-    # Place first word in the center horizontally
-    first = words[0]["word"]
-    start_col = (SIZE - len(first)) // 2
-    start_row = SIZE // 2
-    place_horizontal(first, start_row, start_col)
-
-    # Place remaining words
-    for w in words[1:]:
-        word = w["word"]
-        
-        # Skip words that are too long for the grid
-        if len(word) > SIZE:
-            continue  # Skip this word, it's too long
-        
-        placed = False
-
-        # Try intersections first
-        for p in placements:
-            pw = p["word"]
-
-            for i, ch1 in enumerate(word):
-                for j, ch2 in enumerate(pw):
-                    if ch1 != ch2:
-                        continue  # Skip if characters don't match
-
-                    # Calculate intersection location
-                    if p["direction"] == "ACROSS":
-                        # Place new word vertically intersecting horizontal word
-                        row = p["row"] - i
-                        col = p["col"] + j
-
-                        if 0 <= row < SIZE and 0 <= col < SIZE:
-                            if can_place_vertical(word, row, col):
-                                place_vertical(word, row, col)
-                                placed = True
-                                break
-
-                    else:  # DOWN direction
-                        # Place new word horizontally intersecting vertical word
-                        row = p["row"] + j
-                        col = p["col"] - i
-
-                        if 0 <= row < SIZE and 0 <= col < SIZE:
-                            if can_place_horizontal(word, row, col):
-                                place_horizontal(word, row, col)
-                                placed = True
-                                break
-
-                if placed:
-                    break
-            if placed:
+            grid = base.fresh()
+            if not _build_layout(grid, order, rng, first_direction, deadline if attempt else None):
                 break
+            attempts += 1
 
-        # Fallback: place vertically anywhere if no intersection found
-        if not placed:
-            for r in range(SIZE):
-                for c in range(SIZE):
-                    if can_place_vertical(word, r, c):
-                        place_vertical(word, r, c)
-                        placed = True
-                        break
-                if placed:
-                    break
-        
-        # If still not placed, try horizontal placement as last resort
-        if not placed:
-            for r in range(SIZE):
-                for c in range(SIZE):
-                    if can_place_horizontal(word, r, c):
-                        place_horizontal(word, r, c)
-                        placed = True
-                        break
-                if placed:
-                    break
-
-    # Final processing – return structured grid
-    output_grid: List[List[Dict[str, Any]]] = []
-    for r in range(SIZE):
-        row: List[Dict[str, Any]] = []
-        for c in range(SIZE):
-            cell = grid[r][c]
-            if cell == "":
-                row.append({
-                    "letter": None,
-                    "is_block": True
-                })
+            score = score_layout(grid)
+            if best is None or score > best_score:
+                best, best_score, stale = grid, score, 0
             else:
-                row.append({
-                    "letter": cell,
-                    "is_block": False,
-                    "input": ""
-                })
-        output_grid.append(row)
-
-    return {
-        "grid": output_grid,
-        "placements": placements
-    }
+                stale += 1
+
+            complete = len(best.placements) == len(fitting) and best.islands <= 1
+            if complete and stale >= CROSSWORD_PATIENCE:
+                break
+
+    grid = best or base
+
+    # A word given twice is two entries, each with its own clue
+    clues: Dict[str, Deque[str]] = {}
+    for w in words:
+        clues.setdefault(w["word"], deque()).append(w.get("clue", ""))
+    remaining = Counter(p["word"] for p in grid.placements)
+    unplaced = []
+    for w in words:
+        if remaining[w["word"]]:
+            remaining[w["word"]] -= 1
+        else:
+            unplaced.append(w["word"])
+
+    return grid.to_puzzle(clues, unplaced, {
+        "grid_size": size,
+        "attempts": attempts,
+        "score": round(best_score, 2),
+        "intersections": grid.intersections,
+        "islands": grid.islands,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    })
@@ -0,0 +1,227 @@
+"""
+Shared daily crosswords, one per (date, level, language).
+
+The puzzle is built from the words of the day (see daily_words), stored in
+the crosswords table with user_id NULL, and kept in memory as a ready-to-send
+JSON body with its ETag. Daily puzzles are ranked, so they are only sent in
+the compact format, which leaves the answers out. Layouts come from the
+crossword bank when the day's words are in it. The pre-generation job builds the day's puzzles ahead of
+time; a request that arrives first builds it under an advisory lock so
+concurrent workers don't generate it twice.
+"""
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.db import advisory_lock, insert_for
+from app.models.crossword import Crossword
+from app.services import crossword_bank, crossword_format, daily_words
+from app.services.crossword_puzzle import CrosswordPuzzle
+from app.services.crossword_service import generate_crossword
+from app.utils.lru_cache import LRUCache
+
+LOCK_WAIT_SECONDS = 10
+LOCK_POLL_INTERVAL = 0.1
+
+PuzzleKey = Tuple[date, str, str]  # (puzzle_date, level, language)
+
+
+@lru_cache(maxsize=1)
+def _memory() -> LRUCache:
+    """Puzzle key -> DailyCrossword, created on first use."""
+    settings = get_settings()
+    # Puzzles never change once stored; the TTL only bounds memory across days
+    return LRUCache(settings.daily_crossword_cache_size, settings.daily_crossword_cache_ttl_seconds)
+
+
+# One build lock per puzzle, so building one puzzle doesn't hold up requests
+# for the others
+_build_locks: Dict[PuzzleKey, threading.Lock] = {}
+_build_locks_guard = threading.Lock()
+
+
+@dataclass(frozen=True)
+class DailyCrossword:
+    """A stored daily puzzle, pre-serialized for serving."""
+    id: int
+    puzzle_date: date
+    level: str
+    language: str
+    puzzle: CrosswordPuzzle
+    body: bytes  # compact-format JSON response body
+    etag: str
+
+    def encoded(self) -> Tuple[bytes, str]:
+        """Response body and ETag of the puzzle."""
+        return self.body, self.etag
+
+
+def _seed(key: PuzzleKey) -> int:
+    puzzle_date, level, language = key
+    return int(hashlib.md5(f"{puzzle_date.isoformat()}-{level}-{language}".encode()).hexdigest(), 16)
+
+
+def _from_row(row: Crossword) -> DailyCrossword:
+    puzzle = CrosswordPuzzle.from_stored(row.grid, row.clues)
+    body = crossword_format.encode(crossword_format.puzzle_payload(
+        puzzle,
+        format=crossword_format.COMPACT,
+        crossword_id=row.id,
+        puzzle_date=row.puzzle_date.isoformat(),
+        level=row.level,
+        language=row.language,
+    ))
+    return DailyCrossword(
+        id=row.id,
+        puzzle_date=row.puzzle_date,
+        level=row.level,
+        language=row.language,
+        puzzle=puzzle,
+        body=body,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+    )
+
+
+def _build_lock(key: PuzzleKey) -> threading.Lock:
+    """This worker's build lock for a puzzle; locks of past days are dropped."""
+    with _build_locks_guard:
+        lock = _build_locks.get(key)
+        if lock is None:
+            yesterday = date.fromordinal(date.today().toordinal() - 1)
+            for old in [k for k in _build_locks if k[0] < yesterday]:
+                del _build_locks[old]
+            lock = _build_locks[key] = threading.Lock()
+        return lock
+
+
+def _load(db: Session, key: PuzzleKey) -> Optional[DailyCrossword]:
+    puzzle_date, level, language = key
+    row = (
+        db.query(Crossword)
+        .filter(Crossword.puzzle_date == puzzle_date)
+        .filter(Crossword.level == level)
+        .filter(Crossword.language == language)
+        .first()
+    )
+    if row is None:
+        return None
+    puzzle = _from_row(row)
+    _memory().set(key, puzzle)
+    return puzzle
+
+
+def _build(db: Session, key: PuzzleKey) -> Optional[DailyCrossword]:
+    """Generate and store the puzzle for a key (caller holds the lock)."""
+    puzzle_date, level, language = key
+    words = daily_words.get_daily_words(db, level, day=puzzle_date)
+    if not words:
+        return None
+
+    formatted = [
+        {"word": daily_words.translation_for(w, language).upper(), "clue": w.definition}
+        for w in words
+    ]
+    # The bank builder lays out upcoming daily word sets ahead of time
+    layout = crossword_bank.find_layout(db, [w["word"] for w in formatted])
+    if layout is not None:
+        puzzle = layout.with_clues({w["word"]: w["clue"] for w in formatted})
+        source = "bank"
+    else:
+        # Daily puzzles are built once, so they get a bigger search budget than live ones
+        time_budget_ms = get_settings().daily_crossword_time_budget_ms
+        puzzle = generate_crossword(formatted, time_budget_ms=time_budget_ms, seed=_seed(key))
+        source = f"score {puzzle.stats['score']}"
+    if not puzzle.entries:
+        return None
+
+    db.execute(
+        insert_for(db, Crossword)
+        .values(
+            user_id=None,
+            puzzle_date=puzzle_date,
+            level=level,
+            language=language,
+            grid=puzzle.grid(),
+            clues=puzzle.clues(),
+        )
+        .on_conflict_do_nothing(index_elements=["puzzle_date", "level", "language"])
+    )
+    db.commit()
+    print(f"🧩 Built daily crossword {puzzle_date} {level}/{language}: "
+          f"{len(puzzle.entries)} words, {source}")
+    return _load(db, key)
+
+
+def get_daily_crossword(
+    db: Session,
+    level: str,
+    language: str,
+    puzzle_date: Optional[date] = None
+) -> Optional[DailyCrossword]:
+    """
+    Get the shared crossword of the day for a level and language, building it on first use.
+
+    Args:
+        db: Database session
+        level: Difficulty level ('a1', 'a2', 'b1', 'b2')
+        language: Language of the answers ('es' or 'fr')
+        puzzle_date: Date of the puzzle (default today)
+
+    Returns:
+        DailyCrossword, or None if the level has no words
+    """
+    key = (puzzle_date or date.today(), level, language)
+
+    puzzle = _memory().get(key)
+    if puzzle is not None:
+        return puzzle
+
+    puzzle = _load(db, key)
+    if puzzle is not None:
+        return puzzle
+
+    lock_name = f"daily-crossword:{key[0].isoformat()}:{level}:{language}"
+    deadline = time.monotonic() + LOCK_WAIT_SECONDS
+    while True:
+        # The thread lock keeps this worker's threads from building the same
+        # puzzle in parallel; the advisory lock does the same across workers
+        with _build_lock(key), advisory_lock(lock_name) as acquired:
+            if acquired or time.monotonic() >= deadline:
+                return _load(db, key) or _build(db, key)
+
+        time.sleep(LOCK_POLL_INTERVAL)
+        puzzle = _load(db, key)
+        if puzzle is not None:
+            return puzzle
+
+
+def ensure_daily_crosswords(
+    db: Session,
+    puzzle_date: date,
+    levels: Iterable[str],
+    languages: Iterable[str]
+) -> int:
+    """
+    Build any missing daily crosswords for a date (used by the pre-generation job).
+
+    Returns:
+        Number of puzzles available for the date
+    """
+    available = 0
+    for level in levels:
+        for language in languages:
+            if get_daily_crossword(db, level, language, puzzle_date) is not None:
+                available += 1
+    return available
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the in-memory daily crossword cache."""
+    return _memory().stats()
@@ -0,0 +1,140 @@
+"""
+Deterministic words of the day, computed once per (date, level).
+
+The selection is stored in daily_word_sets and mirrored in a small LRU cache,
+so serving /words/daily only reads the selected Vocabulary rows by primary
+key. The pre-generation job rolls the sets over for its run date before
+generating.
+"""
+import hashlib
+from datetime import date
+from random import Random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.db import insert_for
+from app.models.daily_word_set import DailyWordSet
+from app.models.vocabulary import Vocabulary
+from app.utils.lru_cache import LRUCache
+
+# Words stored per set; callers may ask for fewer
+DAILY_WORD_SET_SIZE = 10
+
+# A week or so of sets for every level; sets never change, so the TTL only
+# lets sets of past days go even if nothing else pushes them out
+DAILY_WORD_SET_CACHE_SIZE = 32
+
+WordSetKey = Tuple[date, str]  # (set_date, level)
+
+_sets = LRUCache(DAILY_WORD_SET_CACHE_SIZE, 86400)
+
+
+def _seed(day: date, level: str) -> int:
+    # Date + level only: language doesn't affect which English words are selected
+    seed_string = f"{day.isoformat()}-{level}"
+    return int(hashlib.md5(seed_string.encode()).hexdigest(), 16)
+
+
+def select_word_ids(db: Session, level: str, day: date, size: int = DAILY_WORD_SET_SIZE) -> List[int]:
+    """
+    Deterministically pick the word ids of the day for a level.
+
+    Only ids are loaded, and a private Random instance is used so the
+    process-global RNG is left alone. Sampling the id list with the same
+    seed picks the same words the previous full-row selection did.
+    """
+    ids = [
+        word_id for (word_id,) in
+        db.query(Vocabulary.id).filter(Vocabulary.level == level).order_by(Vocabulary.id)
+    ]
+    if not ids:
+        return []
+    return sorted(Random(_seed(day, level)).sample(ids, min(size, len(ids))))
+
+
+def get_word_set(db: Session, level: str, day: Optional[date] = None) -> Tuple[int, ...]:
+    """
+    Get the word ids of the day for a level, computing and storing them on first use.
+
+    Args:
+        db: Database session
+        level: Difficulty level ('a1', 'a2', 'b1', 'b2')
+        day: Date of the set (default today)
+
+    Returns:
+        Sorted tuple of Vocabulary ids
+    """
+    day = day or date.today()
+    key = (day, level)
+
+    word_ids = _sets.get(key)
+    if word_ids is not None:
+        return word_ids
+
+    row = db.get(DailyWordSet, key)
+    if row is None:
+        selected = select_word_ids(db, level, day)
+        if not selected:
+            return ()
+        db.execute(
+            insert_for(db, DailyWordSet)
+            .values(set_date=day, level=level, word_ids=selected)
+            .on_conflict_do_nothing(index_elements=["set_date", "level"])
+        )
+        db.commit()
+        # Another worker may have stored it first; both computed the same ids
+        row = db.get(DailyWordSet, key)
+
+    word_ids = tuple(row.word_ids)
+    _sets.set(key, word_ids)
+    return word_ids
+
+
+def get_daily_words(
+    db: Session,
+    level: str,
+    limit: int = DAILY_WORD_SET_SIZE,
+    day: Optional[date] = None
+) -> List[Vocabulary]:
+    """
+    Get the words of the day for a level, ordered by id.
+
+    Args:
+        db: Database session
+        level: Difficulty level ('a1', 'a2', 'b1', 'b2')
+        limit: Number of words to return (at most DAILY_WORD_SET_SIZE)
+        day: Date to select words for (default today)
+
+    Returns:
+        List of Vocabulary objects
+    """
+    word_ids = get_word_set(db, level, day)[:limit]
+    if not word_ids:
+        return []
+    return (
+        db.query(Vocabulary)
+        .filter(Vocabulary.id.in_(word_ids))
+        .order_by(Vocabulary.id)
+        .all()
+    )
+
+
+def translation_for(word: Vocabulary, language: str) -> str:
+    """Get the translation shown to learners of a language, falling back to the word."""
+    if language == "es":
+        return word.translation_es or word.word
+    if language == "fr":
+        return word.translation_fr or word.word
+    return word.word
+
+
+def roll_over(db: Session, day: date, levels: Iterable[str]) -> Dict[str, Tuple[int, ...]]:
+    """
+    Make sure the sets for a date exist (the in-memory copies of past dates
+    age out of the LRU cache on their own).
+
+    Returns:
+        Word ids per level
+    """
+    return {level: get_word_set(db, level, day) for level in levels}
@@ -0,0 +1,53 @@
+"""
+Short-lived claims that let one worker generate a cache entry while others wait.
+
+A claim is a generation_claims row taken with a single upsert: it is
+inserted if absent, taken over if expired, and left alone otherwise. Taking
+or releasing a claim is one short transaction, so no database connection is
+held while the claimed work (e.g. a Gemini call) runs. A claim whose owner
+died expires after its TTL and can then be taken by someone else.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from app.core.db import insert_for
+from app.models.generation_claim import GenerationClaim
+
+
+def new_owner() -> str:
+    """Random owner id for one claiming call."""
+    return uuid.uuid4().hex
+
+
+def try_claim(db: Session, name: str, owner: str, ttl_seconds: float) -> bool:
+    """
+    Claim name for owner unless someone else holds an unexpired claim on it.
+
+    Returns:
+        True if owner now holds the claim
+    """
+    now = datetime.now(timezone.utc)
+    stmt = insert_for(db, GenerationClaim).values(
+        name=name,
+        owner=owner,
+        expires_at=now + timedelta(seconds=ttl_seconds),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GenerationClaim.name],
+        set_={"owner": stmt.excluded.owner, "expires_at": stmt.excluded.expires_at},
+        where=GenerationClaim.expires_at < now,
+    ).returning(GenerationClaim.owner)
+    claimed = db.execute(stmt).scalar() == owner
+    db.commit()
+    return claimed
+
+
+def release_claim(db: Session, name: str, owner: str) -> None:
+    """Drop owner's claim on name (no-op if it expired and was taken over)."""
+    db.query(GenerationClaim).filter(
+        GenerationClaim.name == name,
+        GenerationClaim.owner == owner,
+    ).delete(synchronize_session=False)
+    db.commit()
@@ -0,0 +1,245 @@
+"""
+Google ID token verification against cached signing keys.
+
+Google publishes its token signing keys as a JWKS document and says how long
+they may be cached with Cache-Control max-age. The verifier keeps the parsed
+keys in memory for that long and fetches them over one pooled, keep-alive
+HTTP session, so a sign-in normally verifies without any network call:
+
+- keys still fresh: used as-is
+- keys close to expiry: used as-is, and a background thread refreshes them
+- keys expired (or none yet): refreshed inline; if that fails, stale keys
+  are still used rather than failing every login, and the next inline try
+  waits GOOGLE_CERTS_MIN_REFRESH_INTERVAL seconds
+- token signed with an unknown key id (Google rotated keys): refreshed
+  inline, at most once per GOOGLE_CERTS_MIN_REFRESH_INTERVAL seconds
+
+GOOGLE_CERTS_URL points the verifier at another JWKS endpoint, e.g. a local
+stand-in serving test keys. The GOOGLE_* settings are read when the verifier
+is created (see app/core/config.py).
+"""
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+import requests
+from jwt import PyJWK, PyJWKSet
+from requests.adapters import HTTPAdapter
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class GoogleTokenError(ValueError):
+    """Raised when an ID token is malformed, expired or not signed by Google."""
+
+
+class GoogleCertsUnavailable(RuntimeError):
+    """Raised when no signing keys are cached and they cannot be fetched."""
+
+
+def cache_ttl(headers: Dict[str, str], default: Optional[int] = None) -> int:
+    """
+    Seconds a certs response may be cached, from Cache-Control max-age minus Age.
+
+    Args:
+        headers: Response headers
+        default: TTL when there is no max-age (default: GOOGLE_CERTS_DEFAULT_TTL)
+
+    Returns:
+        TTL in seconds (0 if the response must not be cached)
+    """
+    cache_control = headers.get("Cache-Control", "")
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    match = _MAX_AGE_RE.search(cache_control)
+    if match is None:
+        return default if default is not None else get_settings().google_certs_default_ttl
+    try:
+        age = int(headers.get("Age", "0"))
+    except ValueError:
+        age = 0
+    return max(0, int(match.group(1)) - age)
+
+
+class GoogleTokenVerifier:
+    """Verifies Google ID tokens with an in-memory, self-refreshing key cache."""
+
+    def __init__(
+        self,
+        client_id: str,
+        certs_url: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        timeout: Optional[float] = None
+    ):
+        settings = get_settings()
+        self.client_id = client_id
+        self.certs_url = certs_url = certs_url or settings.google_certs_url
+        self.timeout = timeout if timeout is not None else settings.google_certs_timeout
+        # Start a background refresh this long before the keys expire (at most half their lifetime)
+        self.refresh_ahead = settings.google_certs_refresh_ahead
+        self.min_refresh_interval = settings.google_certs_min_refresh_interval
+        self.leeway = settings.google_token_leeway
+        if session is None:
+            session = requests.Session()
+            session.mount(certs_url, HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self._session = session
+
+        self._keys: Dict[str, PyJWK] = {}
+        self._expires_at = 0.0  # time.monotonic()
+        self._refresh_at = 0.0
+        self._fetched_at: Optional[float] = None
+        self._failed_at: Optional[float] = None
+        # Held while fetching, so concurrent callers never fetch twice
+        self._fetch_lock = threading.Lock()
+        self._background: Optional[threading.Thread] = None
+        self._background_lock = threading.Lock()
+        self._stats = {"fetches": 0, "fetch_errors": 0, "background_refreshes": 0}
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Verify an ID token's signature, expiry, audience and issuer.
+
+        Args:
+            token: Encoded ID token
+
+        Returns:
+            The token claims
+
+        Raises:
+            GoogleTokenError: If the token is invalid
+            GoogleCertsUnavailable: If the signing keys cannot be fetched
+        """
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.PyJWTError as e:
+            raise GoogleTokenError(f"Malformed token: {e}") from e
+
+        key = self._keys_for_use().get(kid)
+        if key is None and self._may_refresh_for_unknown_key():
+            key = self._refresh().get(kid)
+        if key is None:
+            raise GoogleTokenError(f"Unknown signing key: {kid!r}")
+
+        try:
+            return jwt.decode(
+                token,
+                key.key,
+                algorithms=[key.algorithm_name],
+                audience=self.client_id,
+                issuer=GOOGLE_ISSUERS,
+                leeway=self.leeway,
+                # Without this a signed token lacking exp would never expire
+                options={"require": ["exp", "iat", "iss", "aud", "sub"]},
+            )
+        except jwt.PyJWTError as e:
+            raise GoogleTokenError(str(e)) from e
+
+    def refresh(self) -> None:
+        """Fetch the signing keys now (e.g. to warm the cache at startup)."""
+        self._refresh()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache state and fetch counters."""
+        now = time.monotonic()
+        return {
+            **self._stats,
+            "keys": len(self._keys),
+            "expires_in": round(self._expires_at - now, 1) if self._keys else None,
+        }
+
+    def _keys_for_use(self) -> Dict[str, PyJWK]:
+        """Keys to verify with, refreshing them inline or in the background as needed."""
+        now = time.monotonic()
+        if self._keys and now < self._refresh_at:
+            return self._keys
+        if self._keys and now < self._expires_at:
+            self._refresh_in_background()
+            return self._keys
+        if self._keys and self._failed_at is not None and now - self._failed_at < self.min_refresh_interval:
+            # Refresh failed just now; don't make every login wait on the outage
+            return self._keys
+        try:
+            return self._refresh()
+        except GoogleCertsUnavailable:
+            if not self._keys:
+                raise
+            logger.warning("Serving expired Google signing keys; refresh failed")
+            return self._keys
+
+    def _may_refresh_for_unknown_key(self) -> bool:
+        return (
+            self._fetched_at is None
+            or time.monotonic() - self._fetched_at >= self.min_refresh_interval
+        )
+
+    def _refresh(self) -> Dict[str, PyJWK]:
+        """Fetch and cache the keys, or wait for the fetch already running and use its result."""
+        started = time.monotonic()
+        with self._fetch_lock:
+            if self._fetched_at is not None and self._fetched_at >= started:
+                return self._keys
+            try:
+                keys, ttl = self._fetch()
+            except (requests.RequestException, ValueError, jwt.PyJWTError) as e:
+                self._stats["fetch_errors"] += 1
+                self._failed_at = time.monotonic()
+                raise GoogleCertsUnavailable(f"Could not fetch Google signing keys: {e}") from e
+
+            now = time.monotonic()
+            self._keys = keys
+            self._fetched_at = now
+            self._failed_at = None
+            self._expires_at = now + ttl
+            self._refresh_at = self._expires_at - min(self.refresh_ahead, ttl / 2)
+            return keys
+
+    def _fetch(self) -> Tuple[Dict[str, PyJWK], int]:
+        """GET the JWKS document; returns keys by key id and the cache TTL."""
+        self._stats["fetches"] += 1
+        response = self._session.get(self.certs_url, timeout=self.timeout)
+        response.raise_for_status()
+        jwks = PyJWKSet.from_dict(response.json())
+        keys = {key.key_id: key for key in jwks.keys if key.key_id and key.public_key_use in ("sig", None)}
+        return keys, cache_ttl(response.headers)
+
+    def _refresh_in_background(self) -> None:
+        with self._background_lock:
+            if self._background is not None and self._background.is_alive():
+                return
+            self._background = threading.Thread(target=self._background_refresh, daemon=True)
+            self._background.start()
+
+    def _background_refresh(self) -> None:
+        self._stats["background_refreshes"] += 1
+        try:
+            self._refresh()
+        except GoogleCertsUnavailable as e:
+            logger.warning("Background refresh of Google signing keys failed: %s", e)
+
+
+_verifier: Optional[GoogleTokenVerifier] = None
+_verifier_lock = threading.Lock()
+
+
+def get_google_verifier() -> GoogleTokenVerifier:
+    """
+    Return the process-wide Google token verifier, creating it on first use.
+
+    Raises:
+        RuntimeError: If GOOGLE_CLIENT_ID is not set
+    """
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = GoogleTokenVerifier(get_settings().require("google_client_id"))
+    return _verifier
@@ -0,0 +1,292 @@
+"""
+Crossword attempts and per-puzzle leaderboards.
+
+A player's first completed attempt at a crossword is their ranked result:
+it is inserted into crossword_leaderboard, and later completions only bump
+the row's attempt count. Completions report which words are right, so
+letting a later attempt replace the ranked one would let a player learn the
+answers with a throwaway attempt and then post a perfect time. The summary
+has one row per player and never needs the attempts table.
+
+Ranks come from an in-memory sorted list of ranking keys per crossword
+(loaded from the summary, then updated in place), so a rank is a binary
+search; recording a result is a binary search plus a list insert/delete,
+which moves the entries behind it (O(n) memmove, fine for boards of a few
+thousand players). Every LEADERBOARD_RELOAD_SECONDS a board fetches the
+summary rows changed since its last sync, to pick up completions handled by
+other workers.
+
+Completing an attempt is a conditional UPDATE on completed_at IS NULL, so an
+attempt is ranked at most once even if completions race.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.db import insert_for
+from app.models.crossword_attempts import CrosswordAttempt
+from app.models.crossword_leaderboard import CrosswordLeaderboardEntry
+from app.services.crossword_check import CheckResult
+from app.utils.lru_cache import LRUCache
+from app.utils.rate_limiter import TokenBucket
+
+# Rows committed up to this long after their updated_at (long transactions,
+# clock skew between workers) are still picked up by the next sync
+LEADERBOARD_SYNC_OVERLAP = timedelta(minutes=5)
+
+# Answer checks of a ranked (daily) puzzle outside an attempt, per player,
+# refilled at CROSSWORD_RANKED_CHECKS_PER_MINUTE
+RANKED_CHECK_BURST = 3
+
+# Ranking key: (wrong cells, seconds); lower is better
+RankKey = Tuple[int, int]
+
+_load_lock = threading.Lock()
+
+_check_buckets = LRUCache(4096, 3600)
+_check_buckets_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _boards() -> LRUCache:
+    """Crossword id -> Leaderboard (LEADERBOARD_CACHE_SIZE boards)."""
+    # Boards only ever grow more accurate, so they are kept for a day and synced
+    return LRUCache(get_settings().leaderboard_cache_size, 86400)
+
+
+class AttemptAlreadyCompletedError(Exception):
+    """Raised when an attempt was completed before (possibly concurrently)."""
+
+
+class Leaderboard:
+    """Sorted ranking keys of one crossword's players."""
+
+    def __init__(self, entries: Dict[int, RankKey]):
+        self._by_user: Dict[int, RankKey] = dict(entries)
+        # Keys carry the user id as a tie-breaker so every entry is unique
+        self._keys: List[Tuple[int, int, int]] = sorted(
+            key + (user_id,) for user_id, key in entries.items()
+        )
+        self._lock = threading.Lock()
+        # Summary rows updated before this have been applied
+        self.synced_through: Optional[datetime] = None
+        self.synced_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def submit(self, user_id: int, key: RankKey) -> None:
+        """Record a player's best key, replacing their previous one."""
+        with self._lock:
+            old = self._by_user.get(user_id)
+            if old is not None:
+                if old <= key:
+                    return
+                del self._keys[bisect_left(self._keys, old + (user_id,))]
+            self._by_user[user_id] = key
+            insort(self._keys, key + (user_id,))
+
+    def rank_of(self, key: RankKey) -> int:
+        """1-based rank a key has (ties share the better rank)."""
+        with self._lock:
+            return bisect_left(self._keys, key) + 1
+
+    def standing(self, user_id: int) -> Optional[Tuple[int, int, float]]:
+        """(rank, players, percentile) of a player, or None if they have no entry."""
+        key = self._by_user.get(user_id)
+        if key is None:
+            return None
+        rank = self.rank_of(key)
+        players = len(self._keys)
+        return rank, players, percentile(rank, players)
+
+    def top(self, limit: int) -> List[Tuple[int, RankKey]]:
+        """The best `limit` players as (user_id, key)."""
+        with self._lock:
+            return [(user_id, (miss, seconds)) for miss, seconds, user_id in self._keys[:limit]]
+
+
+def percentile(rank: int, players: int) -> float:
+    """Share of players ranked below, in percent."""
+    return round(100.0 * (players - rank) / players, 1) if players else 0.0
+
+
+def _summary_rows(db: Session, crossword_id: int, updated_since: Optional[datetime] = None):
+    query = db.query(
+        CrosswordLeaderboardEntry.user_id,
+        CrosswordLeaderboardEntry.miss_cells,
+        CrosswordLeaderboardEntry.best_time_seconds,
+    ).filter(CrosswordLeaderboardEntry.crossword_id == crossword_id)
+    if updated_since is not None:
+        query = query.filter(CrosswordLeaderboardEntry.updated_at >= updated_since)
+    return query.all()
+
+
+def get_leaderboard(db: Session, crossword_id: int) -> Leaderboard:
+    """
+    Get the in-memory board of a crossword.
+
+    The first call loads it from the summary table; afterwards it is synced
+    with the rows changed since the previous sync at most every
+    LEADERBOARD_RELOAD_SECONDS.
+    """
+    reload_seconds = get_settings().leaderboard_reload_seconds
+    board = _boards().get(crossword_id)
+    if board is not None and time.monotonic() - board.synced_at < reload_seconds:
+        return board
+
+    with _load_lock:
+        board = _boards().get(crossword_id)
+        if board is not None and time.monotonic() - board.synced_at < reload_seconds:
+            return board
+
+        sync_started = datetime.now(timezone.utc)
+        if board is None:
+            rows = _summary_rows(db, crossword_id)
+            board = Leaderboard({user_id: (miss, seconds) for user_id, miss, seconds in rows})
+            _boards().set(crossword_id, board)
+        else:
+            since = board.synced_through - LEADERBOARD_SYNC_OVERLAP
+            for user_id, miss, seconds in _summary_rows(db, crossword_id, since):
+                board.submit(user_id, (miss, seconds))
+        board.synced_through = sync_started
+        board.synced_at = time.monotonic()
+        return board
+
+
+def has_open_attempt(db: Session, crossword_id: int, user_id: int) -> bool:
+    """Whether the player has started an attempt at the crossword and not completed it."""
+    return db.query(
+        db.query(CrosswordAttempt.id)
+        .filter(CrosswordAttempt.crossword_id == crossword_id)
+        .filter(CrosswordAttempt.user_id == user_id)
+        .filter(CrosswordAttempt.completed_at.is_(None))
+        .exists()
+    ).scalar()
+
+
+def has_ranked_result(db: Session, crossword_id: int, user_id: int) -> bool:
+    """Whether the player has completed their ranked attempt at the crossword."""
+    return db.query(
+        db.query(CrosswordLeaderboardEntry.user_id)
+        .filter(CrosswordLeaderboardEntry.crossword_id == crossword_id)
+        .filter(CrosswordLeaderboardEntry.user_id == user_id)
+        .exists()
+    ).scalar()
+
+
+def allow_ranked_check(crossword_id: int, caller: str) -> bool:
+    """
+    Take one answer check of a ranked crossword from the caller's budget.
+
+    Checks report which cells are right, so unlimited checks would let
+    anyone work out the solution before starting a timed attempt.
+    """
+    key = (crossword_id, caller)
+    with _check_buckets_lock:
+        bucket = _check_buckets.get(key)
+        if bucket is None:
+            per_minute = get_settings().crossword_ranked_checks_per_minute
+            bucket = TokenBucket.per_minute(per_minute, RANKED_CHECK_BURST)
+            _check_buckets.set(key, bucket)
+    return bucket.try_acquire()
+
+
+def start_attempt(db: Session, crossword_id: int, user_id: int) -> CrosswordAttempt:
+    """Create an attempt; its start time is what completion is timed against."""
+    attempt = CrosswordAttempt(
+        crossword_id=crossword_id,
+        user_id=user_id,
+        started_at=datetime.now(timezone.utc),
+        completed=False,
+    )
+    db.add(attempt)
+    db.commit()
+    return attempt
+
+
+@dataclass
+class Standing:
+    """A player's position on a crossword's leaderboard after a completion."""
+    rank: int
+    players: int
+    percentile: float
+    best_time_seconds: int
+    best_correct_cells: int
+    # Whether this completion is the player's ranked (first) one
+    ranked: bool
+
+
+def complete_attempt(db: Session, attempt: CrosswordAttempt, result: CheckResult) -> Standing:
+    """
+    Finish an attempt with its checked result and update the leaderboard.
+
+    The solving time is measured on the server from the attempt's start.
+    Only the player's first completed attempt is ranked; the returned
+    standing is always that of the ranked result.
+
+    Raises:
+        AttemptAlreadyCompletedError: If the attempt was already completed
+    """
+    now = datetime.now(timezone.utc)
+    started_at = attempt.started_at
+    if started_at.tzinfo is None:
+        started_at = started_at.replace(tzinfo=timezone.utc)
+    seconds = max(0, int((now - started_at).total_seconds()))
+    miss_cells = result.total_cells - result.correct_cells
+
+    # Only the first completion of an attempt gets past this
+    completed = db.query(CrosswordAttempt).filter(
+        CrosswordAttempt.id == attempt.id,
+        CrosswordAttempt.completed_at.is_(None),
+    ).update(
+        {
+            "completed_at": now,
+            "completed": result.solved,
+            "time_taken_seconds": seconds,
+            "correct_cells": result.correct_cells,
+            "total_cells": result.total_cells,
+        },
+        synchronize_session=False,
+    )
+    if completed != 1:
+        db.rollback()
+        raise AttemptAlreadyCompletedError(f"Attempt {attempt.id} is already completed")
+
+    # The first completion is the ranked one; later ones are only counted
+    table = CrosswordLeaderboardEntry.__table__
+    stmt = insert_for(db, table).values(
+        crossword_id=attempt.crossword_id,
+        user_id=attempt.user_id,
+        miss_cells=miss_cells,
+        best_time_seconds=seconds,
+        correct_cells=result.correct_cells,
+        total_cells=result.total_cells,
+        attempts=1,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.crossword_id, table.c.user_id],
+        set_={"attempts": table.c.attempts + 1},
+    ).returning(table.c.miss_cells, table.c.best_time_seconds, table.c.correct_cells, table.c.attempts)
+
+    best_miss, best_seconds, best_correct, attempts = db.execute(stmt).one()
+    db.commit()
+
+    board = get_leaderboard(db, attempt.crossword_id)
+    board.submit(attempt.user_id, (best_miss, best_seconds))
+    rank, players, pct = board.standing(attempt.user_id)
+    return Standing(
+        rank=rank,
+        players=players,
+        percentile=pct,
+        best_time_seconds=best_seconds,
+        best_correct_cells=best_correct,
+        ranked=attempts == 1,
+    )
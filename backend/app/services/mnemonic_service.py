@@ -0,0 +1,455 @@
+"""
+Mnemonic cache lookups and get-or-generate logic.
+
+Shared by the /mnemonic routes and the pre-generation job.
+
+Lookups go through a per-worker LRU tier in front of the mnemonic_cache
+table, so the hot daily entries are served from memory; writes invalidate it.
+
+Images live in the content-addressed blob store; rows only carry the
+SHA-256 digest, so text lookups never load image bytes. A row whose image is
+no longer in the store counts as having no image and gets a new one.
+
+Concurrent misses for the same cache key are coalesced so only one caller
+pays for the Gemini call: within a worker through SingleFlight, and across
+workers through a generation claim (see generation_claims). Callers that
+lose the claim poll the cache until the winner has written the row, for at
+most MNEMONIC_CLAIM_WAIT_SECONDS, after which they give up with
+GenerationWaitTimeoutError. No connection is held while Gemini runs.
+
+The get-or-generate functions take either a Session or an AsyncSession. With
+an AsyncSession (the API routes) every query, claim and cache write goes
+through the async engine via run_sync; with a Session (the background
+pre-generation thread) they run on the sync engine in a worker thread. Either
+way the event loop never waits on Postgres.
+"""
+import asyncio
+import base64
+import functools
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple, TypeVar, Union
+
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.db import AsyncSessionLocal, SessionLocal, insert_for
+from app.models.mnemonic_cache import MnemonicCache
+from app.services.ai_service import AIServiceError, AITimeoutError, GeminiClient
+from app.services.blob_store import get_blob_store
+from app.services.generation_claims import new_owner, release_claim, try_claim
+from app.utils.lru_cache import LRUCache
+from app.utils.single_flight import SingleFlight
+
+# A generation claim outlives the slowest Gemini call (image timeout plus
+# queueing); if the claiming worker dies, others take over once it expires
+CLAIM_TTL_SECONDS = 180.0
+CLAIM_POLL_INTERVAL = 0.5
+
+# (word_hash, language, definition_hash) - matches uq_mnemonic_cache
+CacheKey = Tuple[str, str, str]
+
+T = TypeVar("T")
+
+AnySession = Union[Session, AsyncSession]
+
+_flights = SingleFlight()
+
+
+class GenerationWaitTimeoutError(AITimeoutError):
+    """Raised when another worker's generation doesn't finish within MNEMONIC_CLAIM_WAIT_SECONDS."""
+
+
+@functools.lru_cache(maxsize=1)
+def _memory() -> LRUCache:
+    """In-memory tier in front of mnemonic_cache, created on first use."""
+    settings = get_settings()
+    return LRUCache(
+        maxsize=settings.mnemonic_lru_size,
+        ttl_seconds=settings.mnemonic_lru_ttl_seconds,
+    )
+
+
+@dataclass(frozen=True)
+class CachedMnemonic:
+    """Snapshot of a mnemonic_cache row."""
+    mnemonic_word: Optional[str]
+    mnemonic_sentence: Optional[str]
+    image_sha256: Optional[str]
+
+    @property
+    def has_text(self) -> bool:
+        return bool(self.mnemonic_word and self.mnemonic_sentence)
+
+    @property
+    def has_image(self) -> bool:
+        return bool(self.image_sha256)
+
+
+@functools.lru_cache(maxsize=4096)
+def hash_string(s: str) -> str:
+    """Generate SHA256 hash of a string for cache keys."""
+    return hashlib.sha256(s.lower().strip().encode()).hexdigest()
+
+
+def cache_key(word: str, definition: str, language: str) -> CacheKey:
+    """Build the mnemonic cache key for a word/definition/language."""
+    return hash_string(word), language, hash_string(definition)
+
+
+def cache_stats() -> dict:
+    """Hit/miss/eviction counters of the in-memory tier."""
+    return _memory().stats()
+
+
+def lookup(db: Session, key: CacheKey) -> Optional[CachedMnemonic]:
+    """
+    Look up a cache entry, or None if there is no row for the key.
+
+    Served from the in-memory tier when possible. An entry found there may
+    be incomplete (e.g. text without image) if another worker filled it in
+    since; callers that need the missing part should use lookup_db().
+    """
+    entry = _memory().get(key)
+    if entry is not None:
+        return entry
+    return lookup_db(db, key)
+
+
+def _filter_key(query, key: CacheKey):
+    word_hash, language, definition_hash = key
+    return query.filter(
+        MnemonicCache.word_hash == word_hash,
+        MnemonicCache.language == language,
+        MnemonicCache.definition_hash == definition_hash
+    )
+
+
+def lookup_db(db: Session, key: CacheKey) -> Optional[CachedMnemonic]:
+    """Look up a cache entry in the database and refresh the in-memory tier."""
+    row = _filter_key(db.query(
+        MnemonicCache.mnemonic_word,
+        MnemonicCache.mnemonic_sentence,
+        MnemonicCache.image_sha256,
+        MnemonicCache.image_base64.isnot(None),
+    ), key).first()
+
+    if row is None:
+        return None
+
+    mnemonic_word, mnemonic_sentence, image_sha256, has_legacy_image = row
+    if image_sha256 is None and has_legacy_image:
+        image_sha256 = _move_legacy_image(db, key)
+
+    entry = CachedMnemonic(mnemonic_word, mnemonic_sentence, image_sha256)
+    _memory().set(key, entry)
+    return entry
+
+
+def lookup_many(db: Session, keys: Iterable[CacheKey]) -> Dict[CacheKey, CachedMnemonic]:
+    """
+    Look up many cache entries with at most one database round trip.
+
+    Keys are deduplicated; entries in the in-memory tier are served from
+    there and the rest are fetched with a single tuple-IN query on the
+    (word_hash, language, definition_hash) index.
+
+    Returns:
+        Dict of the keys that have a cache entry
+    """
+    found: Dict[CacheKey, CachedMnemonic] = {}
+    missing = []
+    for key in dict.fromkeys(keys):
+        entry = _memory().get(key)
+        if entry is not None:
+            found[key] = entry
+        else:
+            missing.append(key)
+
+    if not missing:
+        return found
+
+    rows = db.query(
+        MnemonicCache.word_hash,
+        MnemonicCache.language,
+        MnemonicCache.definition_hash,
+        MnemonicCache.mnemonic_word,
+        MnemonicCache.mnemonic_sentence,
+        MnemonicCache.image_sha256,
+        MnemonicCache.image_base64.isnot(None),
+    ).filter(
+        tuple_(
+            MnemonicCache.word_hash,
+            MnemonicCache.language,
+            MnemonicCache.definition_hash,
+        ).in_(missing)
+    ).all()
+
+    for word_hash, language, definition_hash, mnemonic_word, mnemonic_sentence, image_sha256, has_legacy_image in rows:
+        key = (word_hash, language, definition_hash)
+        if image_sha256 is None and has_legacy_image:
+            image_sha256 = _move_legacy_image(db, key)
+        entry = CachedMnemonic(mnemonic_word, mnemonic_sentence, image_sha256)
+        _memory().set(key, entry)
+        found[key] = entry
+
+    return found
+
+
+def _move_legacy_image(db: Session, key: CacheKey) -> Optional[str]:
+    """
+    Move a row's inline base64 image into the blob store, returning its digest.
+
+    The inline copy is only dropped once the image reads back from the store.
+    """
+    try:
+        image_base64 = _filter_key(db.query(MnemonicCache.image_base64), key).scalar()
+        if not image_base64:
+            return None
+        data = base64.b64decode(image_base64)
+        store = get_blob_store()
+        digest = store.put(data)
+        if store.get(digest) != data:
+            logging.warning(f"Blob store did not return image {digest}; keeping the inline copy")
+            return None
+        _filter_key(db.query(MnemonicCache), key).update(
+            {"image_sha256": digest, "image_base64": None},
+            synchronize_session=False,
+        )
+        db.commit()
+        return digest
+    except Exception as e:
+        db.rollback()
+        logging.warning(f"Failed to move cached image to blob store: {str(e)}")
+        return None
+
+
+def load_image(image_sha256: str) -> Optional[bytes]:
+    """Read image bytes from the blob store, or None if they are gone."""
+    return get_blob_store().get(image_sha256)
+
+
+async def _stored_image(entry: Optional[CachedMnemonic]) -> Optional[str]:
+    """The entry's image digest, if the blob store still has the image."""
+    if entry is None or not entry.has_image:
+        return None
+    if await asyncio.to_thread(get_blob_store().exists, entry.image_sha256):
+        return entry.image_sha256
+    logging.warning(f"Cached image {entry.image_sha256} is missing from the blob store")
+    return None
+
+
+def save_text(db: Session, key: CacheKey, mnemonic_word: str, mnemonic_sentence: str) -> None:
+    """Insert or update the text part of a cache entry."""
+    word_hash, language, definition_hash = key
+    stmt = insert_for(db, MnemonicCache).values(
+        word_hash=word_hash,
+        language=language,
+        definition_hash=definition_hash,
+        mnemonic_word=mnemonic_word,
+        mnemonic_sentence=mnemonic_sentence,
+        image_sha256=None  # Image will be added later
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["word_hash", "language", "definition_hash"],
+        set_={
+            "mnemonic_word": stmt.excluded.mnemonic_word,
+            "mnemonic_sentence": stmt.excluded.mnemonic_sentence,
+        },
+    )
+    db.execute(stmt)
+    db.commit()
+    _memory().invalidate(key)
+
+
+def save_image(db: Session, key: CacheKey, mnemonic_sentence: str, image_sha256: str) -> None:
+    """Point the cache entry at an image already stored in the blob store."""
+    word_hash, language, definition_hash = key
+    stmt = insert_for(db, MnemonicCache).values(
+        word_hash=word_hash,
+        language=language,
+        definition_hash=definition_hash,
+        mnemonic_word="",  # Empty if text wasn't generated first
+        mnemonic_sentence=mnemonic_sentence,
+        image_sha256=image_sha256
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["word_hash", "language", "definition_hash"],
+        set_={"image_sha256": stmt.excluded.image_sha256, "image_base64": None},
+    )
+    db.execute(stmt)
+    db.commit()
+    _memory().invalidate(key)
+
+
+async def _run(db: AnySession, fn: Callable[..., T], *args: Any) -> T:
+    """Call fn(session, *args), through run_sync or a worker thread."""
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args)
+    return await asyncio.to_thread(fn, db, *args)
+
+
+def _in_sync_session(fn: Callable[..., T], *args: Any) -> T:
+    with SessionLocal() as session:
+        return fn(session, *args)
+
+
+async def _run_in_new_session(use_async: bool, fn: Callable[..., T], *args: Any) -> T:
+    """Call fn(session, *args) on a fresh session from the async or sync engine."""
+    if use_async:
+        async with AsyncSessionLocal() as session:
+            return await session.run_sync(fn, *args)
+    return await asyncio.to_thread(_in_sync_session, fn, *args)
+
+
+async def _generate_exclusively(
+    claim_name: str,
+    recheck: Callable[[], Awaitable[Optional[T]]],
+    generate: Callable[[], Awaitable[T]],
+    use_async: bool,
+) -> T:
+    """
+    Run generate() while holding the cross-worker generation claim claim_name.
+
+    If another worker holds the claim, poll recheck() until it finds the
+    other worker's result, or until the claim is released or expires and
+    can be taken here.
+
+    Raises:
+        GenerationWaitTimeoutError: If neither happens within
+            MNEMONIC_CLAIM_WAIT_SECONDS (the claim itself may live for
+            CLAIM_TTL_SECONDS, too long to keep a request waiting)
+    """
+    owner = new_owner()
+    wait_seconds = get_settings().mnemonic_claim_wait_seconds
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        if await _run_in_new_session(use_async, try_claim, claim_name, owner, CLAIM_TTL_SECONDS):
+            try:
+                # Another worker may have finished just before we got the claim
+                found = await recheck()
+                if found is not None:
+                    return found
+                return await generate()
+            finally:
+                try:
+                    await _run_in_new_session(use_async, release_claim, claim_name, owner)
+                except Exception as e:
+                    # The claim expires on its own
+                    logging.warning(f"Failed to release {claim_name}: {str(e)}")
+
+        found = await recheck()
+        if found is not None:
+            return found
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise GenerationWaitTimeoutError(
+                f"Another worker did not finish {claim_name} within {wait_seconds:.0f}s"
+            )
+        await asyncio.sleep(min(CLAIM_POLL_INTERVAL, remaining))
+
+
+async def get_or_generate_text(
+    db: AnySession,
+    ai: GeminiClient,
+    word: str,
+    definition: str,
+    language: str,
+) -> Tuple[str, str, bool]:
+    """
+    Return the cached mnemonic text for a word, generating it on a miss.
+
+    db is only used for the initial lookup; generation and the cache write
+    use their own sessions from the same (sync or async) engine.
+
+    Returns:
+        Tuple of (mnemonic_word, mnemonic_sentence, cached)
+
+    Raises:
+        AIServiceError: If generation fails
+    """
+    key = cache_key(word, definition, language)
+    use_async = isinstance(db, AsyncSession)
+
+    cached = await _run(db, lookup, key)
+    if cached and cached.has_text:
+        return cached.mnemonic_word, cached.mnemonic_sentence, True
+    # End the read transaction so the connection isn't held while Gemini runs
+    await _run(db, Session.commit)
+
+    async def recheck() -> Optional[Tuple[str, str, bool]]:
+        entry = await _run_in_new_session(use_async, lookup_db, key)
+        if entry and entry.has_text:
+            return entry.mnemonic_word, entry.mnemonic_sentence, True
+        return None
+
+    async def generate() -> Tuple[str, str, bool]:
+        mnemonic_word, mnemonic_sentence = await ai.generate_mnemonic_text(word, definition)
+        try:
+            await _run_in_new_session(use_async, save_text, key, mnemonic_word, mnemonic_sentence)
+        except Exception as e:
+            # If cache save fails, continue anyway (not critical)
+            logging.warning(f"Failed to cache mnemonic: {str(e)}")
+        return mnemonic_word, mnemonic_sentence, False
+
+    claim_name = "mnemonic-text:" + ":".join(key)
+    return await _flights.do(
+        ("text", key),
+        lambda: _generate_exclusively(claim_name, recheck, generate, use_async),
+    )
+
+
+async def get_or_generate_image(
+    db: AnySession,
+    ai: GeminiClient,
+    word: str,
+    definition: str,
+    language: str,
+    mnemonic_sentence: str,
+) -> Tuple[str, bool]:
+    """
+    Return the cached mnemonic image for a word, generating it on a miss.
+
+    Returns:
+        Tuple of (image_sha256, cached)
+
+    Raises:
+        AIServiceError: If generation fails or returns no image
+    """
+    key = cache_key(word, definition, language)
+    use_async = isinstance(db, AsyncSession)
+
+    cached = await _run(db, lookup, key)
+    # End the read transaction so the connection isn't held while Gemini runs
+    await _run(db, Session.commit)
+    image_sha256 = await _stored_image(cached)
+    if image_sha256:
+        return image_sha256, True
+
+    async def recheck() -> Optional[Tuple[str, bool]]:
+        entry = await _run_in_new_session(use_async, lookup_db, key)
+        image_sha256 = await _stored_image(entry)
+        return (image_sha256, True) if image_sha256 else None
+
+    async def generate() -> Tuple[str, bool]:
+        image_bytes = await ai.generate_mnemonic_image(word, definition, mnemonic_sentence)
+        if not image_bytes:
+            raise AIServiceError("Image generation returned empty data")
+
+        image_sha256 = await asyncio.to_thread(get_blob_store().put, image_bytes)
+        try:
+            await _run_in_new_session(use_async, save_image, key, mnemonic_sentence, image_sha256)
+        except Exception as e:
+            # If cache update fails, continue anyway (not critical)
+            logging.warning(f"Failed to update cache with image: {str(e)}")
+        return image_sha256, False
+
+    claim_name = "mnemonic-image:" + ":".join(key)
+    return await _flights.do(
+        ("image", key),
+        lambda: _generate_exclusively(claim_name, recheck, generate, use_async),
+    )
@@ -2,293 +2,340 @@
 Service for pre-generating mnemonics for the first 10 words of each language/level combination.
 This ensures fast loading for visitors.
 
+Generation runs as a two-stage pipeline: text workers feed image workers
+through a queue, so image work for one word overlaps text work for the next.
+Each stage is throttled by a token bucket sized to the Gemini quota, and
+per-word progress is stored in pre_generation_progress so a crashed run
+resumes where it stopped. The workers share one event loop, so their
+database reads and progress writes run in threads (asyncio.to_thread)
+instead of blocking the other workers.
+
 Note: Currently set to 10 words for better initial UX. After first week, consider reducing to 3
 words to save on API costs while still providing good experience.
 """
-import hashlib
+import asyncio
+import statistics
+import time
 from datetime import date
-from typing import List
+from typing import Callable, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
+from app.core.config import get_settings
+from app.core.db import SessionLocal, insert_for
 from app.models.vocabulary import Vocabulary
-from app.models.mnemonic_cache import MnemonicCache
-import google.generativeai as genai
-import base64
-import json
-import os
-from google.api_core import exceptions as google_exceptions
-
+from app.models.pre_generation_progress import PreGenerationProgress
+from app.services import daily_words, mnemonic_service
+from app.services.ai_service import get_ai_client
+from app.utils.rate_limiter import TokenBucket
 
-def _hash_string(s: str) -> str:
-    """Generate SHA256 hash of a string for cache keys."""
-    return hashlib.sha256(s.lower().strip().encode()).hexdigest()
+LANGUAGES = ["es", "fr"]
+LEVELS = ["a1", "a2", "b1", "b2"]
+# Pre-generate first 10 words (increased from 3 for better initial UX)
+WORDS_PER_COMBINATION = 10
 
 
 def get_deterministic_words(
     db: Session,
     language: str,  # Not used for selection, only for documentation
     level: str,
-    limit: int = 3
+    limit: int = 3,
+    day: Optional[date] = None
 ) -> List[Vocabulary]:
     """
     Get deterministic words for a level.
     Uses date + level as seed to ensure same English words for everyone.
     Language doesn't affect word selection - only affects which translation/mnemonic to use.
+    The selection is read from the precomputed daily word set (see daily_words).
     
     Args:
         db: Database session
         language: Language code ('es' or 'fr') - not used for selection, kept for API compatibility
         level: Difficulty level ('a1', 'a2', 'b1', 'b2')
-        limit: Number of words to return (default 3)
+        limit: Number of words to return (default 3, at most 10)
+        day: Date to select words for (default today)
     
     Returns:
         List of Vocabulary objects (same English words regardless of language)
     """
-    today = date.today()
-    
-    # Create a deterministic seed from date + level only
-    # Language doesn't affect which English words are selected
-    seed_string = f"{today.isoformat()}-{level}"
-    seed_hash = int(hashlib.md5(seed_string.encode()).hexdigest(), 16)
-    
-    # Get all words for this level
-    query = db.query(Vocabulary).filter(Vocabulary.level == level)
-    all_words = query.order_by(Vocabulary.id).all()
-    
-    if not all_words:
-        return []
-    
-    # Use seed to deterministically select words
-    import random
-    random.seed(seed_hash)
-    selected_words = random.sample(all_words, min(limit, len(all_words)))
-    
-    # Sort by ID to ensure consistent order
-    selected_words.sort(key=lambda w: w.id)
-    
-    return selected_words[:limit]
+    return daily_words.get_daily_words(db, level, limit=limit, day=day)
 
 
-async def pre_generate_mnemonic_text(
-    word: Vocabulary,
-    language: str
-) -> tuple[str, str]:
-    """
-    Generate mnemonic text for a word.
-    
-    Returns:
-        Tuple of (mnemonic_word, mnemonic_sentence)
-    """
-    # Get translation based on language
-    translation = word.translation_es if language == "es" else word.translation_fr
-    if not translation:
-        translation = word.word  # Fallback to word itself
-    
-    prompt_text = f"""
-    Create mnemonic JSON.
+# Work item: one word of one language/level combination
+Item = Dict[str, object]
+ItemKey = Tuple[str, str, int]  # (language, level, word_id)
 
-    Word: {translation}
-    Definition: {word.definition}
 
-    STRICT OUTPUT:
-    {{
-      "mnemonic_word": "...",
-      "mnemonic_sentence": "..."
-    }}
-    """
-    
-    try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        text_res = model.generate_content(contents=[prompt_text])
-        
-        if not text_res or not text_res.text:
-            raise ValueError("Empty response from AI service")
-        
-        # Clean markdown
-        raw = text_res.text.strip()
-        raw = raw.replace("```json", "").replace("```", "")
-        raw = raw.replace("**", "")
-        raw = raw.strip()
-        
-        parsed = json.loads(raw)
-        mnemonic_word = parsed.get("mnemonic_word")
-        mnemonic_sentence = parsed.get("mnemonic_sentence")
-        
-        if not mnemonic_word or not mnemonic_sentence:
-            raise ValueError("Missing required fields in response")
-        
-        return mnemonic_word, mnemonic_sentence
-    except Exception as e:
-        print(f"❌ Error generating mnemonic text for {word.word}: {e}")
-        raise
+def _item_key(item: Item) -> ItemKey:
+    return item["language"], item["level"], item["word_id"]
 
 
-async def pre_generate_mnemonic_image(
-    word: Vocabulary,
-    mnemonic_sentence: str,
-    language: str
-) -> str | None:
+def _collect_items(db: Session, run_date: date) -> List[Item]:
+    """Build the work items for every language/level combination."""
+    items: List[Item] = []
+    # Roll the daily word sets over to the run date (word selection does not depend on language)
+    daily_words.roll_over(db, run_date, LEVELS)
+    for level in LEVELS:
+        words = get_deterministic_words(db, "es", level, limit=WORDS_PER_COMBINATION, day=run_date)
+        for language in LANGUAGES:
+            for word in words:
+                items.append({
+                    "language": language,
+                    "level": level,
+                    "word_id": word.id,
+                    "word": word.word,
+                    "translation": daily_words.translation_for(word, language),
+                    "definition": word.definition,
+                })
+    return items
+
+
+def _load_progress(db: Session, run_date: date, items: List[Item]) -> Dict[ItemKey, Tuple[bool, bool]]:
     """
-    Generate mnemonic image for a word.
-    
-    Returns:
-        Base64 encoded image string, or None if generation fails
+    Ensure a progress row exists for every item and return (text_done, image_done) per item.
     """
-    translation = word.translation_es if language == "es" else word.translation_fr
-    if not translation:
-        translation = word.word
-    
-    prompt_image = (
-        f"Funny colorful cartoon illustration representing the mnemonic: {mnemonic_sentence}. "
-        f"This is a memory aid for the word '{translation}' which means: {word.definition}. "
-        "No text in the image. Highly visual and memorable. "
-        "The illustration should help remember the word through the mnemonic connection."
-    )
-    
+    if items:
+        stmt = insert_for(db, PreGenerationProgress).values([
+            {
+                "run_date": run_date,
+                "language": item["language"],
+                "level": item["level"],
+                "word_id": item["word_id"],
+                "text_done": False,
+                "image_done": False,
+                "attempts": 0,
+            }
+            for item in items
+        ]).on_conflict_do_nothing(index_elements=["run_date", "language", "level", "word_id"])
+        db.execute(stmt)
+        db.commit()
+
+    rows = db.query(
+        PreGenerationProgress.language,
+        PreGenerationProgress.level,
+        PreGenerationProgress.word_id,
+        PreGenerationProgress.text_done,
+        PreGenerationProgress.image_done,
+    ).filter(PreGenerationProgress.run_date == run_date).all()
+    return {(language, level, word_id): (text_done, image_done)
+            for language, level, word_id, text_done, image_done in rows}
+
+
+def _prepare(
+    session_factory: Callable[[], Session],
+    run_date: date
+) -> Tuple[List[Item], Dict[ItemKey, Tuple[bool, bool]]]:
+    """Work items of a run and their stored progress."""
+    with session_factory() as db:
+        items = _collect_items(db, run_date)
+        return items, _load_progress(db, run_date, items)
+
+
+def _record_progress(
+    session_factory: Callable[[], Session],
+    run_date: date,
+    item: Item,
+    error: Optional[str] = None,
+    **values
+) -> None:
+    """Persist the progress of one item (failures here are logged, not raised)."""
+    if error is not None:
+        values["last_error"] = error[:1000]
+        values["attempts"] = PreGenerationProgress.attempts + 1
     try:
-        img_model = genai.GenerativeModel("gemini-2.5-flash-image")
-        img_res = img_model.generate_content(prompt_image)
-        
-        if img_res and img_res.parts:
-            for part in img_res.parts:
-                if part.inline_data is not None and part.inline_data.data:
-                    if isinstance(part.inline_data.data, bytes):
-                        raw_bytes = part.inline_data.data
-                        image_base64 = base64.b64encode(raw_bytes).decode("utf-8")
-                        return image_base64
-        
-        return None
+        with session_factory() as db:
+            db.query(PreGenerationProgress).filter(
+                PreGenerationProgress.run_date == run_date,
+                PreGenerationProgress.language == item["language"],
+                PreGenerationProgress.level == item["level"],
+                PreGenerationProgress.word_id == item["word_id"],
+            ).update(values, synchronize_session=False)
+            db.commit()
     except Exception as e:
-        print(f"⚠️ Error generating image for {word.word}: {e}")
-        return None
+        print(f"⚠️ Failed to record progress for {item['word']}: {e}")
 
 
-async def pre_generate_for_combination(
-    db: Session,
-    language: str,
-    level: str
+def _latency_summary(samples: List[float]) -> dict:
+    """Summarize stage latencies in seconds."""
+    if not samples:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "max": None}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 3),
+        "p50": round(ordered[len(ordered) // 2], 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+async def pre_generate_all_combinations(
+    run_date: Optional[date] = None,
+    session_factory: Callable[[], Session] = SessionLocal,
+    text_workers: Optional[int] = None,
+    image_workers: Optional[int] = None,
+    on_start: Optional[Callable[[int], None]] = None,
+    on_item_done: Optional[Callable[[Item, str], None]] = None,
 ) -> dict:
     """
-    Pre-generate mnemonics for the first 10 words of a language/level combination.
-    (Increased from 3 for better initial UX - can reduce back to 3 after first week to save costs)
+    Pre-generate mnemonics for all language/level combinations.
+    
+    Args:
+        run_date: Date whose daily words are pre-generated (default today)
+        session_factory: Creates the short-lived DB sessions used by workers
+        text_workers: Number of concurrent text-stage workers (default PRE_GEN_TEXT_WORKERS)
+        image_workers: Number of concurrent image-stage workers (default PRE_GEN_IMAGE_WORKERS)
+        on_start: Optional callback(total_items) called once the words are known
+        on_item_done: Optional callback(item, outcome) with outcome one of
+            'cached', 'generated' or 'error', called as each word finishes
+            (both callbacks run in worker threads, so they may do blocking I/O)
     
     Returns:
-        Dict with stats about what was generated
+        Dict with overall stats, throughput and per-stage latency
     """
-    print(f"🔄 Pre-generating for {language}/{level}...")
-    
-    # Get deterministic words
-    # Pre-generate first 10 words (increased from 3 for better initial UX)
-    words = get_deterministic_words(db, language, level, limit=10)
-    
-    if not words:
-        print(f"⚠️ No words found for {language}/{level}")
-        return {"language": language, "level": level, "words_processed": 0, "cached": 0, "generated": 0, "errors": 0}
-    
-    stats = {
-        "language": language,
-        "level": level,
-        "words_processed": len(words),
-        "cached": 0,
-        "generated": 0,
-        "errors": 0
+    run_date = run_date or date.today()
+    started = time.perf_counter()
+    ai = get_ai_client()
+    # Gemini quotas are per model, so each stage has its own bucket
+    settings = get_settings()
+    text_workers = text_workers or settings.pre_gen_text_workers
+    image_workers = image_workers or settings.pre_gen_image_workers
+    text_bucket = TokenBucket.per_minute(settings.pre_gen_text_rpm, burst=text_workers)
+    image_bucket = TokenBucket.per_minute(settings.pre_gen_image_rpm, burst=image_workers)
+
+    items, progress = await asyncio.to_thread(_prepare, session_factory, run_date)
+
+    if on_start is not None:
+        await asyncio.to_thread(on_start, len(items))
+
+    print(f"🚀 Starting pre-generation for {len(LANGUAGES) * len(LEVELS)} combinations "
+          f"({len(items)} words, {text_workers} text / {image_workers} image workers)...")
+
+    combos: Dict[Tuple[str, str], dict] = {
+        (language, level): {
+            "language": language,
+            "level": level,
+            "words_processed": 0,
+            "cached": 0,
+            "generated": 0,
+            "errors": 0
+        }
+        for language in LANGUAGES for level in LEVELS
     }
-    
-    for word in words:
+    latencies: Dict[str, List[float]] = {"text": [], "image": []}
+
+    async def finish(item: Item, outcome: str) -> None:
+        combos[(item["language"], item["level"])][outcome if outcome != "error" else "errors"] += 1
+        if on_item_done is not None:
+            await asyncio.to_thread(on_item_done, item, outcome)
+
+    def lookup_entry(item: Item):
+        key = mnemonic_service.cache_key(item["translation"], item["definition"], item["language"])
+        with session_factory() as db:
+            return mnemonic_service.lookup_db(db, key)
+
+    async def record(item: Item, error: Optional[str] = None, **values) -> None:
+        await asyncio.to_thread(_record_progress, session_factory, run_date, item, error, **values)
+
+    text_queue: asyncio.Queue = asyncio.Queue()
+    image_queue: asyncio.Queue = asyncio.Queue()
+
+    for item in items:
+        combos[(item["language"], item["level"])]["words_processed"] += 1
+        if progress.get(_item_key(item), (False, False))[1]:
+            print(f"  ✅ {item['word']} ({item['language']}): Already done")
+            await finish(item, "cached")
+        else:
+            text_queue.put_nowait(item)
+
+    async def text_stage(item: Item) -> None:
         try:
-            # Get translation
-            translation = word.translation_es if language == "es" else word.translation_fr
-            if not translation:
-                translation = word.word
-            
-            # Generate cache keys
-            word_hash = _hash_string(translation)
-            definition_hash = _hash_string(word.definition)
-            
-            # Check if already cached
-            cached = db.query(MnemonicCache).filter(
-                MnemonicCache.word_hash == word_hash,
-                MnemonicCache.language == language,
-                MnemonicCache.definition_hash == definition_hash
-            ).first()
-            
-            if cached and cached.mnemonic_word and cached.mnemonic_sentence and cached.image_base64:
-                print(f"  ✅ {word.word}: Already cached")
-                stats["cached"] += 1
-                continue
-            
-            # Generate mnemonic text
-            print(f"  📝 Generating text for {word.word}...")
-            mnemonic_word, mnemonic_sentence = await pre_generate_mnemonic_text(word, language)
-            
-            # Generate mnemonic image
-            print(f"  🖼️ Generating image for {word.word}...")
-            image_base64 = await pre_generate_mnemonic_image(word, mnemonic_sentence, language)
-            
-            # Save to cache
-            if cached:
-                # Update existing
-                cached.mnemonic_word = mnemonic_word
-                cached.mnemonic_sentence = mnemonic_sentence
-                if image_base64:
-                    cached.image_base64 = image_base64
+            entry = await asyncio.to_thread(lookup_entry, item)
+            if entry and entry.has_text and entry.has_image:
+                print(f"  ✅ {item['word']} ({item['language']}): Already cached")
+                await record(item, text_done=True, image_done=True)
+                await finish(item, "cached")
+                return
+
+            if entry and entry.has_text:
+                item["mnemonic_sentence"] = entry.mnemonic_sentence
             else:
-                # Create new
-                cache_entry = MnemonicCache(
-                    word_hash=word_hash,
-                    language=language,
-                    definition_hash=definition_hash,
-                    mnemonic_word=mnemonic_word,
-                    mnemonic_sentence=mnemonic_sentence,
-                    image_base64=image_base64
+                await text_bucket.acquire()
+                print(f"  📝 Generating text for {item['word']} ({item['language']})...")
+                t0 = time.perf_counter()
+                with session_factory() as db:
+                    _, mnemonic_sentence, _ = await mnemonic_service.get_or_generate_text(
+                        db, ai, item["translation"], item["definition"], item["language"]
+                    )
+                latencies["text"].append(time.perf_counter() - t0)
+                item["mnemonic_sentence"] = mnemonic_sentence
+                item["text_generated"] = True
+
+            await record(item, text_done=True)
+            image_queue.put_nowait(item)
+        except Exception as e:
+            print(f"  ❌ Error generating text for {item['word']}: {e}")
+            await record(item, error=str(e))
+            await finish(item, "error")
+
+    async def image_stage(item: Item) -> None:
+        try:
+            await image_bucket.acquire()
+            print(f"  🖼️ Generating image for {item['word']} ({item['language']})...")
+            t0 = time.perf_counter()
+            with session_factory() as db:
+                _, image_cached = await mnemonic_service.get_or_generate_image(
+                    db, ai, item["translation"], item["definition"],
+                    item["language"], item["mnemonic_sentence"]
                 )
-                db.add(cache_entry)
-            
-            db.commit()
-            print(f"  ✅ {word.word}: Generated and cached")
-            stats["generated"] += 1
-            
+            latencies["image"].append(time.perf_counter() - t0)
+            await record(item, image_done=True, last_error=None)
+            print(f"  ✅ {item['word']} ({item['language']}): Generated and cached")
+            await finish(item, "cached" if image_cached and not item.get("text_generated") else "generated")
         except Exception as e:
-            print(f"  ❌ Error processing {word.word}: {e}")
-            stats["errors"] += 1
-            db.rollback()
-    
-    return stats
+            # Image is left pending so the next run retries it
+            print(f"  ❌ Error generating image for {item['word']}: {e}")
+            await record(item, error=str(e))
+            await finish(item, "error")
 
+    async def worker(queue: asyncio.Queue, stage) -> None:
+        while True:
+            item = await queue.get()
+            try:
+                await stage(item)
+            finally:
+                queue.task_done()
 
-async def pre_generate_all_combinations(db: Session) -> dict:
-    """
-    Pre-generate mnemonics for all language/level combinations.
-    
-    Returns:
-        Dict with overall stats
-    """
-    languages = ["es", "fr"]
-    levels = ["a1", "a2", "b1", "b2"]
-    
-    print(f"🚀 Starting pre-generation for {len(languages) * len(levels)} combinations...")
-    
-    all_stats = []
-    for language in languages:
-        for level in levels:
-            stats = await pre_generate_for_combination(db, language, level)
-            all_stats.append(stats)
-    
+    tasks = [asyncio.create_task(worker(text_queue, text_stage)) for _ in range(max(1, text_workers))]
+    tasks += [asyncio.create_task(worker(image_queue, image_stage)) for _ in range(max(1, image_workers))]
+    try:
+        # Text workers enqueue image work before marking their item done,
+        # so once the text queue drains the image queue holds everything left
+        await text_queue.join()
+        await image_queue.join()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    elapsed = time.perf_counter() - started
+    all_stats = list(combos.values())
     total_stats = {
+        "run_date": run_date.isoformat(),
         "total_combinations": len(all_stats),
         "total_words_processed": sum(s["words_processed"] for s in all_stats),
         "total_cached": sum(s["cached"] for s in all_stats),
         "total_generated": sum(s["generated"] for s in all_stats),
         "total_errors": sum(s["errors"] for s in all_stats),
+        "elapsed_seconds": round(elapsed, 2),
+        "throughput_per_minute": round(len(items) / elapsed * 60, 2) if elapsed > 0 else None,
+        "stage_latency": {stage: _latency_summary(samples) for stage, samples in latencies.items()},
         "combinations": all_stats
     }
     
-    print(f"✅ Pre-generation complete!")
+    print("✅ Pre-generation complete!")
     print(f"   Processed: {total_stats['total_words_processed']} words")
     print(f"   Cached: {total_stats['total_cached']}")
     print(f"   Generated: {total_stats['total_generated']}")
     print(f"   Errors: {total_stats['total_errors']}")
     
     return total_stats
-
@@ -0,0 +1,266 @@
+"""
+Background jobs for daily mnemonic pre-generation.
+
+A job row is created per run and the pipeline executes in a dedicated worker
+thread with its own event loop and its own DB sessions, so the HTTP request
+that started it returns immediately. Progress is written to the job row as
+words finish, which is what /pre-generation/status reports. A partial unique
+index allows only one pending/running job per date.
+"""
+import asyncio
+import threading
+import traceback
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.models.pre_generation_job import PreGenerationJob
+from app.models.pre_generation_progress import PreGenerationProgress
+from app.services.daily_crossword import ensure_daily_crosswords
+from app.services.pre_generation import (
+    pre_generate_all_combinations,
+    LANGUAGES,
+    LEVELS,
+)
+
+ACTIVE_STATUSES = ("pending", "running")
+
+# A running job whose heartbeat is older than this is assumed dead
+# (e.g. the worker process was restarted) and no longer blocks its date
+STALE_AFTER = timedelta(minutes=15)
+
+
+class JobAlreadyRunning(Exception):
+    """Raised when a pre-generation job is already active for the date."""
+
+    def __init__(self, job_id: int):
+        super().__init__(f"Pre-generation job {job_id} is already running")
+        self.job_id = job_id
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def get_active_job(db: Session, run_date: date) -> Optional[PreGenerationJob]:
+    """Return the pending/running job for a date, if any."""
+    return (
+        db.query(PreGenerationJob)
+        .filter(PreGenerationJob.run_date == run_date)
+        .filter(PreGenerationJob.status.in_(ACTIVE_STATUSES))
+        .first()
+    )
+
+
+def get_latest_job(db: Session, run_date: Optional[date] = None) -> Optional[PreGenerationJob]:
+    """Return the most recently created job, optionally for one date."""
+    query = db.query(PreGenerationJob)
+    if run_date is not None:
+        query = query.filter(PreGenerationJob.run_date == run_date)
+    return query.order_by(PreGenerationJob.id.desc()).first()
+
+
+def create_job(db: Session, run_date: Optional[date] = None) -> PreGenerationJob:
+    """
+    Create a pending job for a date.
+
+    Raises:
+        JobAlreadyRunning: If another job for the date is pending or running
+    """
+    run_date = run_date or date.today()
+
+    active = get_active_job(db, run_date)
+    if active is not None:
+        heartbeat = active.heartbeat_at or active.created_at
+        if heartbeat is not None and _now() - heartbeat > STALE_AFTER:
+            active.status = "failed"
+            active.error = "Abandoned: no progress heartbeat (worker stopped?)"
+            active.finished_at = _now()
+            db.commit()
+        else:
+            raise JobAlreadyRunning(active.id)
+
+    job = PreGenerationJob(
+        run_date=run_date,
+        status="pending",
+        total_items=0,
+        done_items=0,
+        error_items=0,
+        progress={},
+        heartbeat_at=_now(),
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost a race with another request/worker for the same date
+        db.rollback()
+        active = get_active_job(db, run_date)
+        raise JobAlreadyRunning(active.id if active else 0)
+    db.refresh(job)
+    return job
+
+
+def _update_job(job_id: int, **values) -> None:
+    with SessionLocal() as db:
+        db.query(PreGenerationJob).filter(PreGenerationJob.id == job_id).update(
+            values, synchronize_session=False
+        )
+        db.commit()
+
+
+async def execute_job(
+    job_id: int,
+    text_workers: Optional[int] = None,
+    image_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Run the pre-generation pipeline for a job, recording progress on the job row.
+
+    Args:
+        job_id: Job created with create_job()
+        text_workers: Number of concurrent text-stage workers (default PRE_GEN_TEXT_WORKERS)
+        image_workers: Number of concurrent image-stage workers (default PRE_GEN_IMAGE_WORKERS)
+
+    Returns:
+        Final pipeline stats
+    """
+    with SessionLocal() as db:
+        job = db.get(PreGenerationJob, job_id)
+        run_date = job.run_date
+
+    _update_job(job_id, status="running", started_at=_now(), heartbeat_at=_now())
+
+    # Shared daily crosswords only need the word sets, so build them first
+    try:
+        with SessionLocal() as db:
+            built = ensure_daily_crosswords(db, run_date, LEVELS, LANGUAGES)
+        print(f"🧩 {built} daily crosswords ready for {run_date}")
+    except Exception as e:
+        print(f"⚠️ Failed to build daily crosswords for {run_date}: {e}")
+
+    counters: Dict[str, Dict[str, int]] = {}
+    totals = {"done": 0, "errors": 0}
+    # The pipeline calls back from worker threads; updates are applied and
+    # written one at a time, so the job row never goes backwards
+    progress_lock = threading.Lock()
+
+    def on_start(total_items: int) -> None:
+        _update_job(job_id, total_items=total_items, heartbeat_at=_now())
+
+    def on_item_done(item: Dict[str, Any], outcome: str) -> None:
+        with progress_lock:
+            combo = counters.setdefault(
+                f"{item['language']}/{item['level']}",
+                {"done": 0, "cached": 0, "generated": 0, "errors": 0},
+            )
+            combo["done"] += 1
+            combo["errors" if outcome == "error" else outcome] += 1
+            totals["done"] += 1
+            if outcome == "error":
+                totals["errors"] += 1
+            try:
+                _update_job(
+                    job_id,
+                    done_items=totals["done"],
+                    error_items=totals["errors"],
+                    progress=counters,
+                    heartbeat_at=_now(),
+                )
+            except Exception as e:
+                print(f"⚠️ Failed to update job {job_id} progress: {e}")
+
+    try:
+        stats = await pre_generate_all_combinations(
+            run_date=run_date,
+            text_workers=text_workers,
+            image_workers=image_workers,
+            on_start=on_start,
+            on_item_done=on_item_done,
+        )
+    except Exception as e:
+        traceback.print_exc()
+        _update_job(job_id, status="failed", error=str(e), finished_at=_now(), heartbeat_at=_now())
+        raise
+
+    _update_job(
+        job_id,
+        status="succeeded",
+        stats=stats,
+        progress=counters,
+        finished_at=_now(),
+        heartbeat_at=_now(),
+    )
+    return stats
+
+
+def _run_in_thread(job_id: int) -> None:
+    try:
+        asyncio.run(execute_job(job_id))
+    except Exception as e:
+        print(f"❌ Pre-generation job {job_id} failed: {e}")
+
+
+def launch_job(job_id: int) -> threading.Thread:
+    """Run a job in a dedicated daemon thread with its own event loop."""
+    thread = threading.Thread(
+        target=_run_in_thread,
+        args=(job_id,),
+        name=f"pre-generation-job-{job_id}",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def _recent_errors(db: Session, run_date: date, limit: int = 20) -> List[Dict[str, Any]]:
+    rows = (
+        db.query(
+            PreGenerationProgress.language,
+            PreGenerationProgress.level,
+            PreGenerationProgress.word_id,
+            PreGenerationProgress.attempts,
+            PreGenerationProgress.last_error,
+        )
+        .filter(PreGenerationProgress.run_date == run_date)
+        .filter(PreGenerationProgress.last_error.isnot(None))
+        .filter(PreGenerationProgress.image_done.is_(False))
+        .order_by(PreGenerationProgress.updated_at.desc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        {"language": language, "level": level, "word_id": word_id, "attempts": attempts, "error": error}
+        for language, level, word_id, attempts, error in rows
+    ]
+
+
+def describe_job(db: Session, job: PreGenerationJob) -> Dict[str, Any]:
+    """Build the status payload for a job: progress, ETA and errors."""
+    percent = (job.done_items / job.total_items * 100) if job.total_items else 0.0
+
+    eta_seconds = None
+    if job.status == "running" and job.started_at and 0 < job.done_items < job.total_items:
+        elapsed = (_now() - job.started_at).total_seconds()
+        eta_seconds = round(elapsed / job.done_items * (job.total_items - job.done_items), 1)
+
+    return {
+        "job_id": job.id,
+        "run_date": job.run_date.isoformat(),
+        "status": job.status,
+        "total_items": job.total_items,
+        "done_items": job.done_items,
+        "error_items": job.error_items,
+        "percent": round(percent, 1),
+        "eta_seconds": eta_seconds,
+        "progress": job.progress or {},
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "error": job.error,
+        "item_errors": _recent_errors(db, job.run_date),
+        "stats": job.stats,
+    }
@@ -0,0 +1,146 @@
+"""
+Random word sampling from an in-memory id index.
+
+`ORDER BY random() LIMIT n` sorts the whole filtered table on every call.
+Instead we keep a dense array of Vocabulary ids per level in memory, draw
+random positions from it, and load only the chosen rows by primary key, so a
+sample costs O(n) in the number of words requested, whatever the vocabulary
+size.
+
+The index is rebuilt lazily: immediately after Vocabulary rows are changed
+through the ORM in this process, and otherwise every VOCAB_INDEX_TTL_SECONDS
+to pick up changes made elsewhere (e.g. SQL imports).
+"""
+import random
+import threading
+import time
+from array import array
+from typing import Collection, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.vocabulary import Vocabulary
+
+# Random draws per requested word before falling back to filtering the
+# candidates (only happens when most of the level is excluded)
+MAX_DRAWS_PER_WORD = 8
+
+ALL_LEVELS = None  # index key for "any level"
+
+_index: Optional[Dict[Optional[str], array]] = None
+_built_at = 0.0
+_index_lock = threading.Lock()
+_rng = random.Random()
+
+
+def invalidate() -> None:
+    """Drop the id index so the next sample rebuilds it."""
+    global _index
+    with _index_lock:
+        _index = None
+
+
+@event.listens_for(Vocabulary, "after_insert")
+@event.listens_for(Vocabulary, "after_update")
+@event.listens_for(Vocabulary, "after_delete")
+def _on_vocabulary_change(mapper, connection, target) -> None:
+    invalidate()
+
+
+def _get_index(db: Session) -> Dict[Optional[str], array]:
+    global _index, _built_at
+    ttl = get_settings().vocab_index_ttl_seconds
+    index = _index
+    if index is not None and time.monotonic() - _built_at < ttl:
+        return index
+
+    with _index_lock:
+        if _index is not None and time.monotonic() - _built_at < ttl:
+            return _index
+
+        index = {ALL_LEVELS: array("l")}
+        for word_id, level in db.query(Vocabulary.id, Vocabulary.level).order_by(Vocabulary.id):
+            index[ALL_LEVELS].append(word_id)
+            index.setdefault(level, array("l")).append(word_id)
+
+        _index = index
+        _built_at = time.monotonic()
+        print(f"🔄 Word sampler index built: {len(index[ALL_LEVELS])} words, "
+              f"{len(index) - 1} levels")
+        return index
+
+
+def level_size(db: Session, level: Optional[str] = None) -> int:
+    """Number of words in a level (or in total), from the index."""
+    return len(_get_index(db).get(level or ALL_LEVELS, ()))
+
+
+def sample_ids(
+    db: Session,
+    limit: int,
+    level: Optional[str] = None,
+    exclude: Optional[Collection[int]] = None
+) -> List[int]:
+    """
+    Pick up to `limit` distinct random word ids.
+
+    Args:
+        db: Database session (only used to build the index)
+        limit: Number of ids to pick
+        level: Optional difficulty level filter (a1, a2, b1, b2)
+        exclude: Ids that must not be picked (e.g. words already shown)
+
+    Returns:
+        Random ids, in random order
+    """
+    ids = _get_index(db).get(level or ALL_LEVELS)
+    if not ids or limit <= 0:
+        return []
+
+    exclude = exclude or ()
+    chosen: Dict[int, None] = {}  # insertion-ordered set
+    draws = 0
+    max_draws = limit * MAX_DRAWS_PER_WORD
+    while len(chosen) < limit and draws < max_draws:
+        draws += 1
+        word_id = ids[_rng.randrange(len(ids))]
+        if word_id not in exclude and word_id not in chosen:
+            chosen[word_id] = None
+
+    if len(chosen) < limit:
+        # Too many collisions: the level is small or mostly excluded
+        remaining = [word_id for word_id in ids if word_id not in exclude and word_id not in chosen]
+        chosen.update(dict.fromkeys(_rng.sample(remaining, min(limit - len(chosen), len(remaining)))))
+
+    return list(chosen)
+
+
+def sample_words(
+    db: Session,
+    limit: int,
+    level: Optional[str] = None,
+    exclude: Optional[Collection[int]] = None
+) -> List[Vocabulary]:
+    """
+    Get up to `limit` distinct random words, loaded by primary key.
+
+    Args:
+        db: Database session
+        limit: Number of words to return
+        level: Optional difficulty level filter (a1, a2, b1, b2)
+        exclude: Word ids that must not be returned
+
+    Returns:
+        List of random Vocabulary objects
+    """
+    word_ids = sample_ids(db, limit, level, exclude)
+    if not word_ids:
+        return []
+
+    rows = {w.id: w for w in db.query(Vocabulary).filter(Vocabulary.id.in_(word_ids)).all()}
+    if len(rows) < len(word_ids):
+        # Words were deleted outside this process; rebuild on the next call
+        invalidate()
+    return [rows[word_id] for word_id in word_ids if word_id in rows]
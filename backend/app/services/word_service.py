@@ -1,15 +1,17 @@
 import datetime
-from typing import List, Optional
+from typing import Collection, Iterable, List, Optional
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 from app.models.vocabulary import Vocabulary
 from app.models.user_word_history import UserWordHistory
+from app.services import word_sampler
 
 
 def get_daily_words_for_user(
     db: Session,
-    user_id: int
+    user_id: int,
+    level: Optional[str] = None
 ) -> Optional[List[Vocabulary]]:
     """
     Check if user already has today's assigned words.
@@ -17,6 +19,7 @@ def get_daily_words_for_user(
     Args:
         db: Database session
         user_id: User ID
+        level: Optional difficulty level filter
     
     Returns:
         List of Vocabulary objects if words exist for today, None otherwise
@@ -26,12 +29,19 @@ def get_daily_words_for_user(
 
     today = datetime.date.today()
 
-    # Query with join to avoid N+1
-    words = (
+    # Query with join to avoid N+1; (user_id, served_date) is the leading part
+    # of uq_user_word_history_user_date_word, so this is an index range scan
+    query = (
         db.query(Vocabulary)
         .join(UserWordHistory, Vocabulary.id == UserWordHistory.word_id)
         .filter(UserWordHistory.user_id == user_id)
         .filter(UserWordHistory.served_date == today)
+    )
+    if level:
+        query = query.filter(Vocabulary.level == level)
+    words = (
+        query
+        .order_by(UserWordHistory.word_id)
         .limit(10)  # Limit to 10 words
         .all()
     )
@@ -47,7 +57,8 @@ def assign_daily_words(
     db: Session,
     user_id: int,
     level: str,
-    limit: int
+    limit: int,
+    exclude: Optional[Collection[int]] = None
 ) -> List[Vocabulary]:
     """
     Assign new daily words to user (or guest).
@@ -57,34 +68,51 @@ def assign_daily_words(
         user_id: User ID
         level: Vocabulary difficulty level
         limit: Maximum number of words to assign
+        exclude: Optional word ids not to assign (e.g. already seen)
     
     Returns:
         List of assigned Vocabulary objects
     """
     today = datetime.date.today()
 
-    # Select random words based on level (database-agnostic)
-    words = (
-        db.query(Vocabulary)
-        .filter(Vocabulary.level == level)
-        .order_by(func.random())
-        .limit(limit)
-        .all()
-    )
+    # Select random words based on level from the in-memory id index
+    words = word_sampler.sample_words(db, limit, level=level, exclude=exclude)
 
     if not words:
         return []
 
-    entries = []
-    for w in words:
-        entries.append(
-            UserWordHistory(
-                user_id=user_id,
-                word_id=w.id,
-                served_date=today,
-                completed=False
-            )
-        )
-
-    db.add_all(entries)
+    record_served_words(db, user_id, [w.id for w in words], today)
     return words
+
+
+def record_served_words(
+    db: Session,
+    user_id: int,
+    word_ids: Iterable[int],
+    served_date: Optional[datetime.date] = None
+) -> None:
+    """
+    Add words to a user's history for a day, skipping ones already recorded.
+    
+    Concurrent requests for the same user may both get here; the unique
+    (user_id, served_date, word_id) constraint makes the second insert a no-op.
+    The caller commits.
+    
+    Args:
+        db: Database session
+        user_id: User ID
+        word_ids: Served Vocabulary ids
+        served_date: Day the words were served (default today)
+    """
+    served_date = served_date or datetime.date.today()
+    rows = [
+        {"user_id": user_id, "word_id": word_id, "served_date": served_date, "completed": False}
+        for word_id in word_ids
+    ]
+    if not rows:
+        return
+    db.execute(
+        insert(UserWordHistory)
+        .values(rows)
+        .on_conflict_do_nothing(constraint="uq_user_word_history_user_date_word")
+    )
@@ -0,0 +1,61 @@
+"""
+In-process request coalescing ("single flight").
+
+The first caller for a key starts the work; concurrent callers for the same
+key await that result instead of repeating the work. Results are not kept
+once the call finishes - caching is the caller's job.
+"""
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent async calls that share a key.
+
+    The shared work runs as its own task, so a caller that is cancelled
+    (e.g. the client disconnected) does not cancel it for the others. Waiting
+    is done through a thread-safe future, so callers on different event
+    loops (API loop, background job thread) can share one instance.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, concurrent.futures.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Return True if a call for this key is currently running."""
+        with self._lock:
+            return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() for key, or join the call already in flight for key.
+
+        Every caller gets the same result, or the same exception.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._calls[key] = future
+
+        if leader:
+            task = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda t: self._finish(key, future, t))
+
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _finish(self, key: Hashable, future: concurrent.futures.Future, task: asyncio.Task) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+
+        if task.cancelled():
+            future.set_exception(asyncio.CancelledError())
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
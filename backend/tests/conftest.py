@@ -0,0 +1,58 @@
+"""
+Test setup: a throwaway SQLite database shared by the sync and async engines.
+
+The environment is set before any app module reads its settings. Tests create
+only the tables they use (several models need Postgres-only types).
+"""
+import asyncio
+import importlib
+import os
+import pkgutil
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="easeevocab-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ.setdefault("JWT_SECRET", "test-secret-at-least-32-bytes-long")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-client-id")
+
+import pytest
+
+import app.models
+from app.core.db import Base, SessionLocal, get_engine
+
+# Register every table, so foreign keys between models resolve
+for module in pkgutil.iter_modules(app.models.__path__):
+    importlib.import_module(f"app.models.{module.name}")
+
+
+@pytest.fixture
+def make_tables():
+    """Create the tables of the given models; dropped again after the test."""
+    created = []
+
+    def make(*models):
+        tables = [model.__table__ for model in models]
+        Base.metadata.create_all(get_engine(), tables=tables)
+        created.extend(tables)
+
+    yield make
+    Base.metadata.drop_all(get_engine(), tables=created)
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+def run_async(coro):
+    """Run a coroutine on a fresh event loop, closing the async engine's connections on it."""
+    from app.core.db import dispose_engines
+
+    async def main():
+        try:
+            return await coro
+        finally:
+            await dispose_engines()
+
+    return asyncio.run(main())
@@ -0,0 +1,88 @@
+"""Access tokens decoded once per request, and the cached user snapshots behind them."""
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core import security, user_context
+from app.core.auth_middleware import AuthMiddleware, bearer_token
+from app.core.security import AUTH_STATE_KEY, create_access_token, decode_access_token, optional_access_token
+from app.core.user_context import current_user, get_user_snapshot
+from app.models.user import User
+from tests.conftest import run_async
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    security._claims_cache().clear()
+    user_context._users().clear()
+    yield
+    security._claims_cache().clear()
+    user_context._users().clear()
+
+
+@pytest.fixture
+def user(make_tables, db):
+    make_tables(User)
+    user = User(google_id="g-1", email="learner@example.com", name="Learner")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def through_middleware(headers):
+    """Run a request through AuthMiddleware and return the state the route would see."""
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen.update(scope["state"])
+
+    run_async(AuthMiddleware(app)({"type": "http", "headers": headers}, None, None))
+    return seen
+
+
+def test_bearer_token_is_read_from_the_authorization_header():
+    assert bearer_token([(b"authorization", b"Bearer abc ")]) == "abc"
+    assert bearer_token([(b"authorization", b"bearer abc")]) == "abc"
+    assert bearer_token([(b"authorization", b"Basic abc")]) is None
+    assert bearer_token([(b"authorization", b"Bearer ")]) is None
+    assert bearer_token([]) is None
+
+
+def test_middleware_leaves_claims_in_request_state():
+    token = create_access_token({"user_id": 3})
+    state = through_middleware([(b"authorization", f"Bearer {token}".encode())])
+    assert state[AUTH_STATE_KEY]["user_id"] == 3
+
+    assert through_middleware([(b"authorization", b"Bearer not-a-token")]) == {AUTH_STATE_KEY: None}
+    assert through_middleware([]) == {AUTH_STATE_KEY: None}
+
+    # Dependencies use the middleware's result instead of decoding again
+    request = Request({"type": "http", "headers": [], "state": {AUTH_STATE_KEY: {"user_id": 9}}})
+    assert optional_access_token(request, credentials=None) == {"user_id": 9}
+
+
+def test_decoded_claims_are_cached():
+    token = create_access_token({"user_id": 3})
+    claims = decode_access_token(token)
+    assert decode_access_token(token) is claims
+    assert security.claims_cache_stats()["hits"] == 1
+
+    assert decode_access_token("not-a-token") is None
+    assert decode_access_token(create_access_token({"user_id": 3}, expires_minutes=-1)) is None
+
+
+def test_user_snapshots_are_cached_until_the_user_changes(user, db):
+    snapshot = get_user_snapshot(db, user.id)
+    assert snapshot.to_response()["email"] == "learner@example.com"
+    assert get_user_snapshot(db, user.id) is snapshot
+
+    user.name = "Renamed"
+    db.commit()  # the ORM update drops the snapshot
+    assert get_user_snapshot(db, user.id).name == "Renamed"
+
+    db.delete(user)
+    db.commit()
+    assert get_user_snapshot(db, user.id) is None
+    with pytest.raises(HTTPException) as raised:
+        current_user({"user_id": user.id}, db=db)
+    assert raised.value.status_code == 401
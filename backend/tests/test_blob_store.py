@@ -0,0 +1,142 @@
+"""Image storage: the database blob store, legacy image migration and orphan cleanup."""
+import asyncio
+import base64
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.db import SessionLocal
+from app.models.generation_claim import GenerationClaim
+from app.models.image_blob import ImageBlob
+from app.models.mnemonic_cache import MnemonicCache
+from app.scripts.cleanup_old_cache import cleanup_orphaned_images
+from app.scripts.migrate_images_to_blob_store import copy_local_blobs, migrate_images
+from app.services import blob_store, mnemonic_service
+from app.services.blob_store import DatabaseBlobStore, LocalBlobStore, compute_digest
+from tests.conftest import run_async
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"pixels"
+
+
+@pytest.fixture
+def store(make_tables, monkeypatch):
+    make_tables(ImageBlob, MnemonicCache, GenerationClaim)
+    store = DatabaseBlobStore()
+    monkeypatch.setattr(blob_store, "_store", store)
+    mnemonic_service._memory().clear()
+    yield store
+    mnemonic_service._memory().clear()
+
+
+def add_row(db, key, **columns):
+    word_hash, language, definition_hash = key
+    db.add(MnemonicCache(
+        word_hash=word_hash, language=language, definition_hash=definition_hash,
+        mnemonic_word="w", mnemonic_sentence="s", **columns,
+    ))
+    db.commit()
+
+
+def test_database_store_round_trip(store):
+    digest = store.put(PNG)
+    assert digest == compute_digest(PNG)
+    assert store.put(PNG) == digest  # deduplicated
+    assert store.get(digest) == PNG
+    assert store.open(digest).read() == PNG
+    assert store.existing([digest, "0" * 64]) == {digest}
+
+    store.delete(digest)
+    assert store.get(digest) is None
+    assert store.open(digest) is None
+    assert not store.exists(digest)
+
+
+def test_legacy_image_is_moved_on_read(store, db):
+    key = mnemonic_service.cache_key("gato", "cat", "es")
+    add_row(db, key, image_base64=base64.b64encode(PNG).decode())
+
+    entry = mnemonic_service.lookup_db(db, key)
+    assert entry.image_sha256 == compute_digest(PNG)
+    assert store.get(entry.image_sha256) == PNG
+    assert db.query(MnemonicCache.image_base64).scalar() is None
+
+
+def test_legacy_image_is_kept_when_store_read_fails(store, db, monkeypatch):
+    key = mnemonic_service.cache_key("gato", "cat", "es")
+    add_row(db, key, image_base64=base64.b64encode(PNG).decode())
+    monkeypatch.setattr(store, "get", lambda digest: None)
+
+    entry = mnemonic_service.lookup_db(db, key)
+    assert not entry.has_image
+    assert db.query(MnemonicCache.image_base64).scalar() is not None
+    assert db.query(MnemonicCache.image_sha256).scalar() is None
+
+
+def test_migrate_script_moves_inline_images(store, db, tmp_path):
+    for i in range(3):
+        add_row(db, ("w%d" % i, "es", "d"), image_base64=base64.b64encode(PNG + bytes([i])).decode())
+    local = LocalBlobStore(tmp_path)
+    old = local.put(PNG + b"old")
+
+    copy_local_blobs(str(tmp_path))
+    migrate_images(batch_size=2)
+
+    assert store.get(old) == PNG + b"old"
+    rows = db.query(MnemonicCache.image_sha256, MnemonicCache.image_base64).all()
+    assert all(b64 is None for _, b64 in rows)
+    assert {store.get(sha) for sha, _ in rows} == {PNG + bytes([i]) for i in range(3)}
+
+
+def test_cleanup_keeps_referenced_and_recent_images(store, db):
+    referenced = store.put(PNG + b"referenced")
+    add_row(db, ("w", "es", "d"), image_sha256=referenced)
+    old_orphan = store.put(PNG + b"old")
+    db.query(ImageBlob).filter(ImageBlob.sha256 == old_orphan).update(
+        {"created_at": datetime.now(timezone.utc) - timedelta(hours=2)}
+    )
+    db.commit()
+    new_orphan = store.put(PNG + b"new")  # e.g. just stored, row not written yet
+
+    assert cleanup_orphaned_images(db, grace_minutes=60) == 1
+    assert store.existing([referenced, old_orphan, new_orphan]) == {referenced, new_orphan}
+
+
+def test_local_store_grace_period(tmp_path):
+    local = LocalBlobStore(tmp_path)
+    old = local.put(PNG + b"old")
+    new = local.put(PNG + b"new")
+    two_hours_ago = time.time() - 7200
+    os.utime(local._path(old), (two_hours_ago, two_hours_ago))
+
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=1)
+    assert list(local.iter_digests(stored_before=cutoff)) == [old]
+    assert set(local.iter_digests()) == {old, new}
+
+
+class FakeImageAI:
+    def __init__(self):
+        self.image_calls = 0
+
+    async def generate_mnemonic_image(self, word, definition, sentence):
+        self.image_calls += 1
+        await asyncio.sleep(0.01)
+        return PNG + word.encode()
+
+
+def test_missing_blob_is_regenerated(store, db):
+    key = mnemonic_service.cache_key("gato", "cat", "es")
+    add_row(db, key, image_sha256="f" * 64)  # e.g. the file was on a wiped disk
+    ai = FakeImageAI()
+
+    async def main():
+        with SessionLocal() as session:
+            return await mnemonic_service.get_or_generate_image(session, ai, "gato", "cat", "es", "s")
+
+    image_sha256, cached = run_async(main())
+    assert not cached and ai.image_calls == 1
+    assert store.get(image_sha256) == PNG + b"gato"
+
+    assert run_async(main()) == (image_sha256, True)
+    assert ai.image_calls == 1
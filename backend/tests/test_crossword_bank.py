@@ -0,0 +1,133 @@
+"""Crossword bank: storing layouts, random practice draws, and what may write to it."""
+import json
+from collections import Counter
+
+import pytest
+
+from app.api.crossword import crossword_practice, crossword_today
+from app.core.config import get_settings
+from app.models.crossword_bank import CrosswordBankEntry
+from app.models.vocabulary import Vocabulary
+from app.schemas.crossword import CrosswordTodayRequest
+from app.scripts.build_crossword_bank import prune_layouts
+from app.services import crossword_bank
+from app.services.crossword_bank import draw_layout, find_layout, store_layout
+from app.services.crossword_service import generate_crossword
+
+WORDS = [
+    {"word": "GATO", "clue": "cat"},
+    {"word": "PERRO", "clue": "dog"},
+    {"word": "CASA", "clue": "house"},
+    {"word": "ARBOL", "clue": "tree"},
+]
+
+
+@pytest.fixture
+def bank(make_tables):
+    make_tables(CrosswordBankEntry, Vocabulary)
+    crossword_bank._layouts().clear()
+    crossword_bank.invalidate_index()
+    yield
+    crossword_bank._layouts().clear()
+    crossword_bank.invalidate_index()
+
+
+def layout(words=WORDS, seed=1):
+    return generate_crossword(words, time_budget_ms=20, seed=seed)
+
+
+def bank_words(db, n, level="a1", language="es"):
+    """Store n distinct layouts; returns their word sets."""
+    sets = []
+    for i in range(n):
+        words = WORDS[:3] + [{"word": f"SOL{'A' * i}", "clue": "sun"}]
+        store_layout(db, [w["word"] for w in words], layout(words), level, language)
+        sets.append(frozenset(w["word"] for w in words))
+    db.commit()
+    return sets
+
+
+def test_store_keeps_the_better_layout(bank, db):
+    answers = [w["word"] for w in WORDS]
+    good = layout()
+    store_layout(db, answers, good, "a1", "es")
+    db.commit()
+
+    worse = layout()
+    worse.stats["score"] = good.stats["score"] - 1
+    store_layout(db, reversed(answers), worse, None, None)
+    db.commit()
+
+    row = db.query(CrosswordBankEntry).one()
+    assert row.score == good.stats["score"] and (row.level, row.language) == ("a1", "es")
+    assert find_layout(db, [a.lower() for a in answers]).grid() == good.grid()
+    assert find_layout(db, ["NOPE"]) is None
+
+
+def test_draw_covers_the_level_and_nothing_else(bank, db):
+    sets = bank_words(db, 4)
+    bank_words(db, 2, level="b2")
+
+    drawn = Counter(frozenset(e.answer for e in draw_layout(db, "a1", "es").entries) for _ in range(200))
+    assert set(drawn) == set(sets)
+    assert draw_layout(db, "a1", "fr") is None
+
+
+def test_draw_survives_deleted_entries_and_sees_new_ones(bank, db, monkeypatch):
+    bank_words(db, 3)
+    assert draw_layout(db, "a1", "es") is not None  # index built
+
+    # Builder prunes two entries
+    ids = [i for (i,) in db.query(CrosswordBankEntry.id).order_by(CrosswordBankEntry.id)]
+    db.query(CrosswordBankEntry).filter(CrosswordBankEntry.id.in_(ids[:2])).delete()
+    db.commit()
+    for _ in range(20):
+        assert draw_layout(db, "a1", "es") is not None
+
+    db.query(CrosswordBankEntry).delete()
+    db.commit()
+    assert draw_layout(db, "a1", "es") is None
+
+    # New layouts show up once the index is due for a rebuild
+    monkeypatch.setattr(get_settings(), "crossword_bank_index_ttl_seconds", 0)
+    bank_words(db, 1)
+    assert draw_layout(db, "a1", "es") is not None
+
+
+def test_live_requests_do_not_write_to_the_bank(bank, db):
+    payload = CrosswordTodayRequest(
+        words=[w["word"] for w in WORDS],
+        clues={w["word"]: "<a href=evil>click</a>" for w in WORDS},
+        level="a1",
+        language="es",
+    )
+    response = crossword_today(payload, request=None, db=db)
+    assert db.query(CrosswordBankEntry).count() == 0
+    # Not stored, so it can't be checked by id: answers are sent along
+    body = json.loads(response.body)
+    assert body["crossword_id"] is None
+    assert sorted(w["answer"] for w in body["words"]) == sorted(w["word"] for w in WORDS)
+
+
+def test_practice_puzzles_come_with_answers(bank, db):
+    bank_words(db, 1)
+    body = json.loads(crossword_practice(level="a1", language="es", db=db).body)
+    assert body["level"] == "a1" and all(w["answer"] for w in body["words"])
+
+
+def test_prune_removes_layouts_not_built_from_vocabulary(bank, db):
+    db.add_all([
+        Vocabulary(word=w["clue"], pos="noun", level="a1", translation_es=w["word"].lower(), definition=w["clue"])
+        for w in WORDS
+    ])
+    db.commit()
+    answers = [w["word"] for w in WORDS]
+    store_layout(db, answers, layout(), "a1", "es")  # built from the vocabulary
+
+    injected = [dict(w, clue="spam") if w["word"] == "GATO" else w for w in WORDS]
+    store_layout(db, [w["word"] for w in injected] + ["SOL"], layout(injected + [{"word": "SOL", "clue": "sun"}]), "a1", "es")
+    store_layout(db, ["HOLA", "ADIOS"], layout([{"word": "HOLA", "clue": "hi"}, {"word": "ADIOS", "clue": "bye"}]))
+    db.commit()
+
+    assert prune_layouts(db, ["a1"], ["es"]) == 2
+    assert [sorted(words) for (words,) in db.query(CrosswordBankEntry.words)] == [sorted(answers)]
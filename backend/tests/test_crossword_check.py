@@ -0,0 +1,86 @@
+"""Checking answers against the flat solution, in the shape compact clients send them."""
+from datetime import date
+
+import pytest
+
+from app.models.crossword import Crossword
+from app.services import crossword_check
+from app.services.crossword_check import AnswerFormatError, build_solution, check_answers, get_solution, normalize_answers
+from app.services.crossword_format import compact_grid
+from app.services.crossword_puzzle import CrosswordPuzzle
+
+#  . C . .
+#  G A T O
+#  . S . .
+#  . A . .
+LETTERS = [
+    None, "C", None, None,
+    "G", "A", "T", "O",
+    None, "S", None, None,
+    None, "A", None, None,
+]
+
+
+@pytest.fixture
+def puzzle():
+    return CrosswordPuzzle.number(
+        4, 4, LETTERS, [(0, 1, "down", "CASA", "house"), (1, 0, "across", "GATO", "cat")]
+    )
+
+
+def fill(rows, answers):
+    """What a compact client does: write letters into the '.' cells of the grid rows."""
+    letters = iter(answers)
+    return ["".join(next(letters) if cell == "." else cell for cell in row) for row in rows]
+
+
+def test_compact_grid_round_trips_through_the_checker(puzzle):
+    solution = build_solution(1, puzzle)
+    rows = compact_grid(puzzle)
+    assert rows == ["#.##", "....", "#.##", "#.##"]
+
+    answers = normalize_answers(solution, fill(rows, "cgatosa"))  # lowercase is fine
+    result = check_answers(solution, answers)
+    assert (result.correct_cells, result.total_cells, result.solved) == (7, 7, True)
+
+    # The same answers as one flat string
+    flat = normalize_answers(solution, "".join(fill(rows, "CGATOSA")))
+    assert flat == answers
+
+
+def test_partial_answers_are_scored_per_cell_and_per_word(puzzle):
+    solution = build_solution(1, puzzle)
+    answers = normalize_answers(solution, fill(compact_grid(puzzle), "CGAT.SA"))
+    result = check_answers(solution, answers)
+
+    assert (result.correct_cells, result.solved) == (6, False)
+    assert result.accuracy == pytest.approx(6 / 7)
+    assert result.results == [
+        {"number": 1, "direction": "down", "correct": True},
+        {"number": 2, "direction": "across", "correct": False},
+    ]
+
+
+@pytest.mark.parametrize("answers", [
+    ["#C##", "GATO", "#S##"],           # a row short
+    ["#C##", "GATOS", "#S##", "#A##"],  # a row too long
+    "#C##GATO#S##",                     # flat string too short
+])
+def test_answers_of_the_wrong_shape_are_rejected(puzzle, answers):
+    with pytest.raises(AnswerFormatError):
+        normalize_answers(build_solution(1, puzzle), answers)
+
+
+def test_solutions_are_loaded_from_stored_crosswords_and_cached(make_tables, db, puzzle):
+    make_tables(Crossword)
+    crossword_check._solutions().clear()
+    stored = Crossword(puzzle_date=date(2026, 3, 1), level="a1", language="es", grid=puzzle.grid(), clues=puzzle.clues())
+    db.add(stored)
+    db.commit()
+
+    solution = get_solution(db, stored.id)
+    assert solution.ranked  # no owner: the shared daily puzzle
+    assert solution.letters == "#C##GATO#S###A##"
+    assert get_solution(db, stored.id) is solution
+    assert get_solution(db, stored.id + 1) is None
+    crossword_check._solutions().clear()
@@ -0,0 +1,73 @@
+"""Canonical puzzle model: row-major numbering, the cell -> entry index and wire formats."""
+from app.services.crossword_format import COMPACT, puzzle_payload
+from app.services.crossword_puzzle import ACROSS, DOWN, CrosswordPuzzle
+
+#  S O L .
+#  . . U .
+#  M A N O
+#  . . A .
+LETTERS = [
+    "S", "O", "L", None,
+    None, None, "U", None,
+    "M", "A", "N", "O",
+    None, None, "A", None,
+]
+WORDS = [
+    (2, 0, ACROSS, "MANO", "hand"),
+    (0, 2, DOWN, "LUNA", "moon"),
+    (0, 0, ACROSS, "SOL", "sun"),
+]
+
+
+def make():
+    return CrosswordPuzzle.number(4, 4, LETTERS, WORDS)
+
+
+def test_entries_are_numbered_row_major():
+    puzzle = make()
+    assert [(e.number, e.direction, e.answer) for e in puzzle.entries] == [
+        (1, ACROSS, "SOL"),
+        (2, DOWN, "LUNA"),
+        (3, ACROSS, "MANO"),
+    ]
+
+
+def test_across_and_down_starting_together_share_a_number():
+    # SOL across and SAL down both start on the S
+    letters = ["S", "O", "L", "A", None, None, "L", None, None]
+    puzzle = CrosswordPuzzle.number(3, 3, letters, [(0, 0, DOWN, "SAL", "salt"), (0, 0, ACROSS, "SOL", "sun")])
+    assert [(e.number, e.direction) for e in puzzle.entries] == [(1, ACROSS), (1, DOWN)]
+
+
+def test_every_letter_knows_its_entries():
+    puzzle = make()
+    assert puzzle.entry_at(2, 2, ACROSS).answer == "MANO"
+    assert puzzle.entry_at(2, 2, DOWN).answer == "LUNA"  # the crossing
+    assert puzzle.entry_at(0, 1, ACROSS).answer == "SOL"
+    assert puzzle.entry_at(0, 1, DOWN) is None
+    assert puzzle.entry_at(1, 0, ACROSS) is None  # a block
+
+
+def test_stored_puzzles_round_trip_and_keep_their_numbers():
+    puzzle = make()
+    again = CrosswordPuzzle.from_stored(puzzle.grid(), puzzle.clues())
+    assert (again.height, again.width, again.letters) == (4, 4, LETTERS)
+    assert again.entries == puzzle.entries and again.cell_entries == puzzle.cell_entries
+
+    # Puzzles stored before canonical numbering keep what clients were shown
+    clues = [dict(clue, number=clue["number"] * 10) for clue in puzzle.clues()]
+    assert [e.number for e in CrosswordPuzzle.from_stored(puzzle.grid(), clues).entries] == [10, 20, 30]
+
+
+def test_compact_payload_carries_the_layout_but_no_answers():
+    payload = puzzle_payload(make(), format=COMPACT, crossword_id=5, level="a1")
+    assert payload == {
+        "format": COMPACT,
+        "height": 4,
+        "width": 4,
+        "grid": ["...#", "##.#", "....", "##.#"],
+        "clues": [[1, "a", 0, 0, 3, "sun"], [2, "d", 0, 2, 4, "moon"], [3, "a", 2, 0, 4, "hand"]],
+        "unplaced": [],
+        "crossword_id": 5,
+        "level": "a1",
+    }
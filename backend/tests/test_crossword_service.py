@@ -0,0 +1,151 @@
+"""Crossword generator: the byte-backed grid, the layout search and grid sizing."""
+import time
+
+from app.core.config import get_settings
+from app.services.crossword_service import (
+    ACROSS,
+    CROSSWORD_MIN_GRID_SIZE,
+    DOWN,
+    CrosswordGrid,
+    auto_grid_size,
+    generate_crossword,
+    score_layout,
+)
+
+WORDS = [
+    {"word": w, "clue": f"clue for {w}"}
+    for w in ["MANZANA", "NARANJA", "PLATANO", "UVA", "PERA", "MELON", "SANDIA", "LIMON", "FRESA", "CEREZA"]
+]
+
+
+def runs(puzzle):
+    """Every maximal run of two or more letters, as (row, col, direction, letters)."""
+    found = []
+    for direction, outer, inner in (("across", puzzle.height, puzzle.width), ("down", puzzle.width, puzzle.height)):
+        for line in range(outer):
+            run, start = "", 0
+            for pos in range(inner + 1):
+                r, c = (line, pos) if direction == "across" else (pos, line)
+                letter = puzzle.letters[r * puzzle.width + c] if pos < inner else None
+                if letter is None:
+                    if len(run) > 1:
+                        found.append(((line, start) if direction == "across" else (start, line)) + (direction, run))
+                    run, start = "", pos + 1
+                else:
+                    run += letter
+    return sorted(found)
+
+
+def placed(grid, word, row, col, direction):
+    codes = grid.encode(word)
+    assert grid.fits(codes, row, col, direction) is not None
+    grid.place(word, codes, row, col, direction)
+
+
+def test_grid_keeps_rows_columns_and_letter_index_in_step():
+    grid = CrosswordGrid(10)
+    placed(grid, "GATO", 2, 1, ACROSS)
+    placed(grid, "CASA", 1, 2, DOWN)  # crosses GATO on its A
+
+    assert "".join(grid.letter_at(2, c) or "." for c in range(10)) == ".GATO....."
+    assert "".join(grid.letter_at(r, 2) or "." for r in range(10)) == ".CASA....."
+    assert (grid.filled, grid.intersections, grid.islands) == (7, 1, 1)
+    assert grid.bounds == (1, 1, 4, 4)
+    # The column-major copy mirrors the rows
+    assert all(grid.cols[c * 10 + r] == grid.rows[r * 10 + c] for r in range(10) for c in range(10))
+    a_code = grid.encode("A")[0]
+    assert sorted(grid.letter_cells[a_code]) == [2 * 10 + 2, 4 * 10 + 2]
+
+
+def test_fits_rejects_clashes_runs_and_touching_words():
+    grid = CrosswordGrid(10)
+    placed(grid, "GATO", 2, 1, ACROSS)
+
+    assert grid.fits(grid.encode("CASA"), 1, 2, DOWN) == 1     # crosses on A
+    assert grid.fits(grid.encode("PERRO"), 1, 2, DOWN) is None  # E over A: clash
+    assert grid.fits(grid.encode("SOL"), 2, 5, ACROSS) is None  # would extend GATO
+    assert grid.fits(grid.encode("SOL"), 3, 1, ACROSS) is None  # runs alongside GATO
+    assert grid.fits(grid.encode("SOL"), 2, 0, DOWN) is None    # touches GATO's start
+    assert grid.fits(grid.encode("GATO"), 2, 1, ACROSS) is None  # same direction over a word
+    assert grid.fits(grid.encode("SOL"), 7, 8, ACROSS) is None  # off the grid
+    assert grid.fits(grid.encode("SOL"), 6, 1, ACROSS) == 0     # free space
+
+
+def test_candidate_slots_come_from_the_letter_index():
+    grid = CrosswordGrid(10)
+    placed(grid, "GATO", 2, 1, ACROSS)
+
+    # Every A in the grid is a place where CASA's A's could cross it
+    slots = set(grid.crossing_slots(grid.encode("CASA")))
+    assert (1, 2, DOWN) in slots and (-1, 2, DOWN) in slots
+    assert all(direction == DOWN for _, _, direction in slots)  # GATO's cells are already across
+
+    free = set(grid.free_slots(8, ACROSS))
+    assert (2, 1) not in free and (0, 0) in free and (2, 0) not in free
+
+
+def test_letters_beyond_ascii_get_their_own_codes():
+    grid = CrosswordGrid(10)
+    placed(grid, "ÑANDÚ", 0, 0, ACROSS)
+    assert "".join(grid.letter_at(0, c) for c in range(5)) == "ÑANDÚ"
+    assert len(set(grid.encode("ÑANDÚ"))) == 5
+
+
+def test_search_finds_a_complete_valid_layout():
+    puzzle = generate_crossword(WORDS, time_budget_ms=5000, max_attempts=300, seed=7)
+    assert not puzzle.unplaced
+    assert puzzle.stats["islands"] <= 1 and puzzle.stats["intersections"] >= len(WORDS) - 1
+    # The grid spells exactly the entries: no accidental words from touching letters
+    assert runs(puzzle) == sorted((e.row, e.col, e.direction, e.answer) for e in puzzle.entries)
+
+
+def test_search_is_reproducible_and_bounded():
+    first = generate_crossword(WORDS, time_budget_ms=1000, max_attempts=5, seed=3)
+    again = generate_crossword(WORDS, time_budget_ms=1000, max_attempts=5, seed=3)
+    assert first.grid() == again.grid()
+    assert first.stats["attempts"] <= 5
+
+    started = time.perf_counter()
+    puzzle = generate_crossword(WORDS, time_budget_ms=30, max_attempts=100000)
+    assert time.perf_counter() - started < 0.5
+    assert puzzle.entries  # the first attempt always completes
+
+
+def test_score_prefers_crossings_and_penalizes_islands():
+    connected = CrosswordGrid(10)
+    placed(connected, "GATO", 2, 1, ACROSS)
+    placed(connected, "CASA", 1, 2, DOWN)
+
+    apart = CrosswordGrid(10)
+    placed(apart, "GATO", 2, 1, ACROSS)
+    placed(apart, "CASA", 5, 6, DOWN)
+
+    assert score_layout(connected) > score_layout(apart)
+    assert score_layout(CrosswordGrid(10)) == 0.0
+
+
+def test_grid_size_follows_the_words_within_bounds(monkeypatch):
+    assert auto_grid_size([]) == CROSSWORD_MIN_GRID_SIZE
+    assert auto_grid_size(["SOL", "MAR"]) == CROSSWORD_MIN_GRID_SIZE
+    assert auto_grid_size(["RESPONSIBILITY", "SOL"]) == 14
+    assert auto_grid_size([w["word"] for w in WORDS] * 4) > auto_grid_size([w["word"] for w in WORDS])
+
+    monkeypatch.setattr(get_settings(), "crossword_max_grid_size", 12)
+    assert auto_grid_size(["RESPONSIBILITY", "SOL"]) == 12
+
+
+def test_output_is_trimmed_and_long_words_need_room():
+    words = WORDS[:4] + [{"word": "RESPONSIBILITY", "clue": "duty"}]
+    puzzle = generate_crossword(words, max_attempts=20, seed=1)
+    assert not puzzle.unplaced and puzzle.stats["grid_size"] == 14
+
+    # No empty border rows or columns: the grid is the bounding box of the letters
+    rows = [puzzle.letters[r * puzzle.width:(r + 1) * puzzle.width] for r in range(puzzle.height)]
+    assert any(rows[0]) and any(rows[-1])
+    assert any(row[0] for row in rows) and any(row[-1] for row in rows)
+    assert max(puzzle.height, puzzle.width) <= 14
+    assert all(0 <= e.row < puzzle.height and 0 <= e.col < puzzle.width for e in puzzle.entries)
+
+    small = generate_crossword(words, size=10, max_attempts=20, seed=1)
+    assert small.unplaced == ["RESPONSIBILITY"]
+    assert max(small.height, small.width) <= 10
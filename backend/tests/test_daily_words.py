@@ -0,0 +1,80 @@
+"""Words of the day and the shared daily crossword built from them."""
+from datetime import date, timedelta
+
+import orjson
+import pytest
+from starlette.requests import Request
+
+from app.api.crossword import crossword_daily
+from app.core.config import get_settings
+from app.models.crossword import Crossword
+from app.models.crossword_bank import CrosswordBankEntry
+from app.models.daily_word_set import DailyWordSet
+from app.models.vocabulary import Vocabulary
+from app.services import daily_crossword, daily_words
+from app.services.daily_crossword import get_daily_crossword
+from app.services.daily_words import get_daily_words, get_word_set
+
+DAY = date(2026, 3, 1)
+SPANISH = ["GATO", "PERRO", "CASA", "ARBOL", "SOL", "LUNA", "MESA", "SILLA", "AGUA", "FUEGO", "LIBRO", "COCHE"]
+
+
+@pytest.fixture
+def vocabulary(make_tables, db):
+    make_tables(Vocabulary, DailyWordSet, Crossword, CrosswordBankEntry)
+    daily_words._sets.clear()
+    daily_crossword._memory().clear()
+    db.add_all([
+        Vocabulary(word=f"word{i}", pos="noun", level="a1", translation_es=es.lower(), definition=f"meaning {i}")
+        for i, es in enumerate(SPANISH)
+    ])
+    db.commit()
+    yield
+    daily_words._sets.clear()
+    daily_crossword._memory().clear()
+
+
+def test_word_set_is_stored_once_and_stable(vocabulary, db):
+    word_ids = get_word_set(db, "a1", DAY)
+    assert len(word_ids) == daily_words.DAILY_WORD_SET_SIZE and list(word_ids) == sorted(word_ids)
+
+    daily_words._sets.clear()
+    assert get_word_set(db, "a1", DAY) == word_ids  # read back from daily_word_sets
+    assert db.query(DailyWordSet).count() == 1
+    assert [w.id for w in get_daily_words(db, "a1", limit=3, day=DAY)] == list(word_ids[:3])
+    assert get_word_set(db, "c2", DAY) == ()
+
+
+def test_in_memory_sets_are_bounded(vocabulary, db):
+    for offset in range(daily_words.DAILY_WORD_SET_CACHE_SIZE + 8):
+        get_word_set(db, "a1", DAY + timedelta(days=offset))
+    assert len(daily_words._sets) == daily_words.DAILY_WORD_SET_CACHE_SIZE
+
+
+def test_daily_crossword_is_built_once_and_reused(vocabulary, db, monkeypatch):
+    monkeypatch.setattr(get_settings(), "daily_crossword_time_budget_ms", 20)
+    puzzle = get_daily_crossword(db, "a1", "es", DAY)
+    assert puzzle is not None and puzzle.puzzle.entries
+    assert db.query(Crossword).one().user_id is None
+
+    daily_crossword._memory().clear()
+    again = get_daily_crossword(db, "a1", "es", DAY)  # loaded, not rebuilt
+    assert (again.id, again.etag, again.body) == (puzzle.id, puzzle.etag, puzzle.body)
+    assert db.query(Crossword).count() == 1
+
+
+def test_daily_endpoint_sends_compact_puzzle_and_honors_etag(vocabulary, db, monkeypatch):
+    monkeypatch.setattr(get_settings(), "daily_crossword_time_budget_ms", 20)
+
+    def get(*headers):
+        scope = {"type": "http", "headers": [(k.encode(), v.encode()) for k, v in headers]}
+        return crossword_daily(Request(scope), level="a1", language="es", db=db)
+
+    first = get()
+    body = orjson.loads(first.body)
+    assert first.status_code == 200 and body["format"] == "compact" and body["crossword_id"]
+    assert all(len(clue) == 6 for clue in body["clues"])  # no answers
+    etag = first.headers["etag"]
+
+    assert get(("if-none-match", etag)).status_code == 304
+    assert get(("if-none-match", '"stale"')).status_code == 200
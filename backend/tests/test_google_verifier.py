@@ -0,0 +1,128 @@
+"""Google ID token verification against a local RSA key and a stand-in JWKS endpoint."""
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from app.services.google_verifier import GoogleTokenError, GoogleTokenVerifier, cache_ttl
+
+CLIENT_ID = "test-client-id"
+
+
+def make_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def jwk(private_key, kid):
+    return {**RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True), "kid": kid, "use": "sig", "alg": "RS256"}
+
+
+class FakeResponse:
+    def __init__(self, body, headers):
+        self._body = body
+        self.headers = headers
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._body
+
+
+class FakeCerts:
+    """Stands in for the requests session fetching Google's JWKS document."""
+
+    def __init__(self, keys, cache_control="public, max-age=600"):
+        self.keys = keys
+        self.cache_control = cache_control
+        self.fetches = 0
+
+    def get(self, url, timeout=None):
+        self.fetches += 1
+        return FakeResponse({"keys": self.keys}, {"Cache-Control": self.cache_control})
+
+
+def sign(private_key, kid, **overrides):
+    now = int(time.time())
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "sub": "1234567890",
+        "email": "learner@example.com",
+        "iat": now,
+        "exp": now + 3600,
+        **overrides,
+    }
+    claims = {name: value for name, value in claims.items() if value is not None}
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture(scope="module")
+def keys():
+    return make_key(), make_key()
+
+
+def verifier_for(certs):
+    return GoogleTokenVerifier(CLIENT_ID, certs_url="https://certs.test/", session=certs)
+
+
+def test_valid_token_verifies_and_keys_are_cached(keys):
+    certs = FakeCerts([jwk(keys[0], "k1")])
+    verifier = verifier_for(certs)
+
+    assert verifier.verify(sign(keys[0], "k1"))["sub"] == "1234567890"
+    assert verifier.verify(sign(keys[0], "k1"))["email"] == "learner@example.com"
+    assert certs.fetches == 1
+
+
+def test_unknown_key_id_triggers_a_refresh(keys):
+    certs = FakeCerts([jwk(keys[0], "k1")])
+    verifier = verifier_for(certs)
+    verifier.min_refresh_interval = 0
+    verifier.refresh()
+
+    # Google rotates in a new key
+    certs.keys = [jwk(keys[0], "k1"), jwk(keys[1], "k2")]
+    assert verifier.verify(sign(keys[1], "k2"))["aud"] == CLIENT_ID
+    assert certs.fetches == 2
+
+    with pytest.raises(GoogleTokenError, match="Unknown signing key"):
+        verifier.verify(sign(keys[1], "k3"))
+
+
+@pytest.mark.parametrize("overrides", [
+    {"exp": int(time.time()) - 3600},          # expired
+    {"aud": "someone-else"},                    # wrong audience
+    {"iss": "https://evil.example.com"},        # wrong issuer
+    {"exp": None},                              # never expires
+    {"sub": None},                              # no subject
+])
+def test_invalid_tokens_are_rejected(keys, overrides):
+    verifier = verifier_for(FakeCerts([jwk(keys[0], "k1")]))
+    with pytest.raises(GoogleTokenError):
+        verifier.verify(sign(keys[0], "k1", **overrides))
+
+
+def test_token_signed_by_another_key_is_rejected(keys):
+    verifier = verifier_for(FakeCerts([jwk(keys[0], "k1")]))
+    with pytest.raises(GoogleTokenError):
+        verifier.verify(sign(keys[1], "k1"))
+
+
+def test_cache_control_ttl_is_honored(keys):
+    assert cache_ttl({"Cache-Control": "public, max-age=21600", "Age": "600"}) == 21000
+    assert cache_ttl({"Cache-Control": "no-store"}) == 0
+    assert cache_ttl({}, default=42) == 42
+
+    cached = FakeCerts([jwk(keys[0], "k1")], cache_control="public, max-age=600")
+    verifier = verifier_for(cached)
+    verifier.verify(sign(keys[0], "k1"))
+    assert 590 <= verifier.stats()["expires_in"] <= 600
+
+    uncached = FakeCerts([jwk(keys[0], "k1")], cache_control="no-cache")
+    verifier = verifier_for(uncached)
+    verifier.verify(sign(keys[0], "k1"))
+    verifier.verify(sign(keys[0], "k1"))
+    assert uncached.fetches == 2
@@ -0,0 +1,192 @@
+"""Leaderboard ranking, atomic attempt completion and what ranked checks reveal."""
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from starlette.requests import Request
+
+from app.api.crossword import check_stored_crossword, complete_crossword_attempt, start_crossword_attempt
+
+from app.core.config import get_settings
+from app.core.db import SessionLocal
+from app.models.crossword import Crossword
+from app.models.crossword_attempts import CrosswordAttempt
+from app.models.crossword_leaderboard import CrosswordLeaderboardEntry
+from app.schemas.crossword import CrosswordCheckRequest
+from app.services import crossword_check, leaderboard
+from app.services.crossword_check import CheckResult
+from app.services.crossword_service import generate_crossword
+from app.services.leaderboard import (
+    AttemptAlreadyCompletedError,
+    Leaderboard,
+    allow_ranked_check,
+    complete_attempt,
+    get_leaderboard,
+    has_open_attempt,
+    has_ranked_result,
+    start_attempt,
+)
+
+CROSSWORD = 7
+
+
+@pytest.fixture
+def tables(make_tables):
+    make_tables(CrosswordAttempt, CrosswordLeaderboardEntry)
+    leaderboard._boards().clear()
+    yield
+    leaderboard._boards().clear()
+
+
+def result(correct, total=20):
+    return CheckResult(correct_cells=correct, total_cells=total, results=[])
+
+
+def finish(db, user_id, correct, seconds):
+    """Start an attempt `seconds` ago and complete it."""
+    attempt = start_attempt(db, CROSSWORD, user_id)
+    attempt.started_at = datetime.now(timezone.utc) - timedelta(seconds=seconds)
+    db.commit()
+    return complete_attempt(db, attempt, result(correct))
+
+
+def test_board_ranks_by_misses_then_time():
+    board = Leaderboard({1: (0, 90), 2: (0, 60), 3: (2, 30)})
+    assert [user_id for user_id, _ in board.top(3)] == [2, 1, 3]
+    assert board.standing(3) == (3, 3, 0.0)
+
+    board.submit(3, (0, 30))
+    assert board.standing(3) == (1, 3, 66.7)
+    board.submit(3, (1, 10))  # worse than their best: ignored
+    assert board.top(1) == [(3, (0, 30))]
+    assert board.rank_of((0, 60)) == 2 and len(board) == 3
+
+
+def test_only_the_first_completion_is_ranked(tables, db):
+    assert finish(db, 1, correct=20, seconds=100).rank == 1
+    standing = finish(db, 2, correct=20, seconds=50)
+    assert (standing.rank, standing.players, standing.percentile, standing.ranked) == (1, 2, 50.0, True)
+    assert finish(db, 3, correct=18, seconds=10).rank == 3
+    assert not has_ranked_result(db, CROSSWORD, 4)
+
+    # A retry is counted but doesn't replace the ranked result, better or worse
+    standing = finish(db, 3, correct=20, seconds=5)
+    assert (standing.rank, standing.best_correct_cells, standing.ranked) == (3, 18, False)
+    standing = finish(db, 2, correct=15, seconds=5)
+    assert (standing.rank, standing.best_time_seconds, standing.best_correct_cells) == (1, 50, 20)
+    row = db.get(CrosswordLeaderboardEntry, (CROSSWORD, 2))
+    assert (row.miss_cells, row.best_time_seconds, row.attempts) == (0, 50, 2)
+    assert has_ranked_result(db, CROSSWORD, 2)
+
+
+def test_attempt_is_completed_only_once(tables, db):
+    attempt = start_attempt(db, CROSSWORD, 1)
+    with SessionLocal() as other:
+        # Both requests loaded the attempt before either completed it
+        stale = other.get(CrosswordAttempt, attempt.id)
+        complete_attempt(db, attempt, result(20))
+        with pytest.raises(AttemptAlreadyCompletedError):
+            complete_attempt(other, stale, result(20))
+
+    row = db.get(CrosswordLeaderboardEntry, (CROSSWORD, 1))
+    assert row.attempts == 1
+
+
+def test_board_syncs_changes_from_other_workers(tables, db, monkeypatch):
+    finish(db, 1, correct=20, seconds=100)
+    board = get_leaderboard(db, CROSSWORD)
+    assert len(board) == 1
+
+    # Another worker ranks a faster player straight into the summary table
+    db.add(CrosswordLeaderboardEntry(
+        crossword_id=CROSSWORD, user_id=2, miss_cells=0, best_time_seconds=40,
+        correct_cells=20, total_cells=20, attempts=1,
+    ))
+    db.commit()
+    assert len(get_leaderboard(db, CROSSWORD)) == 1  # not due for a sync yet
+
+    monkeypatch.setattr(get_settings(), "leaderboard_reload_seconds", 0)
+    synced = get_leaderboard(db, CROSSWORD)
+    assert synced is board
+    assert board.standing(2)[0] == 1 and board.standing(1)[0] == 2
+
+
+def test_open_attempt_and_check_budget(tables, db):
+    attempt = start_attempt(db, CROSSWORD, 1)
+    assert has_open_attempt(db, CROSSWORD, 1)
+    assert not has_open_attempt(db, CROSSWORD, 2)
+    complete_attempt(db, attempt, result(20))
+    assert not has_open_attempt(db, CROSSWORD, 1)
+
+    leaderboard._check_buckets.clear()
+    allowed = [allow_ranked_check(CROSSWORD, "user:1") for _ in range(leaderboard.RANKED_CHECK_BURST + 2)]
+    assert allowed.count(True) == leaderboard.RANKED_CHECK_BURST
+    assert allow_ranked_check(CROSSWORD, "user:2")
+
+
+# --- Through the API: answers must not leak before the ranked attempt ---
+
+@pytest.fixture
+def daily(make_tables):
+    """A stored, ranked (daily) crossword; returns (crossword_id, solved answers)."""
+    make_tables(Crossword, CrosswordAttempt, CrosswordLeaderboardEntry)
+    leaderboard._boards().clear()
+    leaderboard._check_buckets.clear()
+    crossword_check._solutions().clear()
+    puzzle = generate_crossword(
+        [{"word": "GATO", "clue": "cat"}, {"word": "PERRO", "clue": "dog"}, {"word": "CASA", "clue": "house"}],
+        time_budget_ms=20,
+        seed=1,
+    )
+    with SessionLocal() as db:
+        row = Crossword(user_id=None, puzzle_date=date.today(), level="a1", language="es",
+                        grid=puzzle.grid(), clues=puzzle.clues())
+        db.add(row)
+        db.commit()
+        crossword_id = row.id
+    yield crossword_id, "".join(letter or "#" for letter in puzzle.letters)
+    leaderboard._boards().clear()
+    crossword_check._solutions().clear()
+
+
+def client_request(host="203.0.113.7"):
+    return Request({"type": "http", "headers": [], "client": (host, 0)})
+
+
+def test_ranked_checks_only_report_counts_before_the_ranked_attempt(daily, db):
+    crossword_id, solved = daily
+    user = {"user_id": 1}
+    junk = "." * len(solved)
+
+    anonymous = check_stored_crossword(crossword_id, CrosswordCheckRequest(answers=junk), client_request(), db, None)
+    assert anonymous.results == [] and anonymous.correct_cells == 0
+
+    checked = check_stored_crossword(crossword_id, CrosswordCheckRequest(answers=solved), client_request(), db, user)
+    assert checked.solved and checked.results == [] and checked.attempt_id is None
+    assert db.query(CrosswordAttempt).count() == 0
+
+    # Once the ranked attempt is in, checks are full and recorded
+    attempt_id = start_crossword_attempt(crossword_id, db, user).attempt_id
+    complete_crossword_attempt(crossword_id, attempt_id, CrosswordCheckRequest(answers=junk), db, user)
+    checked = check_stored_crossword(crossword_id, CrosswordCheckRequest(answers=solved), client_request(), db, user)
+    assert checked.results and all(r.correct for r in checked.results)
+    assert checked.attempt_id is not None
+
+
+def test_throwaway_attempt_does_not_buy_a_perfect_rank(daily, db):
+    crossword_id, solved = daily
+    user = {"user_id": 1}
+
+    # Junk first attempt to learn which words are right...
+    first = start_crossword_attempt(crossword_id, db, user).attempt_id
+    junk = complete_crossword_attempt(crossword_id, first, CrosswordCheckRequest(answers="." * len(solved)), db, user)
+    assert junk.ranked and not junk.solved
+
+    # ...then a fast perfect one, which is checked but not ranked
+    second = start_crossword_attempt(crossword_id, db, user).attempt_id
+    perfect = complete_crossword_attempt(crossword_id, second, CrosswordCheckRequest(answers=solved), db, user)
+    assert perfect.solved and not perfect.ranked
+    assert perfect.best_accuracy == 0.0
+
+    row = db.get(CrosswordLeaderboardEntry, (crossword_id, 1))
+    assert (row.correct_cells, row.attempts) == (0, 2)
+    assert get_leaderboard(db, crossword_id).top(1) == [(1, (row.miss_cells, row.best_time_seconds))]
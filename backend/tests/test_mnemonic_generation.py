@@ -0,0 +1,186 @@
+"""Coalescing of concurrent mnemonic generations: SingleFlight and generation claims."""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.api.mnemonic import _ai_http_error
+from app.core.config import get_settings
+from app.core.db import AsyncSessionLocal, SessionLocal
+from app.models.generation_claim import GenerationClaim
+from app.models.mnemonic_cache import MnemonicCache
+from app.services import mnemonic_service
+from app.services.ai_service import AIServiceError
+from app.services.generation_claims import release_claim, try_claim
+from app.utils.single_flight import SingleFlight
+from tests.conftest import run_async
+
+
+class FakeAI:
+    """Stands in for GeminiClient; counts calls and takes a little time."""
+
+    def __init__(self, delay: float = 0.05, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.text_calls = 0
+
+    async def generate_mnemonic_text(self, word, definition):
+        self.text_calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise AIServiceError("boom")
+        return f"{word}-mnemonic", f"A sentence about {word}"
+
+
+@pytest.fixture
+def cache_tables(make_tables):
+    make_tables(MnemonicCache, GenerationClaim)
+    mnemonic_service._memory().clear()
+    yield
+    mnemonic_service._memory().clear()
+
+
+def claim_rows():
+    with SessionLocal() as db:
+        return db.query(GenerationClaim).count()
+
+
+def test_single_flight_runs_once_for_concurrent_callers():
+    flights = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return calls
+
+    async def main():
+        return await asyncio.gather(*(flights.do("k", work) for _ in range(10)))
+
+    assert asyncio.run(main()) == [1] * 10
+    assert calls == 1
+    assert not flights.in_flight("k")
+
+
+def test_single_flight_shares_exceptions():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("nope")
+
+    async def main():
+        return await asyncio.gather(*(flights.do("k", work) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_claim_is_exclusive_until_released(make_tables, db):
+    make_tables(GenerationClaim)
+
+    assert try_claim(db, "job", "a", 60)
+    assert not try_claim(db, "job", "b", 60)
+    release_claim(db, "job", "b")  # not the owner: no effect
+    assert not try_claim(db, "job", "b", 60)
+
+    release_claim(db, "job", "a")
+    assert try_claim(db, "job", "b", 60)
+
+
+def test_expired_claim_is_taken_over(make_tables, db):
+    make_tables(GenerationClaim)
+    db.add(GenerationClaim(
+        name="job", owner="dead", expires_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+    ))
+    db.commit()
+
+    assert try_claim(db, "job", "b", 60)
+    assert db.query(GenerationClaim.owner).scalar() == "b"
+
+
+@pytest.mark.parametrize("use_async", [True, False])
+def test_concurrent_misses_generate_once(cache_tables, use_async):
+    ai = FakeAI()
+
+    async def one():
+        if use_async:
+            async with AsyncSessionLocal() as db:
+                return await mnemonic_service.get_or_generate_text(db, ai, "gato", "cat", "es")
+        with SessionLocal() as db:
+            return await mnemonic_service.get_or_generate_text(db, ai, "gato", "cat", "es")
+
+    async def main():
+        return await asyncio.gather(*(one() for _ in range(8)))
+
+    results = run_async(main())
+    assert ai.text_calls == 1
+    assert {r[:2] for r in results} == {("gato-mnemonic", "A sentence about gato")}
+
+    # Now cached, and the claim is gone
+    assert run_async(one())[2] is True
+    assert ai.text_calls == 1
+    assert claim_rows() == 0
+
+
+def test_waits_for_another_workers_claim(cache_tables):
+    """A claim held elsewhere makes the caller wait for that worker's row instead of generating."""
+    ai = FakeAI()
+    key = mnemonic_service.cache_key("perro", "dog", "es")
+    claim_name = "mnemonic-text:" + ":".join(key)
+    with SessionLocal() as db:
+        assert try_claim(db, claim_name, "other-worker", 60)
+
+    async def other_worker_finishes():
+        await asyncio.sleep(0.3)
+        with SessionLocal() as db:
+            mnemonic_service.save_text(db, key, "perro-other", "Written by the other worker")
+            release_claim(db, claim_name, "other-worker")
+
+    async def main():
+        async with AsyncSessionLocal() as db:
+            waiter = mnemonic_service.get_or_generate_text(db, ai, "perro", "dog", "es")
+            result, _ = await asyncio.gather(waiter, other_worker_finishes())
+            return result
+
+    assert run_async(main()) == ("perro-other", "Written by the other worker", True)
+    assert ai.text_calls == 0
+
+
+def test_failed_generation_releases_claim(cache_tables):
+    ai = FakeAI(fail=True)
+
+    async def main():
+        async with AsyncSessionLocal() as db:
+            return await mnemonic_service.get_or_generate_text(db, ai, "casa", "house", "es")
+
+    with pytest.raises(AIServiceError):
+        run_async(main())
+    assert claim_rows() == 0
+
+    # The next caller gets to try again
+    ai.fail = False
+    assert run_async(main())[2] is False
+    assert ai.text_calls == 2
+
+
+def test_gives_up_when_the_claim_holder_never_finishes(cache_tables, monkeypatch):
+    """A hung claim holder makes the caller time out, not wait out the whole claim TTL."""
+    monkeypatch.setattr(get_settings(), "mnemonic_claim_wait_seconds", 0.3)
+    ai = FakeAI()
+    key = mnemonic_service.cache_key("sol", "sun", "es")
+    with SessionLocal() as db:
+        assert try_claim(db, "mnemonic-text:" + ":".join(key), "hung-worker", mnemonic_service.CLAIM_TTL_SECONDS)
+
+    async def main():
+        async with AsyncSessionLocal() as db:
+            return await mnemonic_service.get_or_generate_text(db, ai, "sol", "sun", "es")
+
+    started = time.monotonic()
+    with pytest.raises(mnemonic_service.GenerationWaitTimeoutError):
+        run_async(main())
+    assert time.monotonic() - started < 2
+    assert ai.text_calls == 0
+    assert _ai_http_error(mnemonic_service.GenerationWaitTimeoutError("x"), "mnemonic").status_code == 504
@@ -0,0 +1,65 @@
+"""Pre-generation pipeline: progress rows on any dialect, and DB work kept off the event loop."""
+import time
+from datetime import date
+
+import pytest
+
+from app.models.pre_generation_progress import PreGenerationProgress
+from app.services import mnemonic_service, pre_generation
+from app.services.mnemonic_service import CachedMnemonic
+from app.services.pre_generation import _load_progress, _record_progress, pre_generate_all_combinations
+from tests.conftest import run_async
+
+RUN_DATE = date(2026, 1, 5)
+
+
+def items(n):
+    return [
+        {"language": "es", "level": "a1", "word_id": i, "word": f"w{i}",
+         "translation": f"t{i}", "definition": f"d{i}"}
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def progress_table(make_tables):
+    make_tables(PreGenerationProgress)
+
+
+def test_progress_rows_are_created_once_and_updated(progress_table, db):
+    work = items(3)
+    assert _load_progress(db, RUN_DATE, work) == {("es", "a1", i): (False, False) for i in range(3)}
+
+    _record_progress(pre_generation.SessionLocal, RUN_DATE, work[1], text_done=True)
+    _record_progress(pre_generation.SessionLocal, RUN_DATE, work[2], error="boom")
+    progress = _load_progress(db, RUN_DATE, work)  # second run: rows already there
+    assert progress[("es", "a1", 1)] == (True, False)
+    assert db.query(PreGenerationProgress).count() == 3
+    row = db.query(PreGenerationProgress).filter(PreGenerationProgress.word_id == 2).one()
+    assert (row.attempts, row.last_error) == (1, "boom")
+
+
+def test_workers_do_not_block_each_other_on_database_writes(monkeypatch):
+    work = items(8)
+    done = []
+
+    def slow_write(*args, **kwargs):
+        time.sleep(0.1)  # a blocking database round-trip
+
+    monkeypatch.setattr(pre_generation, "_prepare", lambda session_factory, run_date: (work, {}))
+    monkeypatch.setattr(pre_generation, "get_ai_client", lambda: None)
+    monkeypatch.setattr(mnemonic_service, "lookup_db", lambda db, key: CachedMnemonic("w", "s", "sha"))
+    monkeypatch.setattr(pre_generation, "_record_progress", slow_write)
+
+    started = time.perf_counter()
+    stats = run_async(pre_generate_all_combinations(
+        run_date=RUN_DATE,
+        text_workers=4,
+        image_workers=1,
+        on_item_done=lambda item, outcome: done.append(outcome),
+    ))
+    elapsed = time.perf_counter() - started
+
+    assert stats["total_cached"] == 8 and done == ["cached"] * 8
+    # 8 writes of 0.1 s by 4 workers: about 0.2 s when they overlap, 0.8 s if serialized
+    assert elapsed < 0.6
@@ -0,0 +1,51 @@
+"""Random word sampling from the in-memory id index."""
+import pytest
+
+from app.models.vocabulary import Vocabulary
+from app.services import word_sampler
+from app.services.word_sampler import level_size, sample_ids, sample_words
+
+
+@pytest.fixture
+def vocabulary(make_tables, db):
+    make_tables(Vocabulary)
+    word_sampler.invalidate()
+    db.add_all(
+        [Vocabulary(word=f"a1-{i}", pos="noun", level="a1", definition="d") for i in range(30)]
+        + [Vocabulary(word=f"b2-{i}", pos="noun", level="b2", definition="d") for i in range(5)]
+    )
+    db.commit()
+    yield
+    word_sampler.invalidate()
+
+
+def test_samples_are_distinct_and_from_the_level(vocabulary, db):
+    for _ in range(20):
+        words = sample_words(db, 10, level="a1")
+        assert len({w.id for w in words}) == 10
+        assert {w.level for w in words} == {"a1"}
+    assert level_size(db, "a1") == 30 and level_size(db) == 35
+    assert sample_words(db, 10, level="c2") == []
+
+
+def test_exclusions_are_honored_even_when_most_of_the_level_is_excluded(vocabulary, db):
+    a1_ids = [w.id for w in db.query(Vocabulary.id).filter(Vocabulary.level == "a1")]
+    exclude = set(a1_ids[:27])
+
+    picked = sample_ids(db, 10, level="a1", exclude=exclude)
+    assert sorted(picked) == sorted(a1_ids[27:])  # only three left to give
+
+    for _ in range(20):
+        assert not set(sample_ids(db, 2, level="a1", exclude=exclude)) & exclude
+
+
+def test_index_follows_orm_changes(vocabulary, db):
+    assert level_size(db, "b2") == 5
+    db.add(Vocabulary(word="b2-new", pos="noun", level="b2", definition="d"))
+    db.commit()
+    assert level_size(db, "b2") == 6
+
+    db.query(Vocabulary).filter(Vocabulary.level == "b2").delete()  # bulk delete: no ORM events
+    db.commit()
+    assert sample_words(db, 5, level="b2") == []  # stale ids are skipped...
+    assert level_size(db, "b2") == 0              # ...and the index is rebuilt
@@ -61,7 +61,7 @@ export default function CrosswordPage() {
               hasTranslation: !!translation
             };
           })
-          .filter((w: any) => w.word && w.word.length <= 10); // Filter out words without translations and words too long
+          .filter((w: any) => w.word); // Filter out words without translations (the server sizes the grid to the words)
         
         if (wordsWithTranslations.length === 0) {
           setError("No translated words available. Please complete flashcards first.");